@@ -0,0 +1,32 @@
+from kidscompass.calendar_logic import PlannedIndex, apply_overrides, first_occurrence, generate_standard_days
+
+
+def _all_planned(plan):
+    years = range(plan['start'].year, plan['end'].year + 1)
+    return sum((generate_standard_days(p, y) for p in plan['patterns'] for y in years), [])
+
+
+def bench_generate_standard_days(benchmark, plan):
+    days = benchmark(_all_planned, plan)
+    assert days
+
+
+def bench_apply_overrides(benchmark, plan):
+    standard = _all_planned(plan)
+    result = benchmark(apply_overrides, standard, plan['overrides'])
+    assert result
+
+
+def bench_first_occurrence(benchmark, plan):
+    def run():
+        return [first_occurrence(p, plan['start']) for p in plan['patterns']]
+    assert any(benchmark(run))
+
+
+def bench_first_occurrence_annotations(benchmark, plan):
+    # Annotationen in refresh_calendar: erster geplanter Termin je Muster über die Bitmap
+    index = PlannedIndex(apply_overrides(_all_planned(plan), plan['overrides']))
+
+    def run():
+        return [first_occurrence(p, p.start_date, index) for p in plan['patterns']]
+    assert any(benchmark(run))
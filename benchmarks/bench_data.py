@@ -0,0 +1,23 @@
+def bench_load_patterns(benchmark, synthetic_db):
+    assert benchmark(synthetic_db.load_patterns)
+
+
+def bench_load_overrides(benchmark, synthetic_db):
+    assert benchmark(synthetic_db.load_overrides)
+
+
+def bench_load_all_status(benchmark, synthetic_db):
+    assert benchmark(synthetic_db.load_all_status)
+
+
+def bench_load_status_arrays(benchmark, synthetic_db):
+    assert len(benchmark(synthetic_db.load_status_arrays)['ordinal'])
+
+
+def bench_query_visits(benchmark, synthetic_db, plan):
+    res = benchmark(synthetic_db.query_visits, plan['start'], plan['end'], [4, 5, 6], {'a_absent': True})
+    assert isinstance(res, list)
+
+
+def bench_find_unreferenced_patterns(benchmark, synthetic_db, plan):
+    benchmark(synthetic_db.find_unreferenced_patterns, plan['start'], plan['end'])
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from kidscompass.charts import create_pie_chart
+from kidscompass.ics_export import plan_to_ics
+
+
+def bench_create_pie_chart(benchmark, tmp_path):
+    out = str(tmp_path / 'pie.png')
+    benchmark(create_pie_chart, [70, 20, 10], ['Beide da', 'Mind. 1 fehlt', 'Beide fehlen'], out)
+    assert os.path.exists(out)
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    from PySide6.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
+
+
+def bench_pdf_export(benchmark, qapp, plan, tmp_path, monkeypatch):
+    from kidscompass.ui import ExportWorker
+    # ExportWorker erwartet die Diagramm-PNGs im Arbeitsverzeichnis
+    monkeypatch.chdir(tmp_path)
+    for fn in ('kind_a.png', 'kind_b.png', 'both.png'):
+        create_pie_chart([1, 1], ['a', 'b'], fn)
+    out = str(tmp_path / 'report.pdf')
+    errors = []
+
+    def run():
+        worker = ExportWorker(None, plan['start'], plan['end'], plan['patterns'], plan['overrides'],
+                              plan['status'], out_fn=out)
+        worker.error.connect(errors.append)
+        worker.run()
+
+    benchmark(run)
+    assert not errors and os.path.exists(out)
+
+
+def bench_statistics_csv_export(benchmark, synthetic_db, plan, tmp_path):
+    from kidscompass.stats_export import write_statistics_csv
+    out = str(tmp_path / 'stats.csv')
+    assert benchmark(write_statistics_csv, synthetic_db, out, plan['start'], plan['end']) > 0
+
+
+def bench_plan_ics_export(benchmark, plan):
+    # Umgangsplan als iCalendar mit RRULE/EXDATE statt eines Termins je Tag
+    text, stats = benchmark(plan_to_ics, plan['patterns'], plan['overrides'], plan['start'], plan['end'])
+    assert stats['events'] < stats['days']
@@ -0,0 +1,28 @@
+from kidscompass.calendar_logic import apply_overrides, generate_standard_days
+from kidscompass.statistics import calculate_trends, count_missing_by_weekday, custody_summary, summarize_visits
+
+
+def _planned(plan):
+    years = range(plan['start'].year, plan['end'].year + 1)
+    standard = sum((generate_standard_days(p, y) for p in plan['patterns'] for y in years), [])
+    return apply_overrides(standard, plan['overrides'])
+
+
+def bench_summarize_visits(benchmark, plan):
+    planned = _planned(plan)
+    stats = benchmark(summarize_visits, planned, plan['status'])
+    assert stats['total'] == len(planned)
+
+
+def bench_count_missing_by_weekday(benchmark, synthetic_db):
+    assert benchmark(count_missing_by_weekday, synthetic_db)
+
+
+def bench_calculate_trends(benchmark, synthetic_db, plan):
+    visits = synthetic_db.query_visits(plan['start'], plan['end'], [], {})
+    assert benchmark(calculate_trends, visits, 'monthly')['periods']
+
+
+def bench_custody_summary(benchmark, plan):
+    totals = benchmark(custody_summary, plan['patterns'], plan['overrides'], plan['start'], plan['end'])
+    assert sum(totals['by_holder'].values()) == totals['days']
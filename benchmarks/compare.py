@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Compare two benchmark result files (own JSON or pytest-benchmark --benchmark-json).
+Usage: compare.py BASELINE.json CURRENT.json [--threshold 1.2]
+Exits with status 1 if any benchmark's median got slower than threshold x baseline.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    out = {}
+    for b in data.get('benchmarks', []):
+        stats = b.get('stats', b)  # pytest-benchmark legt Werte unter 'stats' ab
+        out[b.get('fullname') or b['name']] = stats['median']
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('baseline')
+    ap.add_argument('current')
+    ap.add_argument('--threshold', type=float, default=1.2, help='erlaubter Faktor (Standard 1.2)')
+    args = ap.parse_args()
+    base, cur = load(args.baseline), load(args.current)
+    regressions = 0
+    for name in sorted(set(base) | set(cur)):
+        if name not in base or name not in cur:
+            print(f'{name:70s} {"neu" if name in cur else "entfernt"}')
+            continue
+        ratio = cur[name] / base[name] if base[name] else float('inf')
+        flag = ''
+        if ratio > args.threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f'{name:70s} {base[name] * 1000:9.2f} ms -> {cur[name] * 1000:9.2f} ms  ({ratio:4.2f}x){flag}')
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
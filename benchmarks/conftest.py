@@ -0,0 +1,115 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import date, datetime
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+from synthetic import DEFAULT_SIZES, build_synthetic_db
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+try:
+    import pytest_benchmark  # noqa: F401
+    HAVE_PYTEST_BENCHMARK = True
+except ImportError:
+    HAVE_PYTEST_BENCHMARK = False
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('kidscompass benchmarks')
+    group.addoption('--bench-rounds', type=int, default=5,
+                    help='Messrunden pro Benchmark (ohne pytest-benchmark)')
+    group.addoption('--bench-json', default=None,
+                    help='Ergebnisdatei (Standard: benchmarks/results/<zeitstempel>.json)')
+
+
+def sizes():
+    return {k: int(os.environ.get(f'KC_BENCH_{k.upper()}', v)) for k, v in DEFAULT_SIZES.items()}
+
+
+@pytest.fixture(scope='session')
+def bench_sizes():
+    return sizes()
+
+
+@pytest.fixture(scope='session')
+def synthetic_db(tmp_path_factory, bench_sizes):
+    path = tmp_path_factory.mktemp('bench') / 'synthetic.db'
+    db = build_synthetic_db(str(path), bench_sizes['patterns'], bench_sizes['overrides'], bench_sizes['years'])
+    yield db
+    db.close()
+
+
+@pytest.fixture(scope='session')
+def plan(synthetic_db, bench_sizes):
+    """Geladene Musters/Overrides/Status plus Zeitraum der synthetischen DB."""
+    last = 2025
+    return {
+        'patterns': synthetic_db.load_patterns(),
+        'overrides': synthetic_db.load_overrides(),
+        'status': synthetic_db.load_all_status(),
+        'start': date(last - bench_sizes['years'] + 1, 1, 1),
+        'end': date(last, 12, 31),
+    }
+
+
+_RESULTS = []
+
+
+class _Benchmark:
+    """Minimaler Ersatz für die pytest-benchmark-Fixture: benchmark(fn, *args, **kwargs)."""
+
+    def __init__(self, name, rounds):
+        self.name = name
+        self.rounds = rounds
+        self.extra_info = {}
+
+    def __call__(self, fn, *args, **kwargs):
+        result = fn(*args, **kwargs)  # Aufwärmen
+        times = []
+        for _ in range(self.rounds):
+            t0 = time.perf_counter()
+            result = fn(*args, **kwargs)
+            times.append(time.perf_counter() - t0)
+        _RESULTS.append({
+            'name': self.name,
+            'rounds': self.rounds,
+            'min': min(times),
+            'max': max(times),
+            'mean': statistics.fmean(times),
+            'median': statistics.median(times),
+            'stddev': statistics.stdev(times) if len(times) > 1 else 0.0,
+            'extra_info': self.extra_info,
+        })
+        return result
+
+
+if not HAVE_PYTEST_BENCHMARK:
+    @pytest.fixture
+    def benchmark(request):
+        return _Benchmark(request.node.nodeid, request.config.getoption('--bench-rounds'))
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if HAVE_PYTEST_BENCHMARK or not _RESULTS:
+        return
+    out = session.config.getoption('--bench-json')
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d_%H%M%S') + '.json')
+    payload = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': {'python': sys.version.split()[0], 'platform': platform.platform()},
+        'sizes': sizes(),
+        'benchmarks': _RESULTS,
+    }
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+    print(f'\nBenchmark-Ergebnisse: {out}')
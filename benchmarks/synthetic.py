@@ -0,0 +1,70 @@
+"""Synthetische KidsCompass-Daten für Benchmarks (deterministisch per Seed)."""
+import random
+from datetime import date, timedelta
+
+from kidscompass.data import Database
+
+# Standardgrößen; per Umgebungsvariable KC_BENCH_PATTERNS / _OVERRIDES / _YEARS überschreibbar
+DEFAULT_SIZES = {'patterns': 40, 'overrides': 120, 'years': 10}
+
+
+def synthetic_rows(n_patterns: int, n_overrides: int, years: int, end_year: int = 2025, seed: int = 42):
+    """
+    Erzeugt Zeilen für patterns, overrides (add/remove) und visit_status.
+    Liefert (patterns, overrides, status) als Tupel-Listen im ISO-Textformat.
+    """
+    rnd = random.Random(seed)
+    first = date(end_year - years + 1, 1, 1)
+    last = date(end_year, 12, 31)
+    span = (last - first).days
+
+    patterns = []
+    for _ in range(n_patterns):
+        start = first + timedelta(days=rnd.randrange(span))
+        end = None if rnd.random() < 0.4 else min(last, start + timedelta(days=rnd.randrange(60, 900)))
+        wds = sorted(rnd.sample(range(7), rnd.randint(1, 3)))
+        patterns.append((','.join(map(str, wds)), rnd.choice((1, 1, 2, 2, 3, 4)),
+                         start.isoformat(), end.isoformat() if end else None))
+
+    overrides = []
+    for _ in range(n_overrides):
+        frm = first + timedelta(days=rnd.randrange(span))
+        to = frm + timedelta(days=rnd.randrange(2, 21))
+        if rnd.random() < 0.6:
+            overrides.append(('add', frm.isoformat(), to.isoformat(), rnd.choice(('mother', 'father')),
+                              rnd.choice(('sommer', 'herbst', 'oster', 'weihnachten', None))))
+        else:
+            overrides.append(('remove', frm.isoformat(), to.isoformat(), None, None))
+
+    status = []
+    d = first
+    while d <= last:
+        if rnd.random() < 0.45:
+            a, b = rnd.random() > 0.15, rnd.random() > 0.2
+            status.append((d.isoformat(), (0 if a else 1) | (0 if b else 2)))  # absent_mask
+        d += timedelta(days=1)
+    return patterns, overrides, status
+
+
+def build_synthetic_db(path: str, n_patterns: int, n_overrides: int, years: int,
+                       end_year: int = 2025, seed: int = 42) -> Database:
+    """Legt eine DB mit N Mustern, M Overrides und Y Jahren Besuchsstatus an."""
+    patterns, overrides, status = synthetic_rows(n_patterns, n_overrides, years, end_year, seed)
+    db = Database(path)
+    with db.conn:
+        cur = db.conn.cursor()
+        cur.executemany(
+            "INSERT INTO patterns (weekdays, interval_weeks, start_date, end_date) VALUES (?,?,?,?)", patterns)
+        for typ, frm, to, holder, vac_type in overrides:
+            pid = None
+            if typ == 'add':
+                # Ferienumgang: eigenes Muster über den gesamten Zeitraum
+                cur.execute("INSERT INTO patterns (weekdays, interval_weeks, start_date, end_date) "
+                            "VALUES ('0,1,2,3,4,5,6', 1, ?, ?)", (frm, to))
+                pid = cur.lastrowid
+            cur.execute(
+                "INSERT INTO overrides (type, from_date, to_date, pattern_id, holder, vac_type) VALUES (?,?,?,?,?,?)",
+                (typ, frm, to, pid, holder, vac_type))
+        cur.executemany(
+            "INSERT INTO visit_status (day, absent_mask) VALUES (?,?)", status)
+    return db
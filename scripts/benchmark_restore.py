@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Compare restore timings: legacy executescript path vs. streamed dump and snapshot restore.
+Usage: benchmark_restore.py [years] [repeats]
+Builds a synthetic DB in a temp dir (default: 20 years of daily visit_status rows),
+exports it as SQL dump and binary snapshots and restores each variant `repeats` times.
+"""
+import os, sys, shutil, sqlite3, tempfile, time, datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / 'src'
+sys.path.insert(0, str(SRC))
+
+from kidscompass.data import Database
+from kidscompass.models import VisitPattern, OverridePeriod, VisitStatus
+
+
+def build_db(path, years):
+    db = Database(str(path))
+    start = datetime.date(2025 - years, 1, 1)
+    with db.conn:
+        for i in range(years * 4):
+            db.conn.execute(
+                "INSERT INTO patterns (weekdays, interval_weeks, start_date, end_date, label) VALUES (?,?,?,?,?)",
+                ('4,5,6', 1 + i % 3, (start + datetime.timedelta(days=91 * i)).isoformat(), None, f'Muster {i}'))
+        rows = []
+        d = start
+        while d.year < 2025:
+            a, b = d.day % 3 != 0, d.day % 5 != 0
+            rows.append((d.isoformat(), (0 if a else 1) | (0 if b else 2)))  # absent_mask
+            d += datetime.timedelta(days=1)
+        db.conn.executemany("INSERT INTO visit_status (day, absent_mask) VALUES (?,?)", rows)
+    return db
+
+
+def legacy_restore(db_path, dump):
+    """The pre-streaming implementation: read whole file, executescript, copy twice."""
+    with open(dump, 'r', encoding='utf-8') as f:
+        script = f.read()
+    tmpdb = db_path + '.legacy_tmp.db'
+    conn = sqlite3.connect(tmpdb)
+    conn.executescript(script)
+    conn.commit()
+    conn.close()
+    shutil.copy2(db_path, db_path + '.legacy_bak')
+    shutil.copy2(tmpdb, db_path)
+    os.remove(tmpdb)
+    os.remove(db_path + '.legacy_bak')
+
+
+def timed(fn, repeats):
+    best = None
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    work = Path(tempfile.mkdtemp(prefix='kc_bench_restore_'))
+    try:
+        src = build_db(work / 'source.db', years)
+        dump = str(work / 'dump.sql')
+        src.export_to_sql(dump)
+        snap = src.backup_to_file(str(work / 'snap.db'))
+        snap_gz = src.backup_to_file(str(work / 'snap.db.gz'), compression='gzip')
+        src.close()
+        print(f'Dump: {os.path.getsize(dump) / 1e6:.1f} MB, snapshot: {os.path.getsize(snap) / 1e6:.1f} MB, '
+              f'gzip: {os.path.getsize(snap_gz) / 1e6:.1f} MB')
+
+        target = str(work / 'target.db')
+        Database(target).close()
+
+        def restore(fn):
+            def run():
+                db = Database(target)
+                db.atomic_import_from_sql(fn)
+                db.close()
+            return run
+
+        results = [
+            ('legacy executescript', timed(lambda: legacy_restore(target, dump), repeats)),
+            ('streamed SQL dump', timed(restore(dump), repeats)),
+            ('binary snapshot', timed(restore(snap), repeats)),
+            ('gzip snapshot', timed(restore(snap_gz), repeats)),
+        ]
+        base = results[0][1]
+        for name, t in results:
+            print(f'{name:22s} {t * 1000:9.1f} ms  ({base / t:4.1f}x)')
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,54 +1,71 @@
+#!/usr/bin/env python3
+"""List or restore snapshots from the rolling backup store (<db_dir>/backups/index.json).
+Usage: restore_from_backup.py [--db PATH] [--list | SNAPSHOT_ID | latest | FILE]
+Without arguments the available snapshots are listed. A snapshot id (or 'latest')
+restores that snapshot; any other existing file (SQL dump or snapshot) is restored directly.
+The current DB state is snapshotted into the store before it is replaced.
+"""
 import os
 import sys
-import sqlite3
-import datetime
-
-backup_fn = r"C:\Users\oneaboveall\\.kidscompass\\backup_before_cleanup_20250826_075441.sql"
-# target DB path must match Database() default
-db_dir = os.path.join(os.path.expanduser('~'), '.kidscompass')
-db_fn = os.path.join(db_dir, 'kidscompass.db')
-
-print('Backup file:', backup_fn)
-print('Target DB file:', db_fn)
-
-if not os.path.exists(backup_fn):
-    print('ERROR: Backup file not found. Exiting.')
-    sys.exit(1)
-
-# Ensure target directory exists
-os.makedirs(db_dir, exist_ok=True)
-
-# If DB exists, move it to a timestamped backup
-if os.path.exists(db_fn):
-    ts = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-    old = db_fn + f'.broken_before_restore_{ts}'
-    print('Renaming existing DB to:', old)
-    os.replace(db_fn, old)
-
-# Create new DB and execute SQL
-print('Restoring...')
-conn = sqlite3.connect(db_fn)
-try:
-    cur = conn.cursor()
-    with open(backup_fn, 'r', encoding='utf-8') as f:
-        sql = f.read()
-    conn.executescript(sql)
-    conn.commit()
-    print('Restore completed successfully.')
-except Exception as e:
-    print('Restore failed:', e)
-    # Cleanup: remove possibly partially created DB
+import argparse
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / 'src'
+sys.path.insert(0, str(SRC))
+
+from kidscompass.data import Database
+from kidscompass.backups import BackupStore
+
+
+def default_db_path():
+    return os.path.join(os.path.expanduser('~'), '.kidscompass', 'kidscompass.db')
+
+
+def print_snapshots(store):
+    entries = store.list_snapshots()
+    if not entries:
+        print('Keine Snapshots in', store.backup_dir)
+        return
+    print(f'Snapshots in {store.backup_dir}:')
+    for e in entries:
+        print(f"  {e['id']}  {e['created']}  {e['size'] / 1024:8.1f} KB  {e.get('reason') or '-'}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--db', default=default_db_path(), help='Pfad zur KidsCompass-DB')
+    ap.add_argument('--list', action='store_true', help='Snapshots auflisten')
+    ap.add_argument('source', nargs='?', help="Snapshot-ID, 'latest' oder Datei")
+    args = ap.parse_args()
+
+    store = BackupStore(args.db)
+    if args.list or not args.source:
+        print_snapshots(store)
+        return
+
+    if os.path.exists(args.source):
+        fn = args.source
+    else:
+        entry = store.latest() if args.source == 'latest' else store.get(args.source)
+        if entry is None:
+            print('ERROR: Snapshot nicht gefunden:', args.source)
+            print_snapshots(store)
+            sys.exit(1)
+        fn = store.path_for(entry)
+
+    print('Restore from:', fn)
+    print('Target DB file:', args.db)
+    db = Database(args.db)
     try:
-        conn.close()
-    except Exception:
-        pass
-    if os.path.exists(db_fn):
-        try:
-            os.remove(db_fn)
-        except Exception:
-            pass
-    sys.exit(2)
-finally:
-    conn.close()
-
-print('Done.')
+        db.atomic_import_from_sql(fn)
+        print('Restore complete.')
+    except Exception as e:
+        print('Restore failed:', e)
+        sys.exit(2)
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
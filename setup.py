@@ -10,6 +10,7 @@ setup(
         "ntplib",
         "python-dateutil",
         "PySide6",
+        "numpy",
         "matplotlib",
         "reportlab",
     ],
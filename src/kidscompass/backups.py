@@ -0,0 +1,195 @@
+import datetime as _dt
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+from typing import Dict, List, Optional
+
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+# Standard-Aufbewahrung: letzte N Snapshots + je einer pro Tag / Monat
+DEFAULT_RETENTION = {'keep_last': 10, 'keep_daily': 7, 'keep_monthly': 12}
+# Journal und abgeleitete Aggregate ändern sich auch ohne inhaltliche Änderung (z. B. Eintrag
+# und Rücknahme eines Status); sie zählen nicht zum Inhalt eines Snapshots
+_NON_CONTENT_TABLES = ('changes', 'monthly_stats', 'monthly_stats_sync')
+
+
+def default_backup_dir(db_path: str) -> str:
+    """Backup-Verzeichnis neben der DB: <db_dir>/backups"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), 'backups')
+
+
+def _sha256_content(path: str) -> str:
+    """
+    Prüfsumme über den logischen Inhalt einer DB-Datei: Schemaversion, Schema und Zeilen
+    der Nutzertabellen (sortiert), ohne Journal/Aggregate und SQLite-interne Tabellen.
+    """
+    h = hashlib.sha256()
+    conn = sqlite3.connect(path)
+    try:
+        h.update(repr(conn.execute("PRAGMA user_version").fetchone()).encode())
+        tables = [r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+            if r[0] not in _NON_CONTENT_TABLES]
+        for tbl in tables:
+            sql = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (tbl,)).fetchone()[0]
+            h.update(f"\0{tbl}\0{sql}\0".encode())
+            n_cols = len(conn.execute(f'PRAGMA table_info("{tbl}")').fetchall())
+            order = ', '.join(str(i) for i in range(1, n_cols + 1))
+            for row in conn.execute(f'SELECT * FROM "{tbl}" ORDER BY {order}'):
+                h.update(repr(row).encode())
+                h.update(b'\n')
+    finally:
+        conn.close()
+    return h.hexdigest()
+
+
+class BackupStore:
+    """
+    Rollierender Snapshot-Speicher für die KidsCompass-DB.
+
+    Snapshots werden über die sqlite3-Backup-API erzeugt und inhaltsadressiert
+    (`<sha256>.db`, Prüfsumme über Nutzertabellen ohne Änderungsjournal) im
+    Backup-Verzeichnis abgelegt; identische Inhalte teilen sich eine Datei. `index.json` listet alle Snapshots (neueste zuletzt) und erlaubt
+    schnelles Auflisten ohne die Dateien zu öffnen.
+    """
+
+    def __init__(self, db_path: str, backup_dir: str | None = None, keep_last: int | None = None,
+                 keep_daily: int | None = None, keep_monthly: int | None = None):
+        self.db_path = os.fspath(db_path)
+        self.backup_dir = os.fspath(backup_dir) if backup_dir else default_backup_dir(self.db_path)
+        self.keep_last = DEFAULT_RETENTION['keep_last'] if keep_last is None else keep_last
+        self.keep_daily = DEFAULT_RETENTION['keep_daily'] if keep_daily is None else keep_daily
+        self.keep_monthly = DEFAULT_RETENTION['keep_monthly'] if keep_monthly is None else keep_monthly
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.backup_dir, INDEX_FILE)
+
+    # Index
+    def _load_index(self) -> Dict:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                idx = json.load(f)
+            if isinstance(idx, dict) and isinstance(idx.get('entries'), list):
+                return idx
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Backup-Index {self.index_path} unlesbar, wird neu angelegt: {e}")
+        return {'version': INDEX_VERSION, 'entries': []}
+
+    def _write_index(self, idx: Dict):
+        os.makedirs(self.backup_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.index_', suffix='.json', dir=self.backup_dir)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(idx, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.index_path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def list_snapshots(self) -> List[Dict]:
+        """Alle Snapshots aus dem Index, neueste zuerst."""
+        return list(reversed(self._load_index()['entries']))
+
+    def latest(self) -> Optional[Dict]:
+        entries = self._load_index()['entries']
+        return entries[-1] if entries else None
+
+    def get(self, snapshot_id: str) -> Optional[Dict]:
+        for e in self._load_index()['entries']:
+            if e['id'] == snapshot_id:
+                return e
+        return None
+
+    def path_for(self, entry: Dict) -> str:
+        return os.path.join(self.backup_dir, entry['file'])
+
+    # Snapshots
+    def snapshot(self, conn: sqlite3.Connection | None = None, reason: str = '',
+                 now: _dt.datetime | None = None) -> Dict:
+        """
+        Snapshot der DB anlegen. Ist der Inhalt (Nutzertabellen, siehe _sha256_content)
+        identisch mit dem letzten Snapshot, wird kein neuer Eintrag angelegt und der
+        vorhandene zurückgegeben (Schlüssel 'skipped': True). Danach wird die Aufbewahrung angewendet.
+        """
+        now = now or _dt.datetime.now()
+        os.makedirs(self.backup_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.snap_', suffix='.db', dir=self.backup_dir)
+        os.close(fd)
+        try:
+            src = conn if conn is not None else sqlite3.connect(self.db_path)
+            dst = sqlite3.connect(tmp)
+            try:
+                src.backup(dst)
+            finally:
+                dst.close()
+                if conn is None:
+                    src.close()
+            digest = _sha256_content(tmp)
+
+            idx = self._load_index()
+            last = idx['entries'][-1] if idx['entries'] else None
+            if last and last['sha256'] == digest and os.path.exists(self.path_for(last)):
+                return dict(last, skipped=True)
+
+            fname = f"{digest}.db"
+            target = os.path.join(self.backup_dir, fname)
+            if os.path.exists(target):
+                os.remove(tmp)  # gleicher Inhalt schon gespeichert (Deduplizierung)
+            else:
+                os.replace(tmp, target)
+            entry = {
+                'id': f"{now.strftime('%Y%m%d_%H%M%S_%f')}_{digest[:8]}",
+                'created': now.isoformat(timespec='seconds'),
+                'reason': reason,
+                'sha256': digest,
+                'file': fname,
+                'size': os.path.getsize(target),
+                'db': os.path.basename(self.db_path),
+            }
+            idx['entries'].append(entry)
+            self._write_index(idx)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.prune()
+        return dict(entry, skipped=False)
+
+    def prune(self) -> List[Dict]:
+        """Wendet die Aufbewahrung (letzte N / täglich / monatlich) an; gibt entfernte Einträge zurück."""
+        idx = self._load_index()
+        entries = idx['entries']
+        keep_ids = {e['id'] for e in entries[-self.keep_last:]} if self.keep_last > 0 else set()
+        for key_len, limit in ((10, self.keep_daily), (7, self.keep_monthly)):
+            seen = []
+            for e in reversed(entries):
+                bucket = e['created'][:key_len]  # 'YYYY-MM-DD' bzw. 'YYYY-MM'
+                if bucket in seen:
+                    continue
+                if len(seen) >= limit:
+                    break
+                seen.append(bucket)
+                keep_ids.add(e['id'])
+
+        kept = [e for e in entries if e['id'] in keep_ids]
+        removed = [e for e in entries if e['id'] not in keep_ids]
+        if not removed:
+            return []
+        idx['entries'] = kept
+        self._write_index(idx)
+        still_used = {e['file'] for e in kept}
+        for e in removed:
+            if e['file'] in still_used:
+                continue
+            path = self.path_for(e)
+            try:
+                if os.path.exists(path):
+                    os.remove(path)
+            except OSError as ex:
+                logging.warning(f"Backup {path} konnte nicht gelöscht werden: {ex}")
+        return removed
@@ -1,6 +1,9 @@
 from datetime import date, timedelta
-from typing import List, Union
+from typing import Iterator, List, Optional, Tuple, Union
 from .models import VisitPattern, OverridePeriod, RemoveOverride, VisitStatus
+# Nur die äußeren Funktionen messen: generate_standard_days/first_occurrence laufen je Muster und
+# Tag (is_planned) und werden über ihre Aufrufer erfasst (monthly_stats, compute_statistics, ...)
+from .instrumentation import timed
 
 
 def generate_standard_days(pattern: VisitPattern, year: int) -> List[date]:
@@ -32,6 +35,125 @@ def generate_standard_days(pattern: VisitPattern, year: int) -> List[date]:
     return sorted(set(dates))
 
 
+class PlannedIndex:
+    """
+    Bitmap der geplanten Tage (ein Byte je Tag ab dem frühesten geplanten Tag) für
+    schnelle Zugehörigkeitstests und Sprünge zum nächsten geplanten Tag.
+    """
+
+    def __init__(self, days):
+        days = sorted(set(days))
+        self.first = days[0] if days else None
+        self.last = days[-1] if days else None
+        self._base = self.first.toordinal() if days else 0
+        self._bits = bytearray(self.last.toordinal() - self._base + 1 if days else 0)
+        for d in days:
+            self._bits[d.toordinal() - self._base] = 1
+
+    def __len__(self) -> int:
+        return self._bits.count(1)
+
+    def __contains__(self, day: date) -> bool:
+        i = day.toordinal() - self._base
+        return 0 <= i < len(self._bits) and self._bits[i] == 1
+
+    def next_planned(self, day: date) -> Optional[date]:
+        """Erster geplanter Tag am oder nach `day` (None, wenn keiner mehr folgt)."""
+        i = self._bits.find(1, max(0, day.toordinal() - self._base))
+        return date.fromordinal(self._base + i) if i >= 0 else None
+
+
+def first_occurrence(pattern: VisitPattern, on_or_after: date,
+                     predicate_index: Optional[PlannedIndex] = None) -> Optional[date]:
+    """
+    Erster Termin des Musters am oder nach `on_or_after`, ohne Termine zu erzeugen.
+    Folgt der Logik von generate_standard_days: die Wochen-Raster werden in jedem
+    Jahr ab max(1. Januar, start_date) neu angesetzt. Spätestens im Folgejahr liegt
+    ein Termin in der ersten Januarwoche, daher genügen zwei Jahre.
+
+    Mit `predicate_index` wird der erste Termin gesucht, der auch im Index (z.B. den
+    geplanten Tagen nach Overrides) liegt: abwechselnd nächster Mustertermin und
+    nächster geplanter Tag, bis beide übereinstimmen.
+    """
+    if predicate_index is None:
+        return _first_occurrence(pattern, on_or_after)
+    cursor = on_or_after
+    while True:
+        cursor = predicate_index.next_planned(cursor)
+        if cursor is None:
+            return None
+        occ = _first_occurrence(pattern, cursor)
+        if occ is None or occ in predicate_index:
+            return occ
+        cursor = occ
+
+
+def _first_occurrence(pattern: VisitPattern, on_or_after: date) -> Optional[date]:
+    if not pattern.weekdays:
+        return None
+    step = 7 * max(1, pattern.interval_weeks)
+    year = max(on_or_after.year, pattern.start_date.year)
+    for y in (year, year + 1):
+        cursor = max(date(y, 1, 1), pattern.start_date)
+        target = max(cursor, on_or_after)
+        limit = date(y, 12, 31)
+        if pattern.end_date is not None:
+            limit = min(limit, pattern.end_date)
+        best = None
+        for wd in pattern.weekdays:
+            first = cursor + timedelta(days=(wd - cursor.weekday() + 7) % 7)
+            if first < target:
+                k = -(-(target - first).days // step)  # aufrunden
+                first += timedelta(days=k * step)
+            if first <= limit and (best is None or first < best):
+                best = first
+        if best is not None:
+            return best
+        if pattern.end_date is not None and pattern.end_date <= limit:
+            return None
+    return None
+
+
+def is_planned(day: date, patterns: List[VisitPattern],
+               overrides: List[Union[OverridePeriod, RemoveOverride]]) -> bool:
+    """
+    Einzeltag-Variante von generate_standard_days + apply_overrides: ist `day` ein
+    geplanter Umgangstag? Overrides werden in Listenreihenfolge angewendet.
+    """
+    planned = any(first_occurrence(p, day) == day for p in patterns)
+    for ov in overrides:
+        if ov.from_date <= day <= ov.to_date:
+            planned = isinstance(ov, OverridePeriod) and first_occurrence(ov.pattern, day) == day
+    return planned
+
+
+def iter_planned_days(
+    patterns: List[VisitPattern],
+    overrides: List[Union[OverridePeriod, RemoveOverride]],
+    start: date,
+    end: date,
+) -> Iterator[Tuple[date, Optional[OverridePeriod]]]:
+    """
+    Geplante Tage in [start, end] aufsteigend als (Tag, Override) – Override ist die
+    OverridePeriod, aus der der Tag stammt (None bei Standard-Terminen). Erzeugt wird
+    jahresweise, der Speicherbedarf hängt also nicht von der Länge des Zeitraums ab.
+    """
+    for year in range(start.year, end.year + 1):
+        y0, y1 = max(start, date(year, 1, 1)), min(end, date(year, 12, 31))
+        year_ovs = [ov for ov in overrides if ov.from_date <= y1 and ov.to_date >= y0]
+        raw = [d for p in patterns for d in generate_standard_days(p, year)]
+        for d in apply_overrides(raw, year_ovs):
+            if not y0 <= d <= y1:
+                continue
+            # wirksam ist das letzte Override, das den Tag abdeckt (vgl. apply_overrides)
+            source = None
+            for ov in year_ovs:
+                if ov.from_date <= d <= ov.to_date:
+                    source = ov
+            yield d, source if isinstance(source, OverridePeriod) else None
+
+
+@timed('calendar.apply_overrides')
 def apply_overrides(
     standard_days: List[date],
     overrides: List[Union[OverridePeriod, RemoveOverride]]
@@ -55,3 +55,106 @@ def create_pie_chart(values: list[int], labels: list[str], filename: str, colors
         plt.close(fig)
         return wedges, texts, autotexts
     plt.close(fig)
+
+
+TREND_COLORS = ['#1976d2', '#d32f2f', '#388e3c', '#f57c00', '#7b1fa2']
+
+
+def render_trend_chart(periods: list, mode: str, period_title: str, names=None) -> bytes:
+    """
+    Trend-Diagramm (Anwesenheit in % je Zeitraum) als PNG-Bytes, ohne Umweg über Dateien.
+    :param periods: Liste (Label, [anwesend je Kind], geplant) je Zeitraum.
+    :param mode: Auswahl im Statistik-Tab (nur für den Titel).
+    :param names: Namen der Kinder in der Reihenfolge der Anwesenheitswerte (eine Linie je Kind).
+    """
+    import io
+    import matplotlib.patches as mpatches
+
+    n_series = len(periods[0][1]) if periods else 0
+    names = list(names or [])[:n_series] or [mode] * n_series
+    x, series, zero_period_indices = [], [[] for _ in range(n_series)], []
+    for idx, (label, present, planned_count) in enumerate(periods):
+        for ys, att in zip(series, present):
+            # Zeiträume ohne geplante Tage: Linienlücke (NaN) und grauer Hintergrund
+            ys.append(round(att / planned_count * 100, 1) if planned_count else float('nan'))
+        if planned_count == 0:
+            zero_period_indices.append(idx)
+        x.append(label)
+
+    fig, ax = plt.subplots(figsize=(6, 3))
+    xpos = list(range(len(x)))
+    for i, (ys, name) in enumerate(zip(series, names)):
+        ax.plot(xpos, ys, marker='o', color=TREND_COLORS[i % len(TREND_COLORS)],
+                label=name if n_series > 1 else None)
+    ax.set_xticks(xpos)
+    ax.set_xticklabels(x)
+
+    for idx in zero_period_indices:
+        ax.axvspan(idx - 0.45, idx + 0.45, color='lightgrey', alpha=0.5)
+    if zero_period_indices:
+        grey_patch = mpatches.Patch(color='lightgrey', alpha=0.5, label='Ferien / kein geplanter Umgang')
+        handles, labels = ax.get_legend_handles_labels()
+        handles.append(grey_patch)
+        ax.legend(handles=handles)
+    elif n_series > 1:
+        ax.legend()
+
+    ax.set_title(f'Anwesenheit {mode} ({period_title})')
+    ax.set_xlabel('Zeitraum')
+    ax.set_ylabel('Anwesenheit (%)')
+    ax.set_ylim(0, 105)
+    ax.grid(True, linestyle=':')
+    plt.setp(ax.get_xticklabels(), rotation=30, ha='right')
+    fig.tight_layout()
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format='png', bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return buf.getvalue()
+
+
+# Farben wie im Kalender: kein Umgang, geplant, teilweise abwesend (nicht alle Kinder da), alle fehlen
+HEATMAP_COLORS = ['#f2f2f2', '#A0C4FF', '#FFD97D', '#FFADAD']
+HEATMAP_LABELS = ['kein Umgang', 'geplant / anwesend', 'teilweise abwesend', 'alle fehlen']
+
+
+def render_year_heatmap(grids: dict, title: str = 'Umgänge je Jahr') -> bytes:
+    """
+    Kalender-Heatmap (Wochen x Wochentage) je Jahr als PNG-Bytes.
+    :param grids: {Jahr: 7x54-Raster} aus statistics.year_heatmap_grids (NaN = kein Tag des Jahres).
+    Pro Jahr genau ein imshow-Aufruf, keine Artists je Tag.
+    """
+    import io
+    import numpy as np
+    import matplotlib.patches as mpatches
+    from matplotlib.colors import ListedColormap
+
+    cmap = ListedColormap(HEATMAP_COLORS).with_extremes(bad='white')
+    years = sorted(grids)
+    height = 1.1 * len(years) + 0.8
+    fig, axes = plt.subplots(len(years), 1, figsize=(9, height), squeeze=False)
+    month_ticks = [d // 7 for d in (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)]
+    for ax, year in zip(axes[:, 0], years):
+        ax.imshow(np.ma.masked_invalid(grids[year]), cmap=cmap, vmin=-0.5, vmax=len(HEATMAP_COLORS) - 0.5,
+                  interpolation='nearest', aspect='equal')
+        ax.set_yticks([0, 2, 4, 6])
+        ax.set_yticklabels(['Mo', 'Mi', 'Fr', 'So'], fontsize=6)
+        ax.set_xticks(month_ticks)
+        ax.set_xticklabels(['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez'],
+                           fontsize=6)
+        ax.set_ylabel(str(year), fontsize=8)
+        ax.tick_params(length=0)
+        for side in ax.spines.values():
+            side.set_visible(False)
+    handles = [mpatches.Patch(color=c, label=l) for c, l in zip(HEATMAP_COLORS, HEATMAP_LABELS)]
+    fig.legend(handles=handles, loc='lower center', ncol=len(handles), fontsize=7, frameon=False)
+    fig.suptitle(title, fontsize=9)
+    # feste Ränder statt tight_layout (bei vielen Jahren deutlich schneller)
+    fig.subplots_adjust(left=0.07, right=0.99, top=1 - 0.45 / height, bottom=0.45 / height, hspace=0.35)
+    buf = io.BytesIO()
+    try:
+        fig.savefig(buf, format='png', dpi=100)
+    finally:
+        plt.close(fig)
+    return buf.getvalue()
@@ -0,0 +1,140 @@
+from datetime import date
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from kidscompass.calendar_logic import generate_standard_days
+from kidscompass.instrumentation import timed
+from kidscompass.models import OverridePeriod, RemoveOverride, VisitPattern
+
+# Betreuung je Tag: außerhalb geplanter Umgänge beim Wohnelternteil, an Umgangstagen beim
+# umgangsberechtigten Elternteil; Ferien-Overrides mit `holder` legen den Elternteil fest.
+HOLDERS = ('mother', 'father')
+DEFAULT_HOLDER = 'mother'
+VISIT_HOLDER = 'father'
+NO_VAC = ''
+
+
+def _pattern_offsets(pattern: VisitPattern, start: date, end: date, lo: date, hi: date) -> np.ndarray:
+    """Tages-Offsets (relativ zu `start`) der Mustertermine in [lo, hi]."""
+    lo, hi = max(lo, start), min(hi, end)
+    if lo > hi:
+        return np.empty(0, dtype=np.int64)
+    base = start.toordinal()
+    days = [d.toordinal() - base for y in range(lo.year, hi.year + 1)
+            for d in generate_standard_days(pattern, y) if lo <= d <= hi]
+    return np.asarray(days, dtype=np.int64)
+
+
+@timed('custody.resolve_holders')
+def resolve_holders(patterns: List[VisitPattern],
+                    overrides: List[Union[OverridePeriod, RemoveOverride]],
+                    start: date, end: date,
+                    default_holder: str = DEFAULT_HOLDER,
+                    visit_holder: str = VISIT_HOLDER) -> Dict:
+    """
+    Wirksamer Elternteil für jeden Tag in [start, end] in einem Durchlauf über Muster und
+    Overrides (Listenreihenfolge, das letzte Override gewinnt – wie apply_overrides):
+      - Standard-Termine der Muster -> `visit_holder`, übrige Tage -> `default_holder`
+      - RemoveOverride: Tage im Zeitraum zurück an `default_holder`
+      - OverridePeriod: Tage im Zeitraum zunächst `default_holder`, die Termine des
+        Override-Musters an `ov.holder` (ohne Angabe `visit_holder`); Ferienart für
+        den ganzen Zeitraum aus `ov.vac_type`
+
+    Ergebnis: {'start', 'ordinal', 'holder' (Codes), 'holders' (Namen je Code),
+               'vac' (Codes), 'vac_types' (Namen je Code, 0 = keine Ferien)}
+    """
+    n = max(0, (end - start).days + 1)
+    holders = list(HOLDERS)
+    for h in (default_holder, visit_holder):
+        if h not in holders:
+            holders.append(h)
+    vac_types = [NO_VAC]
+
+    def code(names, name):
+        if name not in names:
+            names.append(name)
+        return names.index(name)
+
+    default_code = code(holders, default_holder)
+    holder = np.full(n, default_code, dtype=np.int16)
+    vac = np.zeros(n, dtype=np.int16)
+
+    visit_code = code(holders, visit_holder)
+    for p in patterns:
+        holder[_pattern_offsets(p, start, end, p.start_date, p.end_date or end)] = visit_code
+
+    base = start.toordinal()
+    for ov in overrides:
+        lo = max(ov.from_date, start)
+        hi = min(ov.to_date, end)
+        if lo > hi:
+            continue
+        i, j = lo.toordinal() - base, hi.toordinal() - base + 1
+        holder[i:j] = default_code
+        vac[i:j] = 0
+        if isinstance(ov, OverridePeriod):
+            ov_code = code(holders, ov.holder or visit_holder)
+            holder[_pattern_offsets(ov.pattern, start, end, lo, hi)] = ov_code
+            if ov.vac_type:
+                vac[i:j] = code(vac_types, ov.vac_type)
+
+    return {
+        'start': start,
+        'ordinal': np.arange(base, base + n, dtype=np.int64),
+        'holder': holder,
+        'holders': holders,
+        'vac': vac,
+        'vac_types': vac_types,
+    }
+
+
+def _month_keys(ordinals: np.ndarray) -> np.ndarray:
+    """Laufender Monatsindex (Jahr*12 + Monat-1) je Tag, ohne Datumsobjekte je Tag."""
+    days = (ordinals - date(1970, 1, 1).toordinal()).astype('datetime64[D]')
+    return days.astype('datetime64[M]').astype(np.int64) + 1970 * 12
+
+
+@timed('custody.custody_totals')
+def custody_totals(resolved: Dict) -> Dict:
+    """
+    Summen aus resolve_holders():
+      by_holder   : {holder: Tage}
+      by_vac_type : {vac_type: {holder: Tage}} (nur Ferientage)
+      by_month    : {(Jahr, Monat): {holder: Tage}}
+    """
+    holder = resolved['holder']
+    names = resolved['holders']
+    nh = len(names)
+    counts = np.bincount(holder, minlength=nh)
+    out = {
+        'days': int(len(holder)),
+        'by_holder': {names[h]: int(counts[h]) for h in range(nh)},
+        'by_vac_type': {},
+        'by_month': {},
+    }
+    vac = resolved['vac']
+    if len(holder) == 0:
+        return out
+    nv = len(resolved['vac_types'])
+    vac_counts = np.bincount(vac.astype(np.int64) * nh + holder, minlength=nv * nh).reshape(nv, nh)
+    for v in range(1, nv):
+        if vac_counts[v].any():
+            out['by_vac_type'][resolved['vac_types'][v]] = {names[h]: int(vac_counts[v, h]) for h in range(nh)}
+
+    months = _month_keys(resolved['ordinal'])
+    first = int(months[0])
+    rel = months - first
+    month_counts = np.bincount(rel * nh + holder, minlength=(int(rel[-1]) + 1) * nh).reshape(-1, nh)
+    for m in range(month_counts.shape[0]):
+        y, mo = divmod(first + m, 12)
+        out['by_month'][(y, mo + 1)] = {names[h]: int(month_counts[m, h]) for h in range(nh)}
+    return out
+
+
+def holder_on(resolved: Dict, day: date) -> Optional[str]:
+    """Elternteil an einem Tag (None außerhalb des Fensters)."""
+    i = day.toordinal() - int(resolved['ordinal'][0]) if len(resolved['ordinal']) else -1
+    if not 0 <= i < len(resolved['holder']):
+        return None
+    return resolved['holders'][int(resolved['holder'][i])]
@@ -6,177 +6,684 @@ import datetime as _dt
 from datetime import date
 from typing import List, Dict
 from pathlib import Path
-from kidscompass.models import VisitPattern, OverridePeriod, RemoveOverride, VisitStatus
-from kidscompass.calendar_logic import generate_standard_days
+from kidscompass.models import VisitPattern, OverridePeriod, RemoveOverride, VisitStatus, Child
+from kidscompass.calendar_logic import first_occurrence, generate_standard_days, apply_overrides
+from kidscompass.backups import BackupStore
+from kidscompass.instrumentation import incr, timed
+from kidscompass import sqltrace
+from kidscompass.migrations import (JOURNAL_TABLES, DATE_COLUMNS, DAYORD, JULIAN_ORDINAL_OFFSET,
+                                    MAX_CHILDREN, legacy_status_row,
+                                    migrate, date_storage, convert_date_storage)
 import logging
 import re
 import shutil
 import time
+import gzip
+import json
+import threading
+
+# Kompressionsformate für binäre Snapshots (sqlite3-Backup-API)
+SNAPSHOT_COMPRESSIONS = (None, 'gzip', 'zstd')
+# Seiten pro Backup-Schritt; zwischen den Schritten wird die Quell-DB freigegeben
+BACKUP_PAGES_PER_STEP = 256
+_COPY_CHUNK = 1024 * 1024
+# Blockgröße beim gestreamten Einspielen von Text-Dumps
+SQL_RESTORE_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def _zstd_module():
+    """Return a zstd implementation (stdlib `compression.zstd` or `zstandard`) or None."""
+    try:
+        from compression import zstd  # Python >= 3.14
+        return zstd
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def compression_for_filename(filename: str):
+    """Leite die Snapshot-Kompression aus der Dateiendung ab ('.gz' -> gzip, '.zst' -> zstd)."""
+    fn = os.fspath(filename).lower()
+    if fn.endswith('.gz'):
+        return 'gzip'
+    if fn.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def _open_compressed_writer(filename: str, compression):
+    if compression is None:
+        return open(filename, 'wb')
+    if compression == 'gzip':
+        return gzip.open(filename, 'wb', compresslevel=6)
+    if compression == 'zstd':
+        zstd = _zstd_module()
+        if zstd is None:
+            raise RuntimeError('zstd-Kompression nicht verfügbar (Paket "zstandard" installieren).')
+        if hasattr(zstd, 'ZstdCompressor'):
+            # zstandard package
+            return zstd.ZstdCompressor().stream_writer(open(filename, 'wb'), closefd=True)
+        return zstd.open(filename, 'wb')
+    raise ValueError(f'Unbekannte Kompression: {compression!r}')
+
+
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def detect_backup_format(filename: str) -> str:
+    """Erkenne das Format einer Sicherung anhand der Magic Bytes: 'sqlite', 'gzip', 'zstd' oder 'sql'."""
+    with open(filename, 'rb') as f:
+        head = f.read(16)
+    if head.startswith(_SQLITE_MAGIC):
+        return 'sqlite'
+    if head.startswith(_GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(_ZSTD_MAGIC):
+        return 'zstd'
+    return 'sql'
+
+
+def _open_compressed_reader(filename: str, compression: str):
+    if compression == 'gzip':
+        return gzip.open(filename, 'rb')
+    if compression == 'zstd':
+        zstd = _zstd_module()
+        if zstd is None:
+            raise RuntimeError('zstd-Kompression nicht verfügbar (Paket "zstandard" installieren).')
+        if hasattr(zstd, 'ZstdDecompressor'):
+            return zstd.ZstdDecompressor().stream_reader(open(filename, 'rb'), closefd=True)
+        return zstd.open(filename, 'rb')
+    raise ValueError(f'Unbekannte Kompression: {compression!r}')
+
+
+class _snapshot_as_sqlite:
+    """Context manager: path to an uncompressed SQLite file for a snapshot (decompressed to a temp file if needed)."""
+
+    def __init__(self, filename: str, fmt: str, tmp_dir: str):
+        self.filename = filename
+        self.fmt = fmt
+        self.tmp_dir = tmp_dir
+        self._tmp = None
+
+    def __enter__(self):
+        if self.fmt == 'sqlite':
+            return self.filename
+        fd, self._tmp = tempfile.mkstemp(prefix='.kc_restore_', suffix='.db', dir=self.tmp_dir)
+        os.close(fd)
+        with _open_compressed_reader(self.filename, self.fmt) as src, open(self._tmp, 'wb') as dst:
+            shutil.copyfileobj(src, dst, _COPY_CHUNK)
+        return self._tmp
+
+    def __exit__(self, *exc):
+        if self._tmp and os.path.exists(self._tmp):
+            os.remove(self._tmp)
+        return False
+
+
+def iter_sql_statements(lines):
+    """Zerlege einen Text-Dump zeilenweise in vollständige SQL-Statements (ohne alles einzulesen)."""
+    buf = []
+    for line in lines:
+        buf.append(line)
+        if line.rstrip().endswith(';'):
+            stmt = ''.join(buf)
+            if sqlite3.complete_statement(stmt):
+                yield stmt
+                buf = []
+    rest = ''.join(buf).strip()
+    if rest:
+        yield rest
+
+
+def _load_sql_dump(filename: str, target_db: str, chunk_bytes: int = SQL_RESTORE_CHUNK_BYTES):
+    """
+    Spiele einen Text-Dump gestreamt in `target_db` ein.
+
+    Statements werden zeilenweise gelesen und in Blöcken von ca. `chunk_bytes`
+    per `executescript` ausgeführt (C-Schleife statt execute() pro Statement).
+    Die Ziel-DB ist temporär: synchronous=OFF und journal_mode=OFF sind sicher,
+    weil sie bei einem Fehler verworfen und erst nach Erfolg eingetauscht wird.
+    """
+    conn = sqlite3.connect(target_db, isolation_level=None)
+    try:
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA journal_mode = OFF")
+        chunk = []
+        size = 0
+        with open(filename, 'r', encoding='utf-8') as f:
+            for stmt in iter_sql_statements(f):
+                # iterdump() klammert den Dump selbst in BEGIN/COMMIT; wir steuern die Transaktionen
+                head = stmt.strip().rstrip(';').strip().upper()
+                if head in ('BEGIN TRANSACTION', 'BEGIN', 'COMMIT', 'END TRANSACTION'):
+                    continue
+                chunk.append(stmt)
+                size += len(stmt)
+                if size >= chunk_bytes:
+                    conn.executescript('BEGIN;\n' + ''.join(chunk) + '\nCOMMIT;')
+                    chunk = []
+                    size = 0
+        if chunk:
+            conn.executescript('BEGIN;\n' + ''.join(chunk) + '\nCOMMIT;')
+    finally:
+        conn.close()
+
+
+def _verify_restored_db(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        row = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='patterns'").fetchone()
+    finally:
+        conn.close()
+    if row is None:
+        raise ValueError('Import enthält keine Tabelle "patterns"; Restore abgebrochen.')
+
+
+def _convert_dayord(value: bytes) -> date:
+    return date.fromordinal(int(value))
+
+
+# Ordinal-Datumsspalten (DAYORD) kommen bei PARSE_DECLTYPES direkt als `date` zurück
+sqlite3.register_converter(DAYORD, _convert_dayord)
+
+
+def _as_date(value) -> date | None:
+    """Datumswert aus der DB (date, Tages-Ordinal oder ISO-Text) als `date`."""
+    if value is None or isinstance(value, date):
+        return value
+    if isinstance(value, int):
+        return date.fromordinal(value)
+    return date.fromisoformat(value)
+
+
+def _open_connection(db_path: str, **kwargs) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES, **kwargs)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON;")  # Enable foreign key constraints
+    sqltrace.attach(conn)
+    return conn
+
+
+class ConnectionPool:
+    """
+    Thread-bewusster Verbindungspool für Worker-Threads.
+
+    Jeder Thread erhält pro DB-Pfad genau eine Verbindung (wiederholtes `acquire`
+    im selben Thread liefert dieselbe Verbindung, per Referenzzähler). Freigegebene
+    Verbindungen wandern in einen kleinen Leerlauf-Pool und werden vom nächsten
+    Worker wiederverwendet. Zusätzlich merkt sich der Pool, für welche DB-Dateien
+    das Schema in diesem Prozess bereits geprüft wurde (Schlüssel: Pfad + Inode),
+    damit `_ensure_tables` nur einmal pro Prozess läuft.
+    """
+
+    def __init__(self, max_idle: int = 4):
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._in_use: Dict = {}   # (thread-id, pfad) -> [conn, refcount]
+        self._idle: Dict = {}     # pfad -> [conn, ...]
+        self._verified = set()    # (pfad, st_dev, st_ino)
+
+    @staticmethod
+    def _key(db_path: str) -> str:
+        return os.path.abspath(db_path)
+
+    @staticmethod
+    def _connect(db_path: str) -> sqlite3.Connection:
+        return _open_connection(db_path, check_same_thread=False)
+
+    def acquire(self, db_path: str) -> sqlite3.Connection:
+        path = self._key(db_path)
+        slot = (threading.get_ident(), path)
+        with self._lock:
+            entry = self._in_use.get(slot)
+            if entry is not None:
+                entry[1] += 1
+                return entry[0]
+            idle = self._idle.get(path)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            conn = self._connect(path)
+        with self._lock:
+            self._in_use[slot] = [conn, 1]
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Gibt eine Verbindung des aktuellen Threads zurück (offene Transaktionen werden verworfen)."""
+        tid = threading.get_ident()
+        to_close = None
+        with self._lock:
+            for slot, entry in list(self._in_use.items()):
+                if slot[0] == tid and entry[0] is conn:
+                    entry[1] -= 1
+                    if entry[1] > 0:
+                        return
+                    del self._in_use[slot]
+                    if conn.in_transaction:
+                        conn.rollback()
+                    idle = self._idle.setdefault(slot[1], [])
+                    if len(idle) < self.max_idle:
+                        idle.append(conn)
+                    else:
+                        to_close = conn
+                    break
+            else:
+                to_close = conn
+        if to_close is not None:
+            to_close.close()
+
+    def discard(self, db_path: str, conn: sqlite3.Connection | None = None):
+        """
+        Verwirft Leerlauf-Verbindungen (und optional `conn` des aktuellen Threads)
+        für `db_path` und vergisst den Schema-Status, z.B. nach einem Restore.
+        """
+        path = self._key(db_path)
+        with self._lock:
+            closing = self._idle.pop(path, [])
+            if conn is not None:
+                for slot, entry in list(self._in_use.items()):
+                    if entry[0] is conn:
+                        del self._in_use[slot]
+                closing.append(conn)
+            self._verified = {v for v in self._verified if v[0] != path}
+        for c in closing:
+            try:
+                c.close()
+            except Exception:
+                pass
+
+    def _schema_key(self, db_path: str):
+        path = self._key(db_path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (path, st.st_dev, st.st_ino)
+
+    def is_verified(self, db_path: str) -> bool:
+        key = self._schema_key(db_path)
+        with self._lock:
+            return key is not None and key in self._verified
+
+    def mark_verified(self, db_path: str):
+        key = self._schema_key(db_path)
+        if key is not None:
+            with self._lock:
+                self._verified.add(key)
+
+    def close_all(self):
+        """Schließt alle Verbindungen (App-Ende)."""
+        with self._lock:
+            conns = [e[0] for e in self._in_use.values()]
+            for idle in self._idle.values():
+                conns.extend(idle)
+            self._in_use.clear()
+            self._idle.clear()
+            self._verified.clear()
+        for c in conns:
+            try:
+                c.close()
+            except Exception:
+                pass
+
+
+_POOL = ConnectionPool()
+
+
+def connection_pool() -> ConnectionPool:
+    return _POOL
+
+
+def close_pool():
+    """Schließt alle gepoolten Verbindungen; beim Beenden der App aufrufen."""
+    _POOL.close_all()
+
+
+_OPEN_END = 10 ** 6  # Monatsindex für "ohne Enddatum"
+
+
+def _month_index(d: date) -> int:
+    return d.year * 12 + d.month - 1
+
+
+def _month_bounds(m: int) -> tuple:
+    first = date(m // 12, m % 12 + 1, 1)
+    nxt = date((m + 1) // 12, (m + 1) % 12 + 1, 1)
+    return first, nxt - _dt.timedelta(days=1)
+
+
+def _affected_months(tbl: str, row: Dict) -> tuple:
+    """Monatsbereich (Index von/bis), dessen Statistik eine Journal-Zeile verändern kann."""
+    try:
+        if tbl == 'visit_status':
+            m = _month_index(_as_date(row['day']))
+            return m, m
+        start, end = (row.get('start_date'), row.get('end_date')) if tbl == 'patterns' \
+            else (row.get('from_date'), row.get('to_date'))
+        return (_month_index(_as_date(start)),
+                _month_index(_as_date(end)) if end is not None else _OPEN_END)
+    except (AttributeError, TypeError, ValueError, KeyError):
+        return 0, _OPEN_END
+
+
+def _merge_ranges(ranges: List[tuple]) -> List[tuple]:
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _db_method(fn):
+    """Database-Methode messen: Timing-Span (instrumentation) und SQL-Statistik (sqltrace)."""
+    return sqltrace.traced(timed(f'db.{fn.__name__}')(fn))
+
+
+def default_db_path() -> str:
+    """Standard-DB: ~/.kidscompass/kidscompass.db"""
+    return os.path.join(os.path.expanduser("~"), ".kidscompass", "kidscompass.db")
+
 
 class Database:
     def __init__(self, db_path: str = None):
         try:
             # Resolve stable absolute DB path. Default: ~/.kidscompass/kidscompass.db
-            default = os.path.join(os.path.expanduser("~"), ".kidscompass", "kidscompass.db")
-            self.db_path = os.fspath(Path(db_path) if db_path else Path(default))
+            self.db_path = os.fspath(Path(db_path) if db_path else Path(default_db_path()))
             # Special in-memory DB
             if self.db_path != ':memory:':
                 parent = os.path.dirname(self.db_path)
                 if parent:
                     os.makedirs(parent, exist_ok=True)
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-            self.conn.execute("PRAGMA foreign_keys = ON;")  # Enable foreign key constraints
+            self.conn = _open_connection(self.db_path)
             self._ensure_tables()
         except Exception as e:
             logging.error(f"Database connection error: {e}")
             raise
 
-    def _ensure_tables(self):
-        cur = self.conn.cursor()
-        # Muster-Tabelle mit optionalem Enddatum
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS patterns (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          weekdays TEXT NOT NULL,
-          interval_weeks INTEGER NOT NULL,
-          start_date TEXT NOT NULL
-        )""")
-        # Prüfen und ggf. Spalte end_date hinzufügen
-        cur.execute("PRAGMA table_info(patterns)")
-        cols = [row['name'] for row in cur.fetchall()]
-        if 'end_date' not in cols:
-            cur.execute("ALTER TABLE patterns ADD COLUMN end_date TEXT")
-        if 'label' not in cols:
+    _pooled = False
+    _storage = None
+
+    @classmethod
+    def from_pool(cls, db_path: str = None) -> 'Database':
+        """
+        Database-Objekt mit gepoolter Verbindung für den aktuellen Thread (Worker).
+        Das Schema wird nur beim ersten Öffnen der Datei im Prozess geprüft;
+        `close()` gibt die Verbindung an den Pool zurück.
+        """
+        if db_path == ':memory:':
+            return cls(db_path)
+        self = cls.__new__(cls)
+        self.db_path = os.fspath(Path(db_path) if db_path else Path(default_db_path()))
+        parent = os.path.dirname(self.db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._pooled = True
+        self.conn = _POOL.acquire(self.db_path)
+        if not _POOL.is_verified(self.db_path):
             try:
-                cur.execute("ALTER TABLE patterns ADD COLUMN label TEXT")
+                self._ensure_tables()
             except Exception:
-                pass
+                _POOL.discard(self.db_path, self.conn)
+                self.conn = None
+                raise
+            _POOL.mark_verified(self.db_path)
+        return self
+
+    def _reconnect(self):
+        if self._pooled:
+            self.conn = _POOL.acquire(self.db_path)
+        else:
+            self.conn = _open_connection(self.db_path)
+        self._ensure_tables()
+        if self._pooled:
+            _POOL.mark_verified(self.db_path)
 
-        # Overrides: Add und Remove mit Referenz auf patterns
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS overrides (
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          type TEXT NOT NULL,
-          from_date TEXT NOT NULL,
-          to_date TEXT NOT NULL,
-          pattern_id INTEGER,
-          holder TEXT,
-                    vac_type TEXT,
-                    meta TEXT,
-          FOREIGN KEY(pattern_id) REFERENCES patterns(id)
-        )""")
-
-        # Besuchsstatus
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS visit_status (
-          day TEXT PRIMARY KEY,
-          present_child_a INTEGER NOT NULL,
-          present_child_b INTEGER NOT NULL
-        )""")
+    def enable_query_stats(self, slow_ms: float | None = None) -> 'sqltrace.QueryStats':
+        """SQL-Statistik einschalten und an diese Verbindung hängen (siehe sqltrace.py)."""
+        stats = sqltrace.enable(slow_ms)
+        stats.attach(self.conn)
+        return stats
 
-        self.conn.commit()
+    def _ensure_tables(self):
+        """Schema auf den aktuellen Stand bringen (versionierte Migrationen, siehe migrations.py)."""
+        migrate(self.conn)
+        self._storage = None
+
+    # Datumsformat (ISO-Text oder Tages-Ordinal)
+    @property
+    def date_storage(self) -> str:
+        if self._storage is None:
+            self._storage = date_storage(self.conn)
+        return self._storage
+
+    def _date_param(self, d: date | None):
+        """Datum als SQL-Parameter im Speicherformat der DB."""
+        if d is None:
+            return None
+        return d.toordinal() if self.date_storage == 'ordinal' else d.isoformat()
+
+    def convert_date_storage(self, mode: str) -> bool:
+        """
+        Stellt die Datumsspalten auf 'ordinal' (INTEGER-Tagesnummern) oder 'iso' (TEXT) um.
+        Vorher wird ein Snapshot im Backup-Speicher angelegt. Gibt False zurück,
+        wenn nichts zu tun war.
+        """
+        if date_storage(self.conn) == mode:
+            return False
+        self.snapshot_backup(f'before_date_storage_{mode}')
+        try:
+            return convert_date_storage(self.conn, mode)
+        finally:
+            self._storage = None
 
-        # Ensure holder column exists for older DBs
-        cur.execute("PRAGMA table_info(overrides)")
-        cols = [r['name'] for r in cur.fetchall()]
-        if 'holder' not in cols:
-            try:
-                cur.execute("ALTER TABLE overrides ADD COLUMN holder TEXT")
-            except Exception:
-                pass
-        if 'vac_type' not in cols:
-            try:
-                cur.execute("ALTER TABLE overrides ADD COLUMN vac_type TEXT")
-            except Exception:
-                pass
-        if 'meta' not in cols:
-            try:
-                cur.execute("ALTER TABLE overrides ADD COLUMN meta TEXT")
-            except Exception:
-                pass
-            self.conn.commit()
+    def _day_ordinal_sql(self, col: str = 'day') -> str:
+        """SQL-Ausdruck für die Tagesnummer (date.toordinal) einer Datumsspalte."""
+        if self.date_storage == 'ordinal':
+            return f"CAST({col} AS INTEGER)"
+        return f"CAST(julianday({col}) - {JULIAN_ORDINAL_OFFSET} AS INTEGER)"
+
+    @_db_method
+    def load_status_arrays(self, start_date: date | None = None, end_date: date | None = None) -> Dict:
+        """
+        Besuchsstatus als NumPy-Arrays, sortiert nach Tag:
+        {'ordinal': int64 (date.toordinal), 'mask': int64 (absent_mask), 'a': bool, 'b': bool}.
+        Die Tagesnummern werden in SQL berechnet, ohne Datums-Parsing pro Zeile;
+        'a'/'b' sind die Anwesenheits-Bits 0/1 (weitere Kinder: statistics.presence_matrix).
+        """
+        import numpy as np
+        sql = f"SELECT {self._day_ordinal_sql()}, absent_mask FROM visit_status"
+        cond, params = [], []
+        if start_date is not None:
+            cond.append("day >= ?")
+            params.append(self._date_param(start_date))
+        if end_date is not None:
+            cond.append("day <= ?")
+            params.append(self._date_param(end_date))
+        if cond:
+            sql += " WHERE " + " AND ".join(cond)
+        sql += " ORDER BY day"
+        rows = self.conn.execute(sql, params).fetchall()
+        incr('db.load_status_arrays.rows', len(rows))
+        arr = np.array([tuple(r) for r in rows], dtype=np.int64).reshape(-1, 2)
+        mask = arr[:, 1]
+        return {'ordinal': arr[:, 0], 'mask': mask, 'a': (mask & 1) == 0, 'b': (mask & 2) == 0}
 
     # Export/Import
+    @_db_method
     def export_to_sql(self, filename: str):
         """Dump aller Tabellen als SQL-Statements"""
         with open(filename, 'w', encoding='utf-8') as f:
             for line in self.conn.iterdump():
                 f.write(f"{line}\n")
 
+    @_db_method
+    def backup_to_file(self, filename: str, compression: str | None = None,
+                       pages: int = BACKUP_PAGES_PER_STEP, progress=None) -> str:
+        """
+        Binärer Snapshot der DB über `sqlite3.Connection.backup()`.
+
+        Die Seiten werden in Schritten zu `pages` kopiert; zwischen den Schritten
+        wird die Quell-DB freigegeben und `progress(copied, total)` aufgerufen.
+        `compression` ist None, 'gzip' oder 'zstd'. Die Zieldatei wird erst nach
+        vollständigem Snapshot per `os.replace` an ihren Platz gelegt.
+        """
+        if compression not in SNAPSHOT_COMPRESSIONS:
+            raise ValueError(f'Unbekannte Kompression: {compression!r}')
+        filename = os.fspath(filename)
+        target_dir = os.path.dirname(os.path.abspath(filename))
+        fd, raw_tmp = tempfile.mkstemp(prefix='.kc_snapshot_', suffix='.db', dir=target_dir)
+        os.close(fd)
+        out_tmp = None
+
+        def _on_step(status, remaining, total):
+            if progress is not None:
+                progress(total - remaining, total)
+
+        try:
+            dst = sqlite3.connect(raw_tmp)
+            try:
+                self.conn.backup(dst, pages=pages, progress=_on_step)
+            finally:
+                dst.close()
+
+            if compression is None:
+                os.replace(raw_tmp, filename)
+                return filename
+
+            fd, out_tmp = tempfile.mkstemp(prefix='.kc_snapshot_', suffix='.part', dir=target_dir)
+            os.close(fd)
+            with open(raw_tmp, 'rb') as src, _open_compressed_writer(out_tmp, compression) as dst_f:
+                shutil.copyfileobj(src, dst_f, _COPY_CHUNK)
+            os.replace(out_tmp, filename)
+            out_tmp = None
+            return filename
+        finally:
+            for tmp in (raw_tmp, out_tmp):
+                if tmp and os.path.exists(tmp):
+                    os.remove(tmp)
+
+    def backup_store(self) -> BackupStore:
+        """Rollierender Backup-Speicher im Verzeichnis `backups/` neben der DB."""
+        return BackupStore(self.db_path)
+
+    def snapshot_backup(self, reason: str) -> str | None:
+        """
+        Sicherheits-Snapshot vor riskanten Operationen im Backup-Speicher ablegen.
+        Gibt den Pfad der Snapshot-Datei zurück (None bei `:memory:`-DB).
+        """
+        if self.db_path == ':memory:' or not os.path.exists(self.db_path):
+            return None
+        store = self.backup_store()
+        entry = store.snapshot(self.conn, reason=reason)
+        return store.path_for(entry)
+
     def import_from_sql(self, filename: str):
         """Vorhandene Tabellen löschen, Dump einlesen und ausführen"""
         cur = self.conn.cursor()
-        for tbl in ('visit_status', 'overrides', 'patterns'):
-            cur.execute(f"DROP TABLE IF EXISTS {tbl}")
-        self.conn.commit()
-
-        with open(filename, 'r', encoding='utf-8') as f:
-            script = f.read()
-        self.conn.executescript(script)
         self.conn.commit()
+        # Alle Tabellen (inkl. Journal) entfernen, sonst kollidiert CREATE TABLE aus dem Dump
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+        tables = [r['name'] for r in cur.fetchall()]
+        self.conn.execute("PRAGMA foreign_keys = OFF;")
+        try:
+            for tbl in tables:
+                cur.execute(f'DROP TABLE IF EXISTS "{tbl}"')
+            # Dumps tragen keine Schemaversion: nach dem Einspielen alle Schritte erneut prüfen
+            cur.execute("PRAGMA user_version = 0")
+            self.conn.commit()
+            with open(filename, 'r', encoding='utf-8') as f:
+                script = f.read()
+            # Dump legt Tabellen alphabetisch an (overrides vor patterns): Fremdschlüssel erst danach wieder an
+            self.conn.executescript(script)
+            self.conn.commit()
+        finally:
+            self.conn.execute("PRAGMA foreign_keys = ON;")
+        self._ensure_tables()
 
+    @_db_method
     def atomic_import_from_sql(self, filename: str):
         """
-        Atomarer Import: importiert das SQL in eine temporäre DB, verifiziert
+        Atomarer Import: baut die Sicherung in einer temporären DB auf, verifiziert
         dass mindestens die `patterns`-Tabelle existiert und ersetzt dann die
-        aktuelle DB-Datei durch die temporäre DB (mit Backup).
-        Bei `:memory:`-DB wird `import_from_sql` ausgeführt.
+        aktuelle DB-Datei per `os.replace` durch die temporäre DB (mit Backup).
+        Akzeptiert Text-Dumps (.sql) und binäre Snapshots (auch gzip/zstd).
+        Bei `:memory:`-DB wird direkt in die offene Verbindung importiert.
         """
+        fmt = detect_backup_format(filename)
         if self.db_path == ':memory:':
-            return self.import_from_sql(filename)
-
-        with open(filename, 'r', encoding='utf-8') as f:
-            script = f.read()
+            if fmt == 'sql':
+                return self.import_from_sql(filename)
+            with _snapshot_as_sqlite(filename, fmt, os.path.dirname(os.path.abspath(filename))) as src_path:
+                src = sqlite3.connect(src_path)
+                try:
+                    src.backup(self.conn)
+                finally:
+                    src.close()
+            self._ensure_tables()
+            return
 
         ts = _dt.datetime.now().strftime('%Y%m%d_%H%M%S')
         tmpdb = os.path.join(os.path.dirname(self.db_path), f'.tmp_restore_{ts}.db')
-        if os.path.exists(tmpdb):
-            os.remove(tmpdb)
+        for leftover in (tmpdb, tmpdb + '-journal'):
+            if os.path.exists(leftover):
+                os.remove(leftover)
 
-        conn_tmp = sqlite3.connect(tmpdb)
-        conn_tmp.row_factory = sqlite3.Row
         try:
-            conn_tmp.executescript(script)
-            conn_tmp.commit()
-            cur = conn_tmp.cursor()
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='patterns'")
-            if cur.fetchone() is None:
-                raise ValueError('Import enthält keine Tabelle "patterns"; Restore abgebrochen.')
+            if fmt == 'sql':
+                _load_sql_dump(filename, tmpdb)
+            elif fmt == 'sqlite':
+                src = sqlite3.connect(f"file:{Path(os.path.abspath(filename)).as_posix()}?mode=ro", uri=True)
+                dst = sqlite3.connect(tmpdb)
+                try:
+                    src.backup(dst, pages=BACKUP_PAGES_PER_STEP)
+                finally:
+                    dst.close()
+                    src.close()
+            else:
+                with _open_compressed_reader(filename, fmt) as src_f, open(tmpdb, 'wb') as dst_f:
+                    shutil.copyfileobj(src_f, dst_f, _COPY_CHUNK)
+            _verify_restored_db(tmpdb)
+            # synchronous=OFF beim Aufbau: vor dem Tausch einmal explizit auf Platte bringen
+            with open(tmpdb, 'rb+') as f:
+                os.fsync(f.fileno())
         except Exception:
-            conn_tmp.close()
             if os.path.exists(tmpdb):
                 os.remove(tmpdb)
             raise
-        finally:
-            conn_tmp.close()
 
-        bak = f"{self.db_path}.bak_before_restore_{ts}"
+        # Aktuellen Stand im Backup-Speicher sichern (übersprungen, wenn unverändert)
         try:
-            if os.path.exists(self.db_path):
-                shutil.copy2(self.db_path, bak)
-            shutil.copy2(tmpdb, self.db_path)
+            self.snapshot_backup('before_restore')
         except Exception:
             if os.path.exists(tmpdb):
                 os.remove(tmpdb)
             raise
+        if self.conn:
+            try:
+                if self._pooled:
+                    _POOL.discard(self.db_path, self.conn)
+                else:
+                    self.conn.close()
+            except Exception:
+                pass
+            self.conn = None
+        # Leerlauf-Verbindungen anderer Worker zeigen sonst auf die alte Datei
+        _POOL.discard(self.db_path)
+        try:
+            os.replace(tmpdb, self.db_path)
         finally:
             if os.path.exists(tmpdb):
                 os.remove(tmpdb)
-
-        try:
-            if self.conn:
-                try:
-                    self.conn.close()
-                except Exception:
-                    pass
-        finally:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row
-            self.conn.execute("PRAGMA foreign_keys = ON;")
-            self._ensure_tables()
+            self._reconnect()
 
     # Pattern-Methoden
+    @_db_method
     def load_patterns(self):
         cur = self.conn.cursor()
         cur.execute(
@@ -192,19 +699,21 @@ class Database:
                 bad_ids.append(row['id'])
                 continue
             wd = [int(x) for x in wk.split(',') if x]
-            start = date.fromisoformat(row['start_date'])
-            end = date.fromisoformat(row['end_date']) if row['end_date'] else None
+            start = _as_date(row['start_date'])
+            end = _as_date(row['end_date'])
             pat = VisitPattern(wd, row['interval_weeks'], start, end, label=row['label'] if 'label' in row.keys() else None)
             pat.id = row['id']
             out.append(pat)
         if bad_ids:
             logging.debug(f"load_patterns found invalid weekday rows: {bad_ids}")
-        return out    
+        return out
+
+    @_db_method
     def save_pattern(self, pat: VisitPattern):
         try:
             wd_text = ','.join(str(d) for d in pat.weekdays)
-            sd = pat.start_date.isoformat()
-            ed = pat.end_date.isoformat() if pat.end_date else None
+            sd = self._date_param(pat.start_date)
+            ed = self._date_param(pat.end_date)
             lab = getattr(pat, 'label', None)
             cur = self.conn.cursor()
             # Prevent duplicate inserts: check for existing identical pattern
@@ -245,19 +754,21 @@ class Database:
         except Exception as e:
             print(f"Error saving pattern: {e}")
 
+    @_db_method
     def delete_pattern(self, pattern_id: int):
         cur = self.conn.cursor()
         cur.execute("DELETE FROM patterns WHERE id=?", (pattern_id,))
         self.conn.commit()
 
     # Override-Methoden
+    @_db_method
     def load_overrides(self):
         cur = self.conn.cursor()
         cur.execute("SELECT * FROM overrides")
         out = []
         for row in cur.fetchall():
-            f = date.fromisoformat(row['from_date'])
-            t = date.fromisoformat(row['to_date'])
+            f = _as_date(row['from_date'])
+            t = _as_date(row['to_date'])
             if row['type'] == 'add':
                 # Lade zugehöriges Pattern
                 pcur = self.conn.cursor()
@@ -268,8 +779,8 @@ class Database:
                 prow = pcur.fetchone()
                 if prow:
                     wd = [int(x) for x in prow['weekdays'].split(',') if x]
-                    start = date.fromisoformat(prow['start_date'])
-                    end = date.fromisoformat(prow['end_date']) if prow['end_date'] else None
+                    start = _as_date(prow['start_date'])
+                    end = _as_date(prow['end_date'])
                     pat = VisitPattern(wd, prow['interval_weeks'], start, end)
                     pat.id = prow['id']
                     ov = OverridePeriod(f, t, pat, holder=row['holder'] if 'holder' in row.keys() else None,
@@ -285,10 +796,11 @@ class Database:
             out.append(ov)
         return out
 
+    @_db_method
     def save_override(self, ov):
         cur = self.conn.cursor()
-        f_iso = ov.from_date.isoformat()
-        t_iso = ov.to_date.isoformat()
+        f_iso = self._date_param(ov.from_date)
+        t_iso = self._date_param(ov.to_date)
         if isinstance(ov, OverridePeriod):
             # Stelle sicher, dass das Pattern gespeichert ist und eine id hat
             if getattr(ov.pattern, 'id', None) is None:
@@ -320,6 +832,7 @@ class Database:
         except Exception:
             pass
 
+    @_db_method
     def delete_override(self, override_id: int):
         cur = self.conn.cursor()
         # Ermittele, ob dieses Override auf ein Pattern referenziert (nur zu Informationszwecken)
@@ -336,44 +849,268 @@ class Database:
             logging.exception(f"Fehler beim Löschen des Overrides id={override_id}: {e}")
             raise
 
+    # Kinder (Bitpositionen in visit_status.absent_mask)
+    @_db_method
+    def load_children(self) -> List[Child]:
+        return [Child(r['bit'], r['name']) for r in self.conn.execute("SELECT bit, name FROM children ORDER BY bit")]
+
+    @_db_method
+    def save_child(self, name: str, bit: int | None = None) -> Child:
+        """Kind anlegen (nächste freie Bitposition) oder umbenennen (`bit` angegeben)."""
+        if bit is None:
+            used = {r[0] for r in self.conn.execute("SELECT bit FROM children")}
+            bit = next((b for b in range(MAX_CHILDREN) if b not in used), None)
+            if bit is None:
+                raise ValueError(f'Höchstens {MAX_CHILDREN} Kinder möglich')
+        self.conn.execute(
+            "INSERT INTO children (bit, name) VALUES (?, ?) ON CONFLICT(bit) DO UPDATE SET name=excluded.name",
+            (bit, name))
+        self.conn.commit()
+        return Child(bit, name)
+
     # VisitStatus-Methoden
+    def iter_status(self, start_date: date, end_date: date):
+        """Besuchsstatus im Zeitraum als (Tag, absent_mask), nach Tag sortiert, zeilenweise vom Cursor."""
+        cur = self.conn.execute(
+            "SELECT day, absent_mask FROM visit_status WHERE day BETWEEN ? AND ? ORDER BY day",
+            (self._date_param(start_date), self._date_param(end_date)))
+        try:
+            for row in cur:
+                yield _as_date(row[0]), row[1]
+        finally:
+            cur.close()
+
     def load_all_status(self) -> dict[date, VisitStatus]:
         cur = self.conn.cursor()
-        cur.execute("SELECT day, present_child_a, present_child_b FROM visit_status")
+        cur.execute("SELECT day, absent_mask FROM visit_status")
         status = {}
         for row in cur.fetchall():
-            d0 = date.fromisoformat(row['day'])
-            vs = VisitStatus(d0, bool(row['present_child_a']), bool(row['present_child_b']))
+            d0 = _as_date(row['day'])
+            vs = VisitStatus(d0, absent_mask=row['absent_mask'])
             status[d0] = vs
         return status
 
+    @_db_method
     def save_status(self, vs: VisitStatus):
         cur = self.conn.cursor()
-        day = vs.day.isoformat()
-        a = int(vs.present_child_a)
-        b = int(vs.present_child_b)
+        day = self._date_param(vs.day)
+        # UPSERT statt REPLACE: Update-Trigger sieht vorherigen Zustand (Journal)
         cur.execute(
-            "REPLACE INTO visit_status (day, present_child_a, present_child_b) VALUES (?,?,?)",
-            (day, a, b)
+            "INSERT INTO visit_status (day, absent_mask) VALUES (?,?) "
+            "ON CONFLICT(day) DO UPDATE SET absent_mask=excluded.absent_mask",
+            (day, int(vs.absent_mask))
         )
         self.conn.commit()
 
+    @_db_method
     def delete_status(self, day: date):
         cur = self.conn.cursor()
-        cur.execute("DELETE FROM visit_status WHERE day=?", (day.isoformat(),))
+        cur.execute("DELETE FROM visit_status WHERE day=?", (self._date_param(day),))
         self.conn.commit()
 
+    @_db_method
     def clear_status(self):
         cur = self.conn.cursor()
         cur.execute("DELETE FROM visit_status")
         self.conn.commit()
-        
+
+    # Änderungsjournal
+    def current_change_seq(self) -> int:
+        """Höchste vergebene Journal-Sequenznummer (0, wenn noch nichts protokolliert wurde)."""
+        row = self.conn.execute("SELECT COALESCE(MAX(seq), 0) AS seq FROM changes").fetchone()
+        return row['seq']
+
+    @_db_method
+    def changes_since(self, seq: int = 0, limit: int | None = None) -> List[Dict]:
+        """
+        Journal-Einträge mit Sequenznummer > `seq` in Reihenfolge.
+        Jeder Eintrag: {'seq', 'table', 'row_id', 'op', 'before', 'after', 'ts'};
+        `before`/`after` sind dicts der Zeile (None bei insert bzw. delete).
+        """
+        sql = "SELECT seq, tbl, row_id, op, before, after, ts FROM changes WHERE seq > ? ORDER BY seq"
+        params = [seq]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        out = []
+        for row in self.conn.execute(sql, params):
+            out.append({
+                'seq': row['seq'],
+                'table': row['tbl'],
+                'row_id': row['row_id'],
+                'op': row['op'],
+                'before': json.loads(row['before']) if row['before'] else None,
+                'after': json.loads(row['after']) if row['after'] else None,
+                'ts': row['ts'],
+            })
+        return out
+
+    @_db_method
+    def revert_changes_since(self, seq: int) -> int:
+        """
+        Macht alle Änderungen nach `seq` rückgängig (in umgekehrter Reihenfolge, eine Transaktion).
+        Die Rücknahme wird selbst wieder protokolliert. Gibt die Anzahl zurückgenommener Einträge zurück.
+        """
+        changes = self.changes_since(seq)
+        with self.conn:
+            cur = self.conn.cursor()
+            for ch in reversed(changes):
+                tbl = ch['table']
+                if tbl not in JOURNAL_TABLES:
+                    continue
+                key = JOURNAL_TABLES[tbl][0]
+                # Journal-Einträge können aus der Zeit vor einer Datumsformat-Umstellung stammen
+                row_id = ch['row_id']
+                if key in DATE_COLUMNS[tbl]:
+                    row_id = self._date_param(_as_date(row_id))
+                if ch['before'] and tbl == 'visit_status':
+                    ch['before'] = legacy_status_row(ch['before'])
+                if ch['before']:
+                    for c in DATE_COLUMNS[tbl]:
+                        if c in ch['before']:
+                            ch['before'][c] = self._date_param(_as_date(ch['before'][c]))
+                if ch['op'] == 'insert':
+                    cur.execute(f"DELETE FROM {tbl} WHERE {key}=?", (row_id,))
+                elif ch['op'] == 'delete':
+                    row = ch['before']
+                    cols = list(row)
+                    cur.execute(
+                        f"INSERT INTO {tbl} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)})",
+                        [row[c] for c in cols]
+                    )
+                else:
+                    row = ch['before']
+                    cols = list(row)
+                    cur.execute(
+                        f"UPDATE {tbl} SET {', '.join(f'{c}=?' for c in cols)} WHERE {key}=?",
+                        [row[c] for c in cols] + [row_id]
+                    )
+        return len(changes)
+
+    # Monatsaggregate für die Statistik
+    def _sync_monthly_stats(self, cur: sqlite3.Cursor):
+        """Verwirft Aggregate der Monate, die seit dem letzten Abgleich laut Journal geändert wurden."""
+        synced = cur.execute("SELECT change_seq FROM monthly_stats_sync WHERE id = 1").fetchone()[0]
+        current = cur.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        if synced == current:
+            return
+        if synced > current:
+            # Journal neu begonnen (z.B. nach Import) -> alles neu berechnen
+            cur.execute("DELETE FROM monthly_stats")
+        else:
+            ranges = []
+            for row in cur.execute("SELECT tbl, before, after FROM changes WHERE seq > ? AND seq <= ?",
+                                   (synced, current)).fetchall():
+                for payload in (row[1], row[2]):
+                    if payload:
+                        ranges.append(_affected_months(row[0], json.loads(payload)))
+            cur.executemany("DELETE FROM monthly_stats WHERE year * 12 + month - 1 BETWEEN ? AND ?",
+                            _merge_ranges(ranges))
+        cur.execute("UPDATE monthly_stats_sync SET change_seq = ? WHERE id = 1", (current,))
+
+    def _count_days(self, start: date, end: date, patterns, overrides) -> Dict[tuple, Dict[int, int]]:
+        """Tagesgenaue Zählung: (Jahr, Monat, Wochentag) -> {absent_mask: geplante Tage}."""
+        raw = []
+        for y in range(start.year, end.year + 1):
+            for p in patterns:
+                raw.extend(generate_standard_days(p, y))
+        status = {}
+        for row in self.conn.execute(
+            "SELECT day, absent_mask FROM visit_status WHERE day BETWEEN ? AND ?",
+            (self._date_param(start), self._date_param(end))
+        ):
+            status[_as_date(row[0])] = row[1]
+        counts = {}
+        for d in apply_overrides(raw, overrides):
+            if not start <= d <= end:
+                continue
+            mask = status.get(d, 0)  # ohne Eintrag gilt der Umgang als wahrgenommen
+            c = counts.setdefault((d.year, d.month, d.weekday()), {})
+            c[mask] = c.get(mask, 0) + 1
+        return counts
+
+    @staticmethod
+    def _stats_rows(m: int, counts: Dict[tuple, Dict[int, int]]) -> List[Dict]:
+        """7 Zeilen (eine je Wochentag) eines Monatsindex aus _count_days()."""
+        y, mo = m // 12, m % 12 + 1
+        rows = []
+        for wd in range(7):
+            masks = counts.get((y, mo, wd), {})
+            rows.append({'year': y, 'month': mo, 'weekday': wd, 'planned': sum(masks.values()), 'masks': masks})
+        return rows
+
+    @_db_method
+    def monthly_stats(self, start_date: date, end_date: date) -> List[Dict]:
+        """
+        Geplante Tage je Monat und Wochentag im Zeitraum [start_date, end_date], aufgeteilt
+        nach Abwesenheitsmaske (0 = alle da bzw. kein Status erfasst):
+        [{'year', 'month', 'weekday', 'planned', 'masks': {absent_mask: Tage}}, ...]
+        (Auswertung je Kind mit statistics.sum_monthly_stats). Volle Monate stammen aus der
+        Tabelle monthly_stats; fehlende oder laut Journal veränderte Monate werden dabei
+        nachberechnet. Angeschnittene Randmonate werden tagesgenau gezählt und nicht gespeichert.
+        """
+        start_date, end_date = _as_date(start_date), _as_date(end_date)
+        if start_date > end_date:
+            return []
+        first_m, last_m = _month_index(start_date), _month_index(end_date)
+        first_full = first_m if start_date == _month_bounds(first_m)[0] else first_m + 1
+        last_full = last_m if end_date == _month_bounds(last_m)[1] else last_m - 1
+        plan = []
+
+        def _plan():
+            if not plan:
+                plan.extend((self.load_patterns(), self.load_overrides()))
+            return plan
+
+        out = []
+        with self.conn:
+            cur = self.conn.cursor()
+            self._sync_monthly_stats(cur)
+            if first_full <= last_full:
+                have = {r[0] for r in cur.execute(
+                    "SELECT DISTINCT year * 12 + month - 1 FROM monthly_stats "
+                    "WHERE year * 12 + month - 1 BETWEEN ? AND ?", (first_full, last_full))}
+                missing = [m for m in range(first_full, last_full + 1) if m not in have]
+                incr('db.monthly_stats.months_cached', last_full - first_full + 1 - len(missing))
+                incr('db.monthly_stats.months_recomputed', len(missing))
+                for lo, hi in _merge_ranges([(m, m) for m in missing]):
+                    counts = self._count_days(_month_bounds(lo)[0], _month_bounds(hi)[1], *_plan())
+                    # Maske 0 immer (auch mit 0 Tagen): markiert den Monat als berechnet
+                    cur.executemany(
+                        "INSERT INTO monthly_stats (year, month, weekday, absent_mask, days) VALUES (?, ?, ?, ?, ?)",
+                        [(r['year'], r['month'], r['weekday'], mask, n)
+                         for m in range(lo, hi + 1) for r in self._stats_rows(m, counts)
+                         for mask, n in {0: 0, **r['masks']}.items()]
+                    )
+                by_key = {}
+                for y, mo, wd, mask, n in cur.execute(
+                        "SELECT year, month, weekday, absent_mask, days FROM monthly_stats "
+                        "WHERE year * 12 + month - 1 BETWEEN ? AND ? ORDER BY year, month, weekday, absent_mask",
+                        (first_full, last_full)):
+                    r = by_key.get((y, mo, wd))
+                    if r is None:
+                        r = by_key[(y, mo, wd)] = {'year': y, 'month': mo, 'weekday': wd, 'planned': 0, 'masks': {}}
+                    if n:
+                        r['masks'][mask] = n
+                        r['planned'] += n
+                out = list(by_key.values())
+        for m in sorted({first_m, last_m} - set(range(first_full, last_full + 1))):
+            incr('db.monthly_stats.months_partial')
+            lo, hi = _month_bounds(m)
+            rows = self._stats_rows(m, self._count_days(max(lo, start_date), min(hi, end_date), *_plan()))
+            out = rows + out if m == first_m else out + rows
+        return out
+
     def close(self):
-        """Schließe die Datenbankverbindung sauber"""
+        """Schließe die Datenbankverbindung sauber (gepoolte Verbindungen gehen an den Pool zurück)"""
         if self.conn:
-            self.conn.close()
+            if self._pooled:
+                _POOL.release(self.conn)
+            else:
+                self.conn.close()
             self.conn = None
 
+    @_db_method
     def query_visits(
         self,
         start_date: date,
@@ -382,14 +1119,15 @@ class Database:
         status_filters: dict[str,bool]
     ) -> List[dict]:
         cur = self.conn.cursor()
-        query = "SELECT day, present_child_a, present_child_b FROM visit_status WHERE day BETWEEN ? AND ?"
-        params = [start_date.isoformat(), end_date.isoformat()]
+        query = "SELECT day, absent_mask FROM visit_status WHERE day BETWEEN ? AND ?"
+        params = [self._date_param(start_date), self._date_param(end_date)]
 
         results = []
         for row in cur.execute(query, params):
-            day_date  = date.fromisoformat(row['day'])
-            present_a = bool(row['present_child_a'])
-            present_b = bool(row['present_child_b'])
+            day_date  = _as_date(row['day'])
+            mask      = row['absent_mask']
+            present_a = not mask & 1
+            present_b = not mask & 2
             # 1) Wochen-Filtern
             if weekdays and day_date.weekday() not in weekdays:
                 continue
@@ -407,36 +1145,45 @@ class Database:
             results.append({
                 "day": day_date,
                 "present_child_a": present_a,
-                "present_child_b": present_b
+                "present_child_b": present_b,
+                "absent_mask": mask
             })
 
+        incr('db.query_visits.rows', len(results))
         return results
 
+    @_db_method
     def load_all_status(self) -> Dict[date, 'VisitStatus']:
         cur = self.conn.cursor()
-        cur.execute("SELECT day, present_child_a, present_child_b FROM visit_status")
+        cur.execute("SELECT day, absent_mask FROM visit_status")
         status = {}
         for row in cur.fetchall():
-            d0 = date.fromisoformat(row['day'])
-            vs = VisitStatus(d0, bool(row['present_child_a']), bool(row['present_child_b']))
+            d0 = _as_date(row['day'])
+            vs = VisitStatus(d0, absent_mask=row['absent_mask'])
             status[d0] = vs
         cur.close()
         return status
 
+    @_db_method
     def find_unreferenced_patterns(self, start_date: date | None = None, end_date: date | None = None) -> List[Dict]:
         """Returns list of pattern rows (dict) that are not referenced by any override and
         that produce at least one date in the given date window (if provided).
+        Anti-join in SQL, window test via calendar_logic.first_occurrence (no date generation).
         """
+        sql = ("SELECT p.id, p.weekdays, p.interval_weeks, p.start_date, p.end_date "
+               "FROM patterns p LEFT JOIN overrides o ON o.pattern_id = p.id WHERE o.id IS NULL")
+        params = []
+        # Grobfilter: Gültigkeitszeitraum muss das Fenster überlappen
+        if start_date is not None:
+            sql += " AND (p.end_date IS NULL OR p.end_date >= ?)"
+            params.append(self._date_param(start_date))
+        if end_date is not None:
+            sql += " AND p.start_date <= ?"
+            params.append(self._date_param(end_date))
         cur = self.conn.cursor()
-        cur.execute("SELECT pattern_id FROM overrides WHERE pattern_id IS NOT NULL")
-        referenced = {r['pattern_id'] for r in cur.fetchall()}
-
-        cur.execute("SELECT id, weekdays, interval_weeks, start_date, end_date FROM patterns")
+        cur.execute(sql + " ORDER BY p.id", params)
         out = []
         for row in cur.fetchall():
-            pid = row['id']
-            if pid in referenced:
-                continue
             # If no window is provided, include all unreferenced patterns
             if start_date is None and end_date is None:
                 out.append(dict(row))
@@ -444,37 +1191,29 @@ class Database:
             # Validate weekdays format
             wk = row['weekdays'] or ''
             if not re.match(r'^\d+(,\d+)*$', wk):
-                logging.warning(f"Skipping pattern id={pid} due to invalid weekdays='{wk}'")
+                logging.warning(f"Skipping pattern id={row['id']} due to invalid weekdays='{wk}'")
                 continue
-            # Build pattern and check if it produces dates in window
             wd = [int(x) for x in wk.split(',') if x]
-            sd = date.fromisoformat(row['start_date'])
-            ed = date.fromisoformat(row['end_date']) if row['end_date'] else None
-            pat = VisitPattern(wd, row['interval_weeks'], sd, ed)
-            years = range(sd.year, (ed.year if ed else (end_date.year if end_date else sd.year)) + 1)
-            has = False
-            for y in years:
-                for d in generate_standard_days(pat, y):
-                    if start_date <= d <= end_date:
-                        has = True
-                        break
-                if has:
-                    break
-            if has:
+            sd = _as_date(row['start_date'])
+            pat = VisitPattern(wd, row['interval_weeks'], sd, _as_date(row['end_date']))
+            first = first_occurrence(pat, start_date or sd)
+            if first is not None and (end_date is None or first <= end_date):
                 out.append(dict(row))
         cur.close()
         return out
 
+    @_db_method
     def find_duplicate_patterns(self) -> List[List[int]]:
-        """Return list of lists of pattern ids that are duplicates (same key)."""
+        """Return list of lists of pattern ids that are duplicates (same pattern_key)."""
         cur = self.conn.cursor()
-        cur.execute("SELECT id, weekdays, interval_weeks, start_date, end_date FROM patterns ORDER BY id")
-        by_key = {}
-        for row in cur.fetchall():
-            key = (','.join(sorted([x for x in row['weekdays'].split(',') if x])), row['interval_weeks'], row['start_date'], row['end_date'] if row['end_date'] else None)
-            by_key.setdefault(key, []).append(row['id'])
+        cur.execute(
+            "SELECT json_group_array(id) AS ids FROM "
+            "(SELECT id, pattern_key FROM patterns WHERE pattern_key IS NOT NULL ORDER BY id) "
+            "GROUP BY pattern_key HAVING COUNT(*) > 1 ORDER BY MIN(id)"
+        )
+        groups = [json.loads(row['ids']) for row in cur.fetchall()]
         cur.close()
-        return [ids for ids in by_key.values() if len(ids) > 1]
+        return groups
 
     def list_fk_refs_to_patterns(self) -> List[tuple]:
         """Return list of (table, from_col, to_table, to_col) where foreign keys point to patterns(id)."""
@@ -522,10 +1261,8 @@ class Database:
         if not bad:
             return {'count': 0, 'ids': [], 'backup': None}
 
-        ts = time.strftime('%Y%m%d_%H%M%S')
-        backup = f"{self.db_path}.bak_weekdays_{ts}"
         try:
-            shutil.copy2(self.db_path, backup)
+            backup = self.snapshot_backup('before_weekday_repair')
         except Exception as e:
             logging.exception(f"Failed to create DB backup before repair: {e}")
             raise
@@ -566,6 +1303,7 @@ class Database:
         cur.close()
         return row['id'] if row else None
 
+    @_db_method
     def split_pattern(self, pattern_id: int, split_date: date, new_weekdays: List[int], new_interval_weeks: int = None, end_prev: bool = True):
         """
         Split an existing pattern at split_date: optionally end the old pattern at split_date-1
@@ -577,8 +1315,8 @@ class Database:
         if not row:
             raise ValueError(f'Pattern id={pattern_id} not found')
 
-        old_start = date.fromisoformat(row['start_date'])
-        old_end = date.fromisoformat(row['end_date']) if row['end_date'] else None
+        old_start = _as_date(row['start_date'])
+        old_end = _as_date(row['end_date'])
 
         # If old pattern ends before split_date, nothing to do
         if old_end is not None and old_end < split_date:
@@ -594,7 +1332,7 @@ class Database:
                 # Derive new label
                 old_label = row['label'] if 'label' in row.keys() else None
                 new_label = f"{old_label} (ab {split_date.isoformat()} geändert)" if old_label else f"Pattern (ab {split_date.isoformat()} geändert)"
-                cur.execute("UPDATE patterns SET weekdays=?, interval_weeks=?, start_date=?, label=? WHERE id=?", (wd_text, niw, split_date.isoformat(), new_label, pattern_id))
+                cur.execute("UPDATE patterns SET weekdays=?, interval_weeks=?, start_date=?, label=? WHERE id=?", (wd_text, niw, self._date_param(split_date), new_label, pattern_id))
                 return {'old_updated': True, 'new_pattern_id': pattern_id, 'message': 'Pattern ersetzt (kein Split, da Split-Datum vor Start).'}
 
         # Normal split: set old end_date = split_date -1 if asked
@@ -602,19 +1340,19 @@ class Database:
         old_updated = False
         wd_text_new = ','.join(str(d) for d in sorted(new_weekdays))
         niw = new_interval_weeks if new_interval_weeks is not None else row['interval_weeks']
-        old_end_target = (split_date - _dt.timedelta(days=1)).isoformat()
-        old_end_iso = row['end_date'] if row['end_date'] else None
+        old_end_target = self._date_param(split_date - _dt.timedelta(days=1))
+        old_end_iso = self._date_param(old_end)
 
         try:
             with self.conn:
                 cur = self.conn.cursor()
                 # Update old pattern end_date if requested and if it was NULL or >= split_date
-                if end_prev and (row['end_date'] is None or date.fromisoformat(row['end_date']) >= split_date):
+                if end_prev and (old_end is None or old_end >= split_date):
                     cur.execute("UPDATE patterns SET end_date=? WHERE id=?", (old_end_target, pattern_id))
                     old_updated = cur.rowcount > 0
 
                 # Check if identical new pattern already exists
-                existing = self._find_pattern_by_key(wd_text_new, niw, split_date.isoformat(), old_end_iso)
+                existing = self._find_pattern_by_key(wd_text_new, niw, self._date_param(split_date), old_end_iso)
                 if existing:
                     new_id = existing
                 else:
@@ -622,7 +1360,7 @@ class Database:
                     # Derive label from old pattern if present
                     old_label = row['label'] if 'label' in row.keys() else None
                     new_label = f"{old_label} (ab {split_date.isoformat()} geändert)" if old_label else None
-                    cur.execute("INSERT INTO patterns (weekdays, interval_weeks, start_date, end_date, label) VALUES (?,?,?,?,?)", (wd_text_new, niw, split_date.isoformat(), old_end_iso, new_label))
+                    cur.execute("INSERT INTO patterns (weekdays, interval_weeks, start_date, end_date, label) VALUES (?,?,?,?,?)", (wd_text_new, niw, self._date_param(split_date), old_end_iso, new_label))
                     new_id = cur.lastrowid
         except Exception as e:
             # Any error triggers rollback automatically via context manager
@@ -794,69 +1532,57 @@ class Database:
         except Exception:
             return 'unknown'
 
+    @_db_method
     def remove_duplicate_patterns(self, keep_first=True) -> int:
         """
         Safe duplicate removal by merging references first.
 
-        Strategy:
-        - Find duplicate groups
-        - For each group pick canonical id (min id if keep_first)
-        - Find all tables that have a foreign key referencing patterns(id)
-        - For each such table/column: UPDATE table SET col=canonical WHERE col=duplicate
-        - After remapping all references, DELETE duplicate pattern rows
+        Strategy (set-based, one transaction):
+        - Group patterns by pattern_key; canonical id per group is min id (max if not keep_first)
+        - Fill a temp map duplicate -> canonical
+        - For each table/column with a foreign key to patterns(id): one UPDATE ... FROM map
+        - DELETE all mapped duplicates in one statement
         Returns number of deleted rows.
         """
-        dup_groups = self.find_duplicate_patterns()
-        if not dup_groups:
+        if not self.find_duplicate_patterns():
             return 0
 
-        cur = self.conn.cursor()
-        # Discover referencing tables/columns via PRAGMA foreign_key_list
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [r['name'] for r in cur.fetchall()]
-        refs = []  # list of (table, from_col, to_table, to_col)
-        for tbl in tables:
-            try:
-                fk_rows = self.conn.execute(f"PRAGMA foreign_key_list('{tbl}')").fetchall()
-            except Exception:
-                fk_rows = []
-            for fk in fk_rows:
-                # fk fields: id, seq, table, from, to, on_update, on_delete, match
-                if fk['table'] == 'patterns' and fk['to'] == 'id':
-                    refs.append((tbl, fk['from']))
-
+        refs = [(tbl, col) for tbl, col, _, _ in self.list_fk_refs_to_patterns()]
         if not refs:
             raise RuntimeError('Keine Foreign-Key-Referenzen auf patterns gefunden; Abbruch.')
 
-        total_removed = 0
-        total_updated = 0
         backup_path = None
         # Create automatic backup of DB file before modifying (if not in-memory)
         try:
-            if self.db_path and self.db_path != ':memory:' and os.path.exists(self.db_path):
-                ts = _dt.datetime.now().strftime('%Y%m%d_%H%M%S')
-                bak = f"{self.db_path}.backup_before_merge_{ts}"
-                shutil.copy2(self.db_path, bak)
-                backup_path = bak
+            backup_path = self.snapshot_backup('before_merge')
         except Exception as e:
             logging.exception('Could not create DB backup before dedup: %s', e)
             # proceed anyway, but note backup_path is None
+        canon = 'MIN' if keep_first else 'MAX'
+        cur = self.conn.cursor()
+        total_updated = 0
         try:
-            # Use a transaction
+            cur.execute("DROP TABLE IF EXISTS temp._dup_map")
+            cur.execute("CREATE TEMP TABLE _dup_map (dup INTEGER PRIMARY KEY, canonical INTEGER NOT NULL)")
+            # One transaction: map duplicate -> canonical id, remap all references, delete duplicates
             with self.conn:
-                for ids in dup_groups:
-                    canonical = ids[0] if keep_first else ids[-1]
-                    duplicates = [pid for pid in ids if pid != canonical]
-                    # Remap references
-                    for tbl, col in refs:
-                        for dup in duplicates:
-                            cur.execute(f"UPDATE {tbl} SET {col}=? WHERE {col}=?", (canonical, dup))
-                            total_updated += cur.rowcount
-                    # Delete duplicate patterns
-                    for dup in duplicates:
-                        cur.execute("DELETE FROM patterns WHERE id=?", (dup,))
-                        total_removed += cur.rowcount
+                cur.execute(f"""
+                    INSERT INTO temp._dup_map (dup, canonical)
+                    SELECT p.id, g.canonical
+                    FROM patterns p
+                    JOIN (SELECT pattern_key, {canon}(id) AS canonical FROM patterns
+                          WHERE pattern_key IS NOT NULL GROUP BY pattern_key HAVING COUNT(*) > 1) g ON g.pattern_key = p.pattern_key
+                    WHERE p.id <> g.canonical""")
+                for tbl, col in refs:
+                    cur.execute(
+                        f'UPDATE "{tbl}" SET "{col}" = m.canonical FROM temp._dup_map AS m '
+                        f'WHERE "{tbl}"."{col}" = m.dup'
+                    )
+                    total_updated += cur.rowcount
+                cur.execute("DELETE FROM patterns WHERE id IN (SELECT dup FROM temp._dup_map)")
+                total_removed = cur.rowcount
         finally:
+            cur.execute("DROP TABLE IF EXISTS temp._dup_map")
             cur.close()
 
         # Integrity check
@@ -873,6 +1599,7 @@ class Database:
             return total_removed, total_updated, backup_path
         return total_removed, total_updated
 
+    @_db_method
     def reset_plan(self, keep_visit_status: bool = True):
         """Löscht alle patterns und overrides. Wenn keep_visit_status==True, bleibt visit_status erhalten."""
         cur = self.conn.cursor()
@@ -881,8 +1608,3 @@ class Database:
         if not keep_visit_status:
             cur.execute("DELETE FROM visit_status")
         self.conn.commit()
-
-    def close(self):
-        if self.conn:
-            self.conn.close()
-            self.conn = None
@@ -0,0 +1,173 @@
+import datetime as _dt
+import os
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from kidscompass.calendar_logic import apply_overrides, generate_standard_days
+from kidscompass.instrumentation import timed
+from kidscompass.models import OverridePeriod, RemoveOverride, VisitPattern
+
+PRODID = '-//KidsCompass//Umgangsplan//DE'
+_BYDAY = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+_HOLDER_NAMES = {'mother': 'Mutter', 'father': 'Vater'}
+
+
+def _d(day: date) -> str:
+    return day.strftime('%Y%m%d')
+
+
+def _escape(text: str) -> str:
+    return (text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n'))
+
+
+def _fold(line: str) -> str:
+    """Zeilen nach RFC 5545 auf 75 Oktette falten (Fortsetzung mit führendem Leerzeichen)."""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line
+    parts, chunk = [], 75
+    while data:
+        cut = min(chunk, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:  # keine UTF-8-Sequenz teilen
+            cut -= 1
+        parts.append(data[:cut].decode('utf-8'))
+        data = data[cut:]
+        chunk = 74
+    return '\r\n '.join(parts)
+
+
+class _Rule:
+    """Ein wöchentliches Terminraster (Muster in einem Zeitabschnitt) mit seinen Terminen."""
+
+    def __init__(self, pattern: VisitPattern, lo: date, hi: date, uid: str, summary: str, source=None):
+        self.pattern = pattern
+        self.lo, self.hi = lo, hi
+        self.uid = uid
+        self.summary = summary
+        self.source = source
+        self.days: List[date] = [d for y in range(lo.year, hi.year + 1)
+                                 for d in generate_standard_days(pattern, y) if lo <= d <= hi]
+
+
+def _segments(pattern: VisitPattern, lo: date, hi: date) -> Iterator[Tuple[date, date]]:
+    """
+    Abschnitte, in denen das Muster ein einziges RRULE-Raster hat. generate_standard_days
+    setzt das Wochenraster jedes Jahr ab max(1. Januar, start_date) neu an; bei Intervall 1
+    ändert das nichts, sonst braucht jedes Jahr eine eigene Regel.
+    """
+    if pattern.interval_weeks <= 1:
+        yield lo, hi
+        return
+    for y in range(lo.year, hi.year + 1):
+        yield max(lo, date(y, 1, 1)), min(hi, date(y, 12, 31))
+
+
+def _rules(patterns, overrides, start: date, end: date) -> List[_Rule]:
+    rules = []
+    # Overrides zuerst (spätere gewinnen, vgl. apply_overrides), damit ihre Tage Betreuung/Ferienart tragen
+    for ov in reversed([o for o in overrides if isinstance(o, OverridePeriod)]):
+        lo, hi = max(ov.from_date, start), min(ov.to_date, end)
+        if lo > hi:
+            continue
+        parts = [p for p in ('Umgang', _HOLDER_NAMES.get(ov.holder, ov.holder), ov.vac_type) if p]
+        for i, (a, b) in enumerate(_segments(ov.pattern, lo, hi)):
+            rules.append(_Rule(ov.pattern, a, b, f'kc-override-{ov.id}-{i}@kidscompass',
+                               ' – '.join(parts), source=ov))
+    for p in patterns:
+        lo, hi = max(p.start_date, start), min(p.end_date or end, end)
+        if lo > hi:
+            continue
+        summary = f"Umgang ({p.label})" if p.label else 'Umgang'
+        for a, b in _segments(p, lo, hi):
+            rules.append(_Rule(p, a, b, f'kc-pattern-{p.id}-{a.isoformat()}@kidscompass', summary))
+    return rules
+
+
+def _rrule(rule: _Rule) -> str:
+    p = rule.pattern
+    # Wochenbeginn = Beginn des Rasters (Cursor von generate_standard_days), damit die
+    # Intervall-Wochen bei mehreren Wochentagen genauso gebildet werden
+    cursor = max(date(rule.lo.year, 1, 1), p.start_date)
+    byday = ','.join(_BYDAY[wd] for wd in sorted(set(p.weekdays)))
+    rrule = f"RRULE:FREQ=WEEKLY;UNTIL={_d(rule.hi)};BYDAY={byday}"
+    if p.interval_weeks > 1:
+        rrule += f";INTERVAL={p.interval_weeks};WKST={_BYDAY[cursor.weekday()]}"
+    return rrule
+
+
+def _event(rule: Optional[_Rule], uid: str, summary: str, days: List[date], exdates: List[date],
+           stamp: str, all_days: bool, description: Optional[str] = None) -> List[str]:
+    first = days[0]
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', f'DTSTAMP:{stamp}', f'DTSTART;VALUE=DATE:{_d(first)}']
+    if all_days and len(days) > 1:
+        # zusammenhängender Zeitraum (z.B. Ferienhälfte): ein mehrtägiger Termin
+        lines.append(f'DTEND;VALUE=DATE:{_d(days[-1] + timedelta(days=1))}')
+    else:
+        lines.append(f'DTEND;VALUE=DATE:{_d(first + timedelta(days=1))}')
+        if rule is not None and len(days) > 1:
+            lines.append(_rrule(rule))
+            if exdates:
+                lines.append('EXDATE;VALUE=DATE:' + ','.join(_d(d) for d in exdates))
+    lines.append(f'SUMMARY:{_escape(summary)}')
+    if description:
+        lines.append(f'DESCRIPTION:{_escape(description)}')
+    lines += ['TRANSP:TRANSPARENT', 'END:VEVENT']
+    return lines
+
+
+@timed('export.plan_ics')
+def plan_to_ics(patterns: List[VisitPattern], overrides: List[Union[OverridePeriod, RemoveOverride]],
+                start: date, end: date, now: Optional[_dt.datetime] = None,
+                calendar_name: str = 'KidsCompass Umgänge') -> Tuple[str, Dict]:
+    """
+    Umgangsplan [start, end] als iCalendar-Text. Muster werden als VEVENT mit
+    RRULE (FREQ=WEEKLY;INTERVAL;BYDAY) ausgegeben, Tage, die durch Overrides entfallen,
+    als EXDATE; Override-Zeiträume als eigene Termine (zusammenhängende Ferienhälften
+    als ein mehrtägiger Termin). Verbleibende Einzeltage werden als einzelne Termine
+    ergänzt, sodass die Termine genau den geplanten Tagen entsprechen.
+    Gibt (Text, {'events', 'rules', 'exdates', 'single', 'days'}) zurück.
+    """
+    now = now or _dt.datetime.now(_dt.timezone.utc)
+    stamp = now.astimezone(_dt.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    raw = [d for p in patterns for y in range(start.year, end.year + 1) for d in generate_standard_days(p, y)]
+    planned: Set[date] = {d for d in apply_overrides(raw, overrides) if start <= d <= end}
+
+    lines = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN',
+             'METHOD:PUBLISH', f'X-WR-CALNAME:{_escape(calendar_name)}']
+    stats = {'events': 0, 'rules': 0, 'exdates': 0, 'single': 0, 'days': len(planned)}
+    covered: Set[date] = set()
+    for rule in _rules(patterns, overrides, start, end):
+        own = [d for d in rule.days if d in planned and d not in covered]
+        if not own:
+            continue
+        first = own[0]
+        own_set = set(own)
+        # Kalender erzeugen aus DTSTART + RRULE genau rule.days ab `first`
+        exdates = [d for d in rule.days if d >= first and d not in own_set]
+        all_days = (rule.source is not None and (own[-1] - first).days + 1 == len(own))
+        description = None
+        if rule.source is not None and getattr(rule.source, 'meta', None):
+            description = str(rule.source.meta)
+        lines += _event(rule, rule.uid, rule.summary, own, exdates, stamp, all_days, description)
+        covered |= own_set
+        stats['events'] += 1
+        if len(own) > 1 and not all_days:
+            stats['rules'] += 1
+            stats['exdates'] += len(exdates)
+    for d in sorted(planned - covered):
+        lines += _event(None, f'kc-day-{d.isoformat()}@kidscompass', 'Umgang', [d], [], stamp, False)
+        stats['events'] += 1
+        stats['single'] += 1
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(_fold(l) for l in lines) + '\r\n', stats
+
+
+def write_plan_ics(target, patterns, overrides, start: date, end: date, **kwargs) -> Dict:
+    """Schreibt plan_to_ics() nach `target` (Pfad oder Textdatei); gibt die Statistik zurück."""
+    text, stats = plan_to_ics(patterns, overrides, start, end, **kwargs)
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+    else:
+        target.write(text)
+    return stats
@@ -0,0 +1,167 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List
+
+# Obergrenzen, damit eine lange Sitzung nicht unbegrenzt Speicher belegt
+MAX_SPANS = 20000
+MAX_SAMPLES = 2000
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class Recorder:
+    """
+    Sammelt Zeitspannen (Spans), Zähler und Histogramme für Hot-Paths.
+
+    Zeiten werden mit `time.perf_counter()` gemessen (monoton). Spans werden in
+    einem Ringpuffer gehalten und lassen sich als JSON oder als Chrome-Trace
+    (chrome://tracing / Perfetto) exportieren. Thread-sicher; Worker-Threads
+    erscheinen im Trace als eigene Spuren.
+    """
+
+    def __init__(self, enabled: bool = True, max_spans: int = MAX_SPANS, max_samples: int = MAX_SAMPLES):
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._spans = deque(maxlen=max_spans)
+        self._counters: Dict[str, int] = {}
+        self._hist: Dict[str, deque] = {}
+        self._hist_totals: Dict[str, list] = {}  # name -> [count, sum]
+
+    def reset(self):
+        with self._lock:
+            self._origin = time.perf_counter()
+            self._spans.clear()
+            self._counters.clear()
+            self._hist.clear()
+            self._hist_totals.clear()
+
+    # Erfassung
+    def incr(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name: str, value: float):
+        """Messwert (z.B. Dauer in Sekunden oder Zeilenzahl) in ein Histogramm aufnehmen."""
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._hist.get(name)
+            if samples is None:
+                samples = self._hist[name] = deque(maxlen=self.max_samples)
+                self._hist_totals[name] = [0, 0.0]
+            samples.append(value)
+            tot = self._hist_totals[name]
+            tot[0] += 1
+            tot[1] += value
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Zeitspanne messen: `with span('db.load_patterns'): ...`; Dauer landet auch im Histogramm."""
+        if not self.enabled:
+            yield args
+            return
+        t0 = time.perf_counter()
+        try:
+            yield args
+        finally:
+            dur = time.perf_counter() - t0
+            entry = (name, t0 - self._origin, dur, threading.get_ident(), threading.current_thread().name, args)
+            with self._lock:
+                self._spans.append(entry)
+            self.observe(name, dur)
+
+    def timed(self, name: str | None = None, trace: bool = True):
+        """
+        Decorator für Funktionen/Methoden. Mit `trace=False` wird nur Dauer und
+        Aufrufzahl erfasst (für sehr häufig aufgerufene Funktionen).
+        """
+        def deco(fn):
+            label = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            def wrapper(*a, **kw):
+                if not self.enabled:
+                    return fn(*a, **kw)
+                if trace:
+                    with self.span(label):
+                        return fn(*a, **kw)
+                t0 = time.perf_counter()
+                try:
+                    return fn(*a, **kw)
+                finally:
+                    self.observe(label, time.perf_counter() - t0)
+            return wrapper
+        return deco
+
+    # Auswertung
+    def summary(self) -> Dict:
+        """{'counters': {...}, 'histograms': {name: {count, total, mean, min, p50, p95, max}}}"""
+        with self._lock:
+            counters = dict(self._counters)
+            hist = {k: (sorted(v), list(self._hist_totals[k])) for k, v in self._hist.items()}
+        out = {}
+        for name, (values, (count, total)) in hist.items():
+            out[name] = {
+                'count': count,
+                'total': total,
+                'mean': total / count if count else 0.0,
+                'min': values[0] if values else 0.0,
+                'p50': _percentile(values, 0.5),
+                'p95': _percentile(values, 0.95),
+                'max': values[-1] if values else 0.0,
+            }
+        return {'counters': counters, 'histograms': out}
+
+    def spans(self) -> List[Dict]:
+        with self._lock:
+            entries = list(self._spans)
+        return [{'name': n, 'start': s, 'duration': d, 'thread': tname, 'tid': tid, 'args': a}
+                for n, s, d, tid, tname, a in entries]
+
+    def export_json(self, filename: str):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(dict(self.summary(), spans=self.spans()), f, indent=2, default=str)
+
+    def export_chrome_trace(self, filename: str):
+        """Trace Event Format (vollständige 'X'-Events, Zeiten in Mikrosekunden)."""
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for sp in self.spans():
+            threads[sp['tid']] = sp['thread']
+            events.append({
+                'name': sp['name'],
+                'cat': sp['name'].split('.', 1)[0],
+                'ph': 'X',
+                'ts': round(sp['start'] * 1e6, 3),
+                'dur': round(sp['duration'] * 1e6, 3),
+                'pid': pid,
+                'tid': sp['tid'],
+                'args': {k: str(v) for k, v in sp['args'].items()},
+            })
+        for tid, tname in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': tname}})
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+# Prozessweiter Recorder; abschaltbar mit KIDSCOMPASS_INSTRUMENT=0
+RECORDER = Recorder(enabled=os.environ.get('KIDSCOMPASS_INSTRUMENT', '1') != '0')
+span = RECORDER.span
+timed = RECORDER.timed
+incr = RECORDER.incr
+observe = RECORDER.observe
@@ -0,0 +1,364 @@
+import logging
+import sqlite3
+from typing import Callable, Dict, List, Tuple
+
+# Tabellen mit Änderungsjournal: Tabelle -> (Schlüsselspalte, journalisierte Spalten)
+JOURNAL_TABLES = {
+    'patterns': ('id', ('id', 'weekdays', 'interval_weeks', 'start_date', 'end_date', 'label')),
+    'overrides': ('id', ('id', 'type', 'from_date', 'to_date', 'pattern_id', 'holder', 'vac_type', 'meta')),
+    'visit_status': ('day', ('day', 'absent_mask')),
+}
+
+
+def _json_row(alias: str, cols) -> str:
+    return "json_object(" + ", ".join(f"'{c}', {alias}.{c}" for c in cols) + ")"
+
+
+def journal_trigger_sql(tables: Dict | None = None) -> List[str]:
+    """CREATE TRIGGER-Statements, die jede Schreiboperation in `changes` protokollieren."""
+    out = []
+    for tbl, (key, cols) in (tables or JOURNAL_TABLES).items():
+        changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in cols)
+        out.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{tbl}_journal_insert AFTER INSERT ON {tbl} BEGIN "
+            f"INSERT INTO changes (tbl, row_id, op, before, after) "
+            f"VALUES ('{tbl}', NEW.{key}, 'insert', NULL, {_json_row('NEW', cols)}); END"
+        )
+        out.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{tbl}_journal_update AFTER UPDATE ON {tbl} "
+            f"WHEN {changed} BEGIN "
+            f"INSERT INTO changes (tbl, row_id, op, before, after) "
+            f"VALUES ('{tbl}', NEW.{key}, 'update', {_json_row('OLD', cols)}, {_json_row('NEW', cols)}); END"
+        )
+        out.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{tbl}_journal_delete AFTER DELETE ON {tbl} BEGIN "
+            f"INSERT INTO changes (tbl, row_id, op, before, after) "
+            f"VALUES ('{tbl}', OLD.{key}, 'delete', {_json_row('OLD', cols)}, NULL); END"
+        )
+    return out
+
+
+# Datumsspalten je Tabelle; gespeichert als ISO-TEXT (Standard) oder als Tages-Ordinal
+DATE_COLUMNS = {
+    'patterns': ('start_date', 'end_date'),
+    'overrides': ('from_date', 'to_date'),
+    'visit_status': ('day',),
+}
+# Deklarierter Typ für Ordinal-Spalten; data.py registriert dafür einen Converter
+DAYORD = 'DAYORD'
+# julianday('0001-01-01') - date(1, 1, 1).toordinal()
+JULIAN_ORDINAL_OFFSET = 1721424.5
+DATE_STORAGES = ('iso', 'ordinal')
+
+
+def table_sql(table: str, date_type: str = 'TEXT', name: str | None = None) -> str:
+    """CREATE TABLE-Statement für den aktuellen Stand einer Kerntabelle."""
+    name = name or table
+    if table == 'patterns':
+        return f"""
+    CREATE TABLE IF NOT EXISTS {name} (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      weekdays TEXT NOT NULL,
+      interval_weeks INTEGER NOT NULL,
+      start_date {date_type} NOT NULL,
+      end_date {date_type},
+      label TEXT,
+      pattern_key TEXT
+    )"""
+    if table == 'overrides':
+        return f"""
+    CREATE TABLE IF NOT EXISTS {name} (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      type TEXT NOT NULL,
+      from_date {date_type} NOT NULL,
+      to_date {date_type} NOT NULL,
+      pattern_id INTEGER,
+      holder TEXT,
+      vac_type TEXT,
+      meta TEXT,
+      FOREIGN KEY(pattern_id) REFERENCES patterns(id)
+    )"""
+    if table == 'visit_status':
+        return f"""
+    CREATE TABLE IF NOT EXISTS {name} (
+      day {date_type} PRIMARY KEY,
+      absent_mask INTEGER NOT NULL DEFAULT 0
+    )"""
+    raise ValueError(f'Unbekannte Tabelle: {table}')
+
+
+def pattern_key_sql(alias: str = 'NEW') -> str:
+    """
+    SQL-Ausdruck für den normalisierten Musterschlüssel:
+    sortierte Wochentage | Intervall | Start | Ende (leer, wenn offen).
+    Ungültige Wochentagslisten gehen unverändert in den Schlüssel ein.
+    """
+    wd = f"'[' || {alias}.weekdays || ']'"
+    return (
+        f"(CASE WHEN json_valid({wd}) THEN "
+        f"(SELECT group_concat(value, ',') FROM (SELECT value FROM json_each({wd}) ORDER BY value)) "
+        f"ELSE {alias}.weekdays END) "
+        f"|| '|' || {alias}.interval_weeks || '|' || {alias}.start_date || '|' || COALESCE({alias}.end_date, '')"
+    )
+
+
+def _columns(cur: sqlite3.Cursor, table: str) -> List[str]:
+    return [row[1] for row in cur.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+# Migrationsschritte. Jeder Schritt muss idempotent sein: Text-Dumps (iterdump)
+# enthalten kein user_version, nach einem Import laufen daher alle Schritte erneut.
+def _m001_base_schema(cur: sqlite3.Cursor):
+    """Basisschema inkl. nachträglich ergänzter Spalten älterer DBs."""
+    cur.execute(table_sql('patterns'))
+    cols = _columns(cur, 'patterns')
+    if 'end_date' not in cols:
+        cur.execute("ALTER TABLE patterns ADD COLUMN end_date TEXT")
+    if 'label' not in cols:
+        cur.execute("ALTER TABLE patterns ADD COLUMN label TEXT")
+
+    cur.execute(table_sql('overrides'))
+    cols = _columns(cur, 'overrides')
+    for col in ('holder', 'vac_type', 'meta'):
+        if col not in cols:
+            cur.execute(f"ALTER TABLE overrides ADD COLUMN {col} TEXT")
+
+    cur.execute(table_sql('visit_status'))
+
+
+def _m002_change_journal(cur: sqlite3.Cursor):
+    """Änderungsjournal (append-only, per Trigger befüllt)."""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS changes (
+      seq INTEGER PRIMARY KEY AUTOINCREMENT,
+      tbl TEXT NOT NULL,
+      row_id,
+      op TEXT NOT NULL,
+      before TEXT,
+      after TEXT,
+      ts TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now'))
+    )""")
+    for stmt in journal_trigger_sql():
+        cur.execute(stmt)
+
+
+def _m003_indexes(cur: sqlite3.Cursor):
+    """Indizes für Kalender-/Statistikabfragen und Duplikatsuche."""
+    # Deckender Index: Bereichsabfragen auf visit_status lesen nur den Index
+    # (Spalten vor bzw. nach Schritt 6; neue DBs und Dumps haben bereits absent_mask)
+    presence = 'absent_mask' if 'absent_mask' in _columns(cur, 'visit_status') \
+        else 'present_child_a, present_child_b'
+    cur.execute(f"CREATE INDEX IF NOT EXISTS idx_visit_status_day_presence ON visit_status(day, {presence})")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_overrides_range ON overrides(from_date, to_date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_overrides_pattern ON overrides(pattern_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_patterns_key "
+                "ON patterns(weekdays, interval_weeks, start_date, end_date)")
+
+
+def _m004_pattern_key(cur: sqlite3.Cursor):
+    """Normalisierter, per Trigger gepflegter Musterschlüssel für die Duplikatsuche."""
+    if 'pattern_key' not in _columns(cur, 'patterns'):
+        cur.execute("ALTER TABLE patterns ADD COLUMN pattern_key TEXT")
+    cur.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_patterns_key_insert AFTER INSERT ON patterns BEGIN "
+        f"UPDATE patterns SET pattern_key = {pattern_key_sql('NEW')} WHERE id = NEW.id; END"
+    )
+    cur.execute(
+        "CREATE TRIGGER IF NOT EXISTS trg_patterns_key_update "
+        "AFTER UPDATE OF weekdays, interval_weeks, start_date, end_date ON patterns BEGIN "
+        f"UPDATE patterns SET pattern_key = {pattern_key_sql('NEW')} WHERE id = NEW.id; END"
+    )
+    cur.execute(f"UPDATE patterns SET pattern_key = {pattern_key_sql('patterns')}")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_patterns_pattern_key ON patterns(pattern_key)")
+
+
+def _m005_monthly_stats(cur: sqlite3.Cursor):
+    """Monatsaggregate für die Statistik (Database.monthly_stats), synchronisiert über das Journal."""
+    # je materialisiertem Monat genau 7 Zeilen (eine pro Wochentag, auch mit Nullen)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS monthly_stats (
+      year INTEGER NOT NULL,
+      month INTEGER NOT NULL,
+      weekday INTEGER NOT NULL,
+      planned INTEGER NOT NULL,
+      present_a INTEGER NOT NULL,
+      present_b INTEGER NOT NULL,
+      both_missing INTEGER NOT NULL,
+      PRIMARY KEY (year, month, weekday)
+    ) WITHOUT ROWID""")
+    # Journal-Sequenznummer, bis zu der die Aggregate gültig sind
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS monthly_stats_sync (
+      id INTEGER PRIMARY KEY CHECK (id = 1),
+      change_seq INTEGER NOT NULL
+    )""")
+    cur.execute("INSERT OR IGNORE INTO monthly_stats_sync (id, change_seq) VALUES (1, 0)")
+
+
+# Kinder mit Bitposition in visit_status.absent_mask; vorbelegt wie bisher fest verdrahtet
+DEFAULT_CHILDREN = ((0, 'Amilia'), (1, 'Malia'))
+MAX_CHILDREN = 63
+
+
+def _m006_children(cur: sqlite3.Cursor):
+    """Tabelle children; Anwesenheit je Tag als Bitmaske statt einer Spalte pro Kind."""
+    cur.execute(f"""
+    CREATE TABLE IF NOT EXISTS children (
+      bit INTEGER PRIMARY KEY CHECK (bit BETWEEN 0 AND {MAX_CHILDREN - 1}),
+      name TEXT NOT NULL
+    )""")
+    cur.executemany("INSERT OR IGNORE INTO children (bit, name) VALUES (?, ?)", DEFAULT_CHILDREN)
+    if 'absent_mask' not in _columns(cur, 'visit_status'):
+        # DROP COLUMN verlangt, dass keine Trigger/Indizes die alten Spalten verwenden
+        for op in ('insert', 'update', 'delete'):
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_visit_status_journal_{op}")
+        cur.execute("DROP INDEX IF EXISTS idx_visit_status_day_presence")
+        cur.execute("ALTER TABLE visit_status ADD COLUMN absent_mask INTEGER NOT NULL DEFAULT 0")
+        cur.execute("UPDATE visit_status SET absent_mask = "
+                    "(CASE WHEN present_child_a THEN 0 ELSE 1 END) | (CASE WHEN present_child_b THEN 0 ELSE 2 END)")
+        cur.execute("ALTER TABLE visit_status DROP COLUMN present_child_a")
+        cur.execute("ALTER TABLE visit_status DROP COLUMN present_child_b")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_visit_status_day_presence ON visit_status(day, absent_mask)")
+    for stmt in journal_trigger_sql({'visit_status': JOURNAL_TABLES['visit_status']}):
+        cur.execute(stmt)
+
+
+def _m007_monthly_stats_masks(cur: sqlite3.Cursor):
+    """Monatsaggregate je Abwesenheitsmaske statt fester Spalten für zwei Kinder."""
+    if 'present_a' in _columns(cur, 'monthly_stats'):
+        # Aggregate sind abgeleitete Daten; sie werden beim nächsten Zugriff neu berechnet
+        cur.execute("DROP TABLE monthly_stats")
+    # je materialisiertem Monat und Wochentag eine Zeile mit Maske 0 (auch mit days = 0),
+    # dazu eine Zeile je weiterer vorkommender Maske
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS monthly_stats (
+      year INTEGER NOT NULL,
+      month INTEGER NOT NULL,
+      weekday INTEGER NOT NULL,
+      absent_mask INTEGER NOT NULL,
+      days INTEGER NOT NULL,
+      PRIMARY KEY (year, month, weekday, absent_mask)
+    ) WITHOUT ROWID""")
+
+
+def legacy_status_row(row: Dict) -> Dict:
+    """Journal-Zeile aus der Zeit vor Schritt 6 (present_child_a/b) auf absent_mask umstellen."""
+    if 'present_child_a' not in row and 'present_child_b' not in row:
+        return row
+    row = dict(row)
+    mask = (0 if row.pop('present_child_a', 1) else 1) | (0 if row.pop('present_child_b', 1) else 2)
+    row['absent_mask'] = mask
+    return row
+
+
+# (Version, Beschreibung, Schritt) – Versionen fortlaufend, nie umnummerieren
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = [
+    (1, 'base schema', _m001_base_schema),
+    (2, 'change journal', _m002_change_journal),
+    (3, 'indexes', _m003_indexes),
+    (4, 'pattern key', _m004_pattern_key),
+    (5, 'monthly stats', _m005_monthly_stats),
+    (6, 'children and presence bitmask', _m006_children),
+    (7, 'monthly stats per absence mask', _m007_monthly_stats_masks),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target: int | None = None) -> int:
+    """
+    Bringt das Schema per `PRAGMA user_version` auf `target` (Standard: neueste Version).
+    Ist die DB aktuell, kostet das nur eine Versionsabfrage. Jeder Schritt läuft
+    zusammen mit dem Hochsetzen der Version in einer eigenen Transaktion.
+    Gibt die erreichte Version zurück.
+    """
+    target = SCHEMA_VERSION if target is None else target
+    current = schema_version(conn)
+    if current >= target:
+        if current > SCHEMA_VERSION:
+            logging.warning(f"DB-Schema v{current} ist neuer als diese Version (v{SCHEMA_VERSION})")
+        return current
+    if conn.in_transaction:
+        conn.commit()
+    for version, desc, step in MIGRATIONS:
+        if version <= current or version > target:
+            continue
+        cur = conn.cursor()
+        try:
+            cur.execute("BEGIN")
+            step(cur)
+            cur.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logging.error(f"Migration {version} ({desc}) fehlgeschlagen")
+            raise
+        logging.info(f"DB-Schema migriert auf v{version}: {desc}")
+        current = version
+    return current
+
+
+def date_storage(conn: sqlite3.Connection) -> str:
+    """'ordinal', wenn die Datumsspalten als DAYORD deklariert sind, sonst 'iso'."""
+    row = conn.execute(
+        "SELECT type FROM pragma_table_info('visit_status') WHERE name='day'").fetchone()
+    return 'ordinal' if row and str(row[0]).upper() == DAYORD else 'iso'
+
+
+def convert_date_storage(conn: sqlite3.Connection, mode: str) -> bool:
+    """
+    Baut patterns/overrides/visit_status mit ISO-TEXT- bzw. Ordinal-Datumsspalten neu auf
+    (Tabellen-Neuaufbau nach SQLite-Vorgehen für Schemaänderungen, eine Transaktion).
+    Indizes und Journal-Trigger werden neu angelegt; die Umwandlung selbst wird nicht
+    journalisiert. Gibt False zurück, wenn die DB bereits im gewünschten Format ist.
+    """
+    if mode not in DATE_STORAGES:
+        raise ValueError(f'Unbekanntes Datumsformat: {mode}')
+    migrate(conn)
+    if date_storage(conn) == mode:
+        return False
+    date_type = DAYORD if mode == 'ordinal' else 'TEXT'
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    cur = conn.cursor()
+    try:
+        cur.execute("BEGIN")
+        for tbl in ('patterns', 'overrides', 'visit_status'):
+            cols = _columns(cur, tbl)
+            exprs = []
+            for c in cols:
+                if c not in DATE_COLUMNS[tbl]:
+                    exprs.append(c)
+                elif mode == 'ordinal':
+                    exprs.append(f"CAST(julianday({c}) - {JULIAN_ORDINAL_OFFSET} AS INTEGER)")
+                else:
+                    exprs.append(f"date({c} + {JULIAN_ORDINAL_OFFSET})")
+            # sqlite_sequence existiert, sobald eine AUTOINCREMENT-Tabelle angelegt wurde (patterns)
+            seq = cur.execute("SELECT seq FROM sqlite_sequence WHERE name=?", (tbl,)).fetchone()
+            new = f'_new_{tbl}'
+            cur.execute(table_sql(tbl, date_type, name=new))
+            cur.execute(f"INSERT INTO {new} ({', '.join(cols)}) SELECT {', '.join(exprs)} FROM {tbl}")
+            cur.execute(f"DROP TABLE {tbl}")
+            cur.execute(f"ALTER TABLE {new} RENAME TO {tbl}")
+            if seq:
+                # AUTOINCREMENT-Hochwassermarke erhalten
+                cur.execute("DELETE FROM sqlite_sequence WHERE name=?", (tbl,))
+                cur.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (tbl, seq[0]))
+        _m002_change_journal(cur)
+        _m003_indexes(cur)
+        _m004_pattern_key(cur)  # Schlüssel enthält die Datumswerte im neuen Format
+        problems = cur.execute("PRAGMA foreign_key_check").fetchall()
+        if problems:
+            raise RuntimeError(f'Fremdschlüsselprüfung nach Umwandlung fehlgeschlagen: {problems}')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+    logging.info(f"Datumsspalten umgestellt auf: {mode}")
+    return True
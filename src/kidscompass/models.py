@@ -1,7 +1,9 @@
 # src/kidscompass/models.py
-from dataclasses import dataclass, field
+import copy
+from dataclasses import dataclass, field, replace
 from datetime import date
-from typing import List, Optional
+from types import MappingProxyType
+from typing import List, Mapping, Optional, Tuple
 
 @dataclass
 class VisitPattern:
@@ -45,10 +47,66 @@ class RemoveOverride:
         end = f" bis {self.to_date}" if self.to_date else ""
         return f"Entfernen ({self.from_date}{end}) (id={self.id})"
 
-@dataclass
+@dataclass(init=False)
 class VisitStatus:
-    """Status für jeden einzelnen Umgangstag."""
-    id: Optional[int] = field(default=None, init=False)    # db-Primärschlüssel
+    """
+    Status für jeden einzelnen Umgangstag.
+    Abwesenheit als Bitmaske: Bit k gesetzt = Kind k (Tabelle children) fehlt.
+    Ohne gesetztes Bit gilt ein Kind als anwesend, auch wenn es später angelegt wurde.
+    present_child_a/present_child_b sind die Bits 0 und 1.
+    """
+    id: Optional[int]                  # db-Primärschlüssel
     day: date
-    present_child_a: bool = True
-    present_child_b: bool = True
+    absent_mask: int
+
+    def __init__(self, day: date, present_child_a: bool = True, present_child_b: bool = True,
+                 absent_mask: int = 0):
+        self.id = None
+        self.day = day
+        self.absent_mask = absent_mask | (0 if present_child_a else 1) | (0 if present_child_b else 2)
+
+    def is_present(self, child: int) -> bool:
+        return not (self.absent_mask >> child) & 1
+
+    def set_present(self, child: int, present: bool):
+        if present:
+            self.absent_mask &= ~(1 << child)
+        else:
+            self.absent_mask |= 1 << child
+
+    present_child_a = property(lambda self: self.is_present(0), lambda self, v: self.set_present(0, v))
+    present_child_b = property(lambda self: self.is_present(1), lambda self, v: self.set_present(1, v))
+
+
+@dataclass
+class Child:
+    """Kind mit fester Bitposition in VisitStatus.absent_mask."""
+    bit: int
+    name: str
+
+
+@dataclass(frozen=True)
+class PlanSnapshot:
+    """
+    Unveränderlicher Stand von Mustern, Overrides und Besuchsstatus mit Revisionsnummer.
+    Wird im GUI-Thread erzeugt und an Worker übergeben, die damit ohne Sperre lesen.
+    Muster/Overrides werden kopiert und von Folge-Snapshots übernommen, solange sich der
+    Plan nicht ändert (with_status); die VisitStatus-Objekte werden geteilt
+    (copy-on-write: der Besitzer ersetzt sie bei Änderungen, statt sie zu verändern).
+    """
+    revision: int
+    patterns: Tuple[VisitPattern, ...]
+    overrides: Tuple[object, ...]
+    visit_status: Mapping[date, VisitStatus]
+    children: Tuple['Child', ...] = ()
+
+    @classmethod
+    def capture(cls, patterns, overrides, visit_status, revision: int = 0, children=()) -> 'PlanSnapshot':
+        # gemeinsames memo: ein Override-Muster, das auch als Muster geführt wird, bleibt ein Objekt
+        pats, ovs = copy.deepcopy((list(patterns or ()), list(overrides or ())))
+        return cls(revision, tuple(pats), tuple(ovs), MappingProxyType(dict(visit_status or {})),
+                   tuple(children or ()))
+
+    def with_status(self, visit_status, revision: int) -> 'PlanSnapshot':
+        """Neuer Snapshot mit geändertem Besuchsstatus; Muster/Overrides werden geteilt."""
+        return replace(self, revision=revision, visit_status=MappingProxyType(dict(visit_status or {})))
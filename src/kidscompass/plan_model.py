@@ -0,0 +1,143 @@
+from typing import Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel, Qt
+
+from kidscompass.instrumentation import timed
+from kidscompass.models import VisitPattern
+
+
+def entry_key(obj) -> Tuple[str, object]:
+    """Stabiler Schlüssel eines Eintrags: ('pattern'|'override', DB-id)."""
+    kind = 'pattern' if isinstance(obj, VisitPattern) else 'override'
+    oid = getattr(obj, 'id', None)
+    return kind, oid if oid is not None else id(obj)
+
+
+class PlanListModel(QAbstractListModel):
+    """
+    Listenmodell der Muster und Overrides (Einstellungen-Tab).
+
+    `reload()` liest den Plan aus der Datenbank und gleicht ihn mit den vorhandenen
+    Zeilen ab: entfernte Einträge werden per beginRemoveRows, neue per beginInsertRows
+    gemeldet und geänderte per dataChanged; nur bei geänderter Reihenfolge wird das
+    Modell zurückgesetzt. Anzeigetexte (str()) entstehen erst in data() und werden
+    je Eintrag zwischengespeichert.
+    """
+
+    def __init__(self, db=None, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self._entries: List = []
+        self._keys: List[Tuple[str, object]] = []
+        self._display: Dict[Tuple[str, object], str] = {}
+
+    # Qt-Schnittstelle
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._entries):
+            return None
+        obj = self._entries[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            key = self._keys[index.row()]
+            text = self._display.get(key)
+            if text is None:
+                text = self._display[key] = str(obj)
+            return text
+        if role == Qt.UserRole:
+            return obj
+        return None
+
+    # Zugriff
+    def entry(self, row: int):
+        return self._entries[row]
+
+    def entries(self) -> List:
+        return list(self._entries)
+
+    def row_of(self, obj) -> Optional[int]:
+        try:
+            return self._keys.index(entry_key(obj))
+        except ValueError:
+            return None
+
+    # Aktualisierung
+    @timed('ui.plan_model.reload')
+    def reload(self, db=None):
+        """Lädt Muster und Overrides aus der Datenbank; gibt (patterns, overrides) zurück."""
+        db = db or self.db
+        patterns = db.load_patterns()
+        overrides = db.load_overrides()
+        self.set_entries(patterns + overrides)
+        return patterns, overrides
+
+    def set_entries(self, entries: List):
+        new_keys = [entry_key(e) for e in entries]
+        new_set = set(new_keys)
+        if len(new_set) != len(new_keys):
+            self._reset(entries, new_keys)
+            return
+        # 1) entfernte Einträge, zusammenhängende Bereiche von hinten nach vorne
+        row = len(self._keys) - 1
+        while row >= 0:
+            if self._keys[row] in new_set:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._keys[row] not in new_set:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row + 1, last)
+            for k in self._keys[row + 1:last + 1]:
+                self._display.pop(k, None)
+            del self._entries[row + 1:last + 1]
+            del self._keys[row + 1:last + 1]
+            self.endRemoveRows()
+        # 2) neue Einträge einfügen, geänderte melden; Reihenfolge muss übereinstimmen
+        old_set = set(self._keys)
+        pos = 0
+        i = 0
+        while i < len(entries):
+            key = new_keys[i]
+            if key in old_set:
+                if pos >= len(self._keys) or self._keys[pos] != key:
+                    self._reset(entries, new_keys)
+                    return
+                if self._entries[pos] != entries[i]:
+                    self._display.pop(key, None)
+                    self._entries[pos] = entries[i]
+                    idx = self.index(pos)
+                    self.dataChanged.emit(idx, idx)
+                else:
+                    self._entries[pos] = entries[i]
+                pos += 1
+                i += 1
+                continue
+            j = i
+            while j < len(entries) and new_keys[j] not in old_set:
+                j += 1
+            self.beginInsertRows(QModelIndex(), pos, pos + j - i - 1)
+            self._entries[pos:pos] = entries[i:j]
+            self._keys[pos:pos] = new_keys[i:j]
+            self.endInsertRows()
+            pos += j - i
+            i = j
+
+    def _reset(self, entries, keys):
+        self.beginResetModel()
+        self._entries = list(entries)
+        self._keys = list(keys)
+        self._display.clear()
+        self.endResetModel()
+
+
+class PlanFilterProxyModel(QSortFilterProxyModel):
+    """Suche in der Eintragsliste (Teilstring, ohne Groß-/Kleinschreibung)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setFilterRole(Qt.DisplayRole)
+
+    def set_search(self, text: str):
+        self.setFilterFixedString(text.strip())
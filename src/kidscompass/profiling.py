@@ -0,0 +1,168 @@
+import cProfile
+import datetime as _dt
+import functools
+import importlib
+import inspect
+import io
+import itertools
+import json
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Tuple
+
+PROFILE_ENV = 'KIDSCOMPASS_PROFILE'
+PROFILE_FLAG = '--profile'
+# (Modul, Klasse, Methode), die im Profiling-Modus umhüllt werden
+PROFILE_TARGETS: List[Tuple[str, str, str]] = [
+    ('kidscompass.ui', 'StatisticsTab', 'on_any_filter_changed'),
+    ('kidscompass.ui', 'MainWindow', 'refresh_calendar'),
+    ('kidscompass.ui', 'ExportWorker', 'run'),
+]
+# Ein Frame genügt für die Auswertung nach Zeilen und hält den Overhead klein
+TRACEMALLOC_FRAMES = 1
+TOP_N = 40
+
+
+def profiling_requested(argv: List[str] | None = None, environ: Dict | None = None) -> bool:
+    """True bei `--profile` in argv oder gesetztem KIDSCOMPASS_PROFILE (außer '0'/'false')."""
+    argv = argv if argv is not None else []
+    environ = environ if environ is not None else os.environ
+    val = str(environ.get(PROFILE_ENV, '')).strip().lower()
+    return PROFILE_FLAG in argv or val not in ('', '0', 'false', 'no')
+
+
+def profile_dir_for(db_path: str) -> str:
+    """Profil-Artefakte liegen neben der DB: <db_dir>/profiles"""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), 'profiles')
+
+
+class Profiler:
+    """
+    Umhüllt ausgewählte Methoden mit cProfile und tracemalloc.
+
+    Pro Aufruf entstehen `<name>_<zeitstempel>_<n>.prof` (für pstats/snakeviz) und
+    eine `.json` mit Dauer, Top-Funktionen (kumulativ) und den größten
+    Speicherzuwächsen laut tracemalloc. Verschachtelte Aufrufe im selben Thread
+    werden vom äußersten Aufruf mit erfasst.
+    """
+
+    def __init__(self, out_dir: str, top: int = TOP_N, trace_memory: bool = True):
+        self.out_dir = out_dir
+        self.top = top
+        self.trace_memory = trace_memory
+        self._local = threading.local()
+        self._counter = itertools.count(1)
+        self._patched: List[Tuple[type, str, object]] = []
+        self._started_tracemalloc = False
+        self.artifacts: List[str] = []
+
+    def install(self, targets=PROFILE_TARGETS):
+        """Ersetzt die Zielmethoden an ihren Klassen (vor dem Erzeugen der Fenster aufrufen)."""
+        os.makedirs(self.out_dir, exist_ok=True)
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+            self._started_tracemalloc = True
+        for mod_name, cls_name, attr in targets:
+            cls = getattr(importlib.import_module(mod_name), cls_name)
+            original = cls.__dict__[attr]
+            setattr(cls, attr, self.wrap(original, f'{cls_name}.{attr}'))
+            self._patched.append((cls, attr, original))
+        logging.info(f"Profiling aktiv, Artefakte in {self.out_dir}")
+        return self
+
+    def uninstall(self):
+        for cls, attr, original in reversed(self._patched):
+            setattr(cls, attr, original)
+        self._patched.clear()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def wrap(self, fn, name: str):
+        # Qt übergibt Signal-Argumente nur, wenn der Slot sie annimmt; der generische Wrapper
+        # nimmt alles an, daher überzählige Positionsargumente wie PySide selbst verwerfen
+        max_args = _max_positional(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if max_args is not None and len(args) > max_args:
+                args = args[:max_args]
+            if getattr(self._local, 'active', False):
+                return fn(*args, **kwargs)
+            self._local.active = True
+            try:
+                return self._profile_call(fn, name, args, kwargs)
+            finally:
+                self._local.active = False
+        return wrapper
+
+    def _profile_call(self, fn, name, args, kwargs):
+        snap_before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        if snap_before is not None:
+            tracemalloc.reset_peak()
+        prof = cProfile.Profile()
+        started = _dt.datetime.now()
+        t0 = time.perf_counter()
+        prof.enable()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            prof.disable()
+            duration = time.perf_counter() - t0
+            try:
+                self._write(name, started, duration, prof, snap_before)
+            except Exception as e:
+                logging.warning(f"Profil für {name} konnte nicht geschrieben werden: {e}")
+
+    def _write(self, name, started, duration, prof, snap_before):
+        base = os.path.join(self.out_dir, f"{name}_{started.strftime('%Y%m%d_%H%M%S')}_{next(self._counter)}")
+        prof.dump_stats(base + '.prof')
+
+        stats = pstats.Stats(prof, stream=io.StringIO())
+        top_funcs = []
+        for (filename, line, func), (cc, nc, tt, ct, _) in sorted(
+                stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:self.top]:
+            top_funcs.append({'function': f'{filename}:{line}({func})', 'calls': nc,
+                              'tottime': tt, 'cumtime': ct})
+
+        report = {
+            'target': name,
+            'started': started.isoformat(timespec='milliseconds'),
+            'duration': duration,
+            'thread': threading.current_thread().name,
+            'profile': os.path.basename(base + '.prof'),
+            'top_cumulative': top_funcs,
+        }
+        if snap_before is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            diff = tracemalloc.take_snapshot().compare_to(snap_before, 'lineno')[:self.top]
+            report['memory'] = {
+                'current': current,
+                'peak': peak,
+                'top_growth': [{'location': str(d.traceback), 'size_diff': d.size_diff,
+                                'count_diff': d.count_diff} for d in diff],
+            }
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.artifacts.extend([base + '.prof', base + '.json'])
+        logging.info(f"Profil geschrieben: {base}.prof ({duration:.3f}s)")
+
+
+def _max_positional(fn):
+    """Anzahl der Positionsparameter von `fn` (inkl. self), None bei *args oder unbekannter Signatur."""
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return None
+    if any(p.kind is p.VAR_POSITIONAL for p in params):
+        return None
+    return sum(1 for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD))
+
+
+def enable_profiling(db_path: str, targets=PROFILE_TARGETS) -> Profiler:
+    """Profiling-Modus einschalten; Artefakte landen in <db_dir>/profiles."""
+    return Profiler(profile_dir_for(db_path)).install(targets)
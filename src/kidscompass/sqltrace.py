@@ -0,0 +1,220 @@
+import functools
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List
+
+SQLTRACE_ENV = 'KIDSCOMPASS_SQLTRACE'
+SLOW_MS_ENV = 'KIDSCOMPASS_SLOW_QUERY_MS'
+DEFAULT_SLOW_MS = 200.0
+MAX_SAMPLES = 2000
+_DIRECT = '<direkt>'
+
+logger = logging.getLogger('kidscompass.sql')
+
+_STRING_LIT = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LIT = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_WS = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Statement ohne Literalwerte (sqlite3 liefert expandierte Parameter), Whitespace normalisiert."""
+    sql = _STRING_LIT.sub('?', sql)
+    sql = _NUMBER_LIT.sub('?', sql)
+    return _WS.sub(' ', sql).strip()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class QueryStats:
+    """
+    SQL-Statistik für Database-Methoden.
+
+    Über `sqlite3.Connection.set_trace_callback` wird jedes ausgeführte Statement
+    (inkl. BEGIN/COMMIT) gezählt und der gerade laufenden Database-Methode
+    zugeordnet. Pro Methode werden Aufrufe, Laufzeit (Summe/p50/p95/max),
+    Statements und zurückgegebene Zeilen erfasst; Methoden über der
+    Slow-Query-Schwelle werden mit ihren häufigsten Statements geloggt.
+    """
+
+    def __init__(self, slow_ms: float = DEFAULT_SLOW_MS):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._methods: Dict[str, Dict] = {}
+        self._statements: Dict[str, Dict] = {}
+
+    def reset(self):
+        with self._lock:
+            self._methods.clear()
+            self._statements.clear()
+
+    # Erfassung
+    def attach(self, conn: sqlite3.Connection):
+        conn.set_trace_callback(self._on_statement)
+
+    @staticmethod
+    def detach(conn: sqlite3.Connection):
+        conn.set_trace_callback(None)
+
+    def _frame(self):
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    def _on_statement(self, sql: str):
+        key = normalize_sql(sql)
+        frame = self._frame()
+        method = frame['method'] if frame else _DIRECT
+        if frame is not None:
+            frame['statements'] += 1
+            frame['seen'][key] = frame['seen'].get(key, 0) + 1
+        with self._lock:
+            st = self._statements.get(key)
+            if st is None:
+                st = self._statements[key] = {'count': 0, 'methods': {}}
+            st['count'] += 1
+            st['methods'][method] = st['methods'].get(method, 0) + 1
+            if frame is None:
+                self._method_entry(_DIRECT)['statements'] += 1
+
+    def _method_entry(self, method: str) -> Dict:
+        m = self._methods.get(method)
+        if m is None:
+            m = self._methods[method] = {'calls': 0, 'total': 0.0, 'samples': deque(maxlen=MAX_SAMPLES),
+                                         'statements': 0, 'rows': 0, 'slow': 0}
+        return m
+
+    @contextmanager
+    def track(self, method: str):
+        """Ordnet alle Statements im Block `method` zu und misst dessen Laufzeit."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        frame = {'method': method, 'statements': 0, 'rows': 0, 'seen': {}}
+        stack.append(frame)
+        t0 = time.perf_counter()
+        try:
+            yield frame
+        finally:
+            dur = time.perf_counter() - t0
+            stack.pop()
+            if stack:
+                # verschachtelte Methode: Statements zählen auch beim Aufrufer
+                stack[-1]['statements'] += frame['statements']
+            slow = dur * 1000 >= self.slow_ms
+            with self._lock:
+                m = self._method_entry(method)
+                m['calls'] += 1
+                m['total'] += dur
+                m['samples'].append(dur)
+                m['statements'] += frame['statements']
+                m['rows'] += frame['rows']
+                m['slow'] += int(slow)
+            if slow:
+                top = sorted(frame['seen'].items(), key=lambda kv: kv[1], reverse=True)[:3]
+                logger.warning(
+                    f"Langsame DB-Methode {method}: {dur * 1000:.1f} ms, {frame['statements']} Statements, "
+                    f"{frame['rows']} Zeilen; häufigste: " + '; '.join(f"{n}x {s[:120]}" for s, n in top))
+
+    # Auswertung
+    def method_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            items = [(k, dict(v, samples=list(v['samples']))) for k, v in self._methods.items()]
+        out = {}
+        for name, m in items:
+            calls = m['calls']
+            out[name] = {
+                'calls': calls,
+                'total_ms': m['total'] * 1000,
+                'p50_ms': _percentile(m['samples'], 0.5) * 1000,
+                'p95_ms': _percentile(m['samples'], 0.95) * 1000,
+                'max_ms': max(m['samples'], default=0.0) * 1000,
+                'statements': m['statements'],
+                'statements_per_call': m['statements'] / calls if calls else float(m['statements']),
+                'rows': m['rows'],
+                'slow': m['slow'],
+            }
+        return out
+
+    def statement_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {k: {'count': v['count'], 'methods': dict(v['methods'])} for k, v in self._statements.items()}
+
+    def report(self, top: int = 15) -> str:
+        lines = [f"{'Methode':32s} {'Aufrufe':>7s} {'Summe ms':>9s} {'p50':>8s} {'p95':>8s} "
+                 f"{'Stmts/Aufruf':>12s} {'Zeilen':>8s} {'langsam':>7s}"]
+        for name, m in sorted(self.method_stats().items(), key=lambda kv: kv[1]['total_ms'], reverse=True):
+            lines.append(f"{name:32s} {m['calls']:7d} {m['total_ms']:9.1f} {m['p50_ms']:8.2f} {m['p95_ms']:8.2f} "
+                         f"{m['statements_per_call']:12.1f} {m['rows']:8d} {m['slow']:7d}")
+        lines.append('')
+        for sql, st in sorted(self.statement_stats().items(), key=lambda kv: kv[1]['count'], reverse=True)[:top]:
+            lines.append(f"{st['count']:7d}x {sql[:110]}")
+        return '\n'.join(lines)
+
+    def log_summary(self, level=logging.INFO):
+        if self._methods:
+            logger.log(level, "SQL-Statistik:\n" + self.report())
+
+
+_ACTIVE: QueryStats | None = None
+
+
+def active() -> QueryStats | None:
+    return _ACTIVE
+
+
+def enable(slow_ms: float | None = None) -> QueryStats:
+    """Schaltet die SQL-Statistik prozessweit ein (neue Verbindungen werden angehängt)."""
+    global _ACTIVE
+    if _ACTIVE is None:
+        _ACTIVE = QueryStats(DEFAULT_SLOW_MS if slow_ms is None else slow_ms)
+    elif slow_ms is not None:
+        _ACTIVE.slow_ms = slow_ms
+    return _ACTIVE
+
+
+def disable():
+    global _ACTIVE
+    _ACTIVE = None
+
+
+def enable_from_env(environ=None) -> QueryStats | None:
+    """KIDSCOMPASS_SQLTRACE=1 schaltet ein; KIDSCOMPASS_SLOW_QUERY_MS setzt die Schwelle."""
+    environ = environ if environ is not None else os.environ
+    if str(environ.get(SQLTRACE_ENV, '')).strip().lower() in ('', '0', 'false', 'no'):
+        return None
+    slow = environ.get(SLOW_MS_ENV)
+    return enable(float(slow) if slow else None)
+
+
+def attach(conn: sqlite3.Connection):
+    """Hängt die aktive Statistik (falls eingeschaltet) an eine Verbindung."""
+    if _ACTIVE is not None:
+        _ACTIVE.attach(conn)
+
+
+def traced(fn):
+    """Decorator für Database-Methoden: Statement-Zuordnung, Laufzeit und Zeilenzahl (len des Ergebnisses)."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        stats = _ACTIVE
+        if stats is None:
+            return fn(*args, **kwargs)
+        with stats.track(name) as frame:
+            result = fn(*args, **kwargs)
+            if isinstance(result, (list, dict)):
+                frame['rows'] = len(result)
+            return result
+    return wrapper
@@ -1,56 +1,121 @@
+import datetime
+from dataclasses import dataclass, field
 from datetime import date
-from typing import List, Dict
+from typing import List, Dict, Optional
 from kidscompass.data import Database
 from kidscompass.models import VisitStatus
+from kidscompass.instrumentation import timed
 
 
+@timed('statistics.count_missing_by_weekday')
 def count_missing_by_weekday(db: Database) -> dict[int, dict[str, int]]:
     """
     0 -> {'missed_a': Anzahl Tage, an denen A fehlt (inkl. beide fehlen)}
     1 -> {'missed_b': Anzahl Tage, an denen B fehlt (inkl. beide fehlen)}
     2 -> {'both_missing': Anzahl Tage, an denen beide fehlen}
     """
-    status = db.load_all_status()
-    missed_a     = sum(1 for vs in status.values() if not vs.present_child_a)
-    missed_b     = sum(1 for vs in status.values() if not vs.present_child_b)
-    both_missing = sum(1 for vs in status.values()
-                       if not vs.present_child_a and not vs.present_child_b)
+    att = child_attendance(db.load_status_arrays()['mask'], 2)
+    return {
+        0: {'missed_a': att['absent'][0]},
+        1: {'missed_b': att['absent'][1]},
+        2: {'both_missing': att['all_absent']},
+    }
+
+
+def presence_matrix(masks, n_children: int):
+    """Bool-Matrix Tage x Kinder aus Abwesenheitsmasken (True = anwesend, Spalte k = Bit k)."""
+    import numpy as np
+    masks = np.asarray(masks, dtype=np.int64).reshape(-1)
+    return ((masks[:, None] >> np.arange(n_children, dtype=np.int64)) & 1) == 0
+
 
+@timed('statistics.child_attendance')
+def child_attendance(masks, n_children: int) -> Dict:
+    """
+    Vektorisierte Zählung je Kind über Abwesenheitsmasken (z.B. load_status_arrays()['mask']):
+      present/absent : Listen mit einem Wert je Kind (Bit 0..n_children-1)
+      all_present    : Tage, an denen alle Kinder da waren
+      all_absent     : Tage, an denen alle Kinder fehlten
+      absent_count   : Anzahl fehlender Kinder je Tag (popcount, NumPy-Array)
+    """
+    import numpy as np
+    masks = np.asarray(masks, dtype=np.int64).reshape(-1) & ((1 << n_children) - 1)
+    absent = ~presence_matrix(masks, n_children)
+    if hasattr(np, 'bitwise_count'):
+        absent_count = np.bitwise_count(masks).astype(np.int64)
+    else:
+        absent_count = absent.sum(axis=1)
+    per_child_absent = absent.sum(axis=0)
     return {
-        0: {'missed_a': missed_a},
-        1: {'missed_b': missed_b},
-        2: {'both_missing': both_missing},
+        'present': [int(len(masks) - a) for a in per_child_absent],
+        'absent': [int(a) for a in per_child_absent],
+        'all_present': int(np.count_nonzero(absent_count == 0)),
+        'all_absent': int(np.count_nonzero(absent_count == n_children)),
+        'absent_count': absent_count,
     }
 
 
-def summarize_visits(planned: List[date], visit_status: Dict[date, VisitStatus]) -> Dict[str, int]:
+# Auswahl "alle Kinder" im Statistik-Tab (bei genau zwei Kindern "Beide")
+ALL_CHILDREN_LABELS = ('Alle', 'Beide')
+
+
+def all_children_label(children) -> str:
+    return 'Beide' if len(children) == 2 else 'Alle'
+
+
+def mask_counts(masks: Dict[int, int], bits) -> Dict:
     """
-    Gesamt-Zusammenfassung für gegebene Liste geplanter Termine:
-      total         : Gesamtzahl der Termine
-      missed_a      : Anzahl Termine, an denen Kind A nicht da war
-      missed_b      : Anzahl Termine, an denen Kind B nicht da war
-      both_present  : Anzahl Termine, an denen beide Kinder da waren
-      both_missing  : Anzahl Termine, an denen beide Kinder fehlten
-    """
-    total = len(planned)
-    missed_a = sum(1 for d in planned
-                   if d in visit_status and not visit_status[d].present_child_a)
-    missed_b = sum(1 for d in planned
-                   if d in visit_status and not visit_status[d].present_child_b)
-    both_missing = sum(1 for d in planned
-                       if d in visit_status and not visit_status[d].present_child_a and not visit_status[d].present_child_b)
-    both_present = sum(1 for d in planned
-                       if d not in visit_status or (visit_status[d].present_child_a and visit_status[d].present_child_b))
+    Auswertung eines Histogramms {absent_mask: Tage} für die Kinder-Bits `bits`:
+    {'planned', 'present': {bit: Tage}, 'all_present', 'all_absent'}.
+    """
+    bits = list(bits)
+    full = sum(1 << b for b in bits)
+    return {
+        'planned': sum(masks.values()),
+        'present': {b: sum(n for m, n in masks.items() if not (m >> b) & 1) for b in bits},
+        'all_present': sum(n for m, n in masks.items() if not m & full),
+        'all_absent': sum(n for m, n in masks.items() if full and m & full == full),
+    }
 
+
+def absence_label(mask: int, children) -> str:
+    """Statustext eines Tages: 'Alle da', '<Name> fehlt', '<A>, <B> fehlen', 'Beide/Alle fehlen'."""
+    absent = [c.name for c in children if (mask >> c.bit) & 1]
+    if not absent:
+        return 'Alle da'
+    if len(absent) == len(children) and len(children) > 1:
+        return f"{all_children_label(children)} fehlen"
+    return f"{', '.join(absent)} {'fehlt' if len(absent) == 1 else 'fehlen'}"
+
+
+@timed('statistics.summarize_visits')
+def summarize_visits(planned: List[date], visit_status: Dict[date, VisitStatus], bits=(0, 1)) -> Dict:
+    """
+    Gesamt-Zusammenfassung für gegebene Liste geplanter Termine und die Kinder-Bits `bits`:
+      total         : Gesamtzahl der Termine
+      missed        : {bit: Anzahl Termine, an denen das Kind nicht da war}
+      missed_a/_b   : missed für Bit 0/1
+      both_present  : Anzahl Termine, an denen alle Kinder da waren
+      both_missing  : Anzahl Termine, an denen alle Kinder fehlten
+    """
+    hist: Dict[int, int] = {}
+    for d in planned:
+        vs = visit_status.get(d)
+        mask = vs.absent_mask if vs is not None else 0
+        hist[mask] = hist.get(mask, 0) + 1
+    c = mask_counts(hist, bits)
+    missed = {b: c['planned'] - n for b, n in c['present'].items()}
     return {
-        'total': total,
-        'missed_a': missed_a,
-        'missed_b': missed_b,
-        'both_missing': both_missing,
-        'both_present': both_present,
+        'total': len(planned),
+        'missed': missed,
+        'missed_a': missed.get(0, 0),
+        'missed_b': missed.get(1, 0),
+        'both_missing': c['all_absent'],
+        'both_present': c['all_present'],
     }
 
 
+@timed('statistics.calculate_trends')
 def calculate_trends(filtered_visits: List[Dict], period: str = 'weekly') -> Dict[str, List[int]]:
     """Berechnet Trends basierend auf gefilterten Besuchsdaten."""
     from collections import defaultdict
@@ -71,3 +136,304 @@ def calculate_trends(filtered_visits: List[Dict], period: str = 'weekly') -> Dic
 
     sorted_keys = sorted(trends.keys())
     return {"periods": sorted_keys, "counts": [trends[k] for k in sorted_keys]}
+
+
+def sum_monthly_stats(rows: List[Dict], weekdays=None, bits=(0, 1)) -> Dict:
+    """
+    Summiert Zeilen aus Database.monthly_stats (optional nur für `weekdays`) für die
+    Kinder-Bits `bits` (Tabelle children):
+    {'planned', 'present': {bit: Tage}, 'all_present', 'all_absent', 'by_weekday': {wd: {...}}}
+    """
+    total: Dict[int, int] = {}
+    by_weekday: Dict[int, Dict[int, int]] = {}
+    for row in rows:
+        wd = row['weekday']
+        if weekdays is not None and wd not in weekdays:
+            continue
+        per = by_weekday.setdefault(wd, {})
+        for mask, n in row['masks'].items():
+            per[mask] = per.get(mask, 0) + n
+            total[mask] = total.get(mask, 0) + n
+    out = mask_counts(total, bits)
+    out['by_weekday'] = {wd: mask_counts(m, bits) for wd, m in by_weekday.items()}
+    return out
+
+
+EMPTY_SUMMARY = ("Keine geplanten Umgänge für die gewählten Filter gefunden.\n\n"
+                 "Bitte prüfen Sie Zeitraum und Muster.")
+
+
+@dataclass
+class StatisticsResult:
+    """
+    Ergebnis einer Statistik-Auswertung für einen Filterzustand (Zeitraum, Wochentage, Modus).
+    Wird einmal berechnet und von Textansicht, Trend-Diagramm, CSV- und PDF-Export genutzt;
+    das Diagramm wird beim ersten Zugriff gerendert und als PNG-Bytes behalten.
+    """
+    start: date
+    end: date
+    weekdays: List[int]
+    mode: str
+    totals: Dict                       # sum_monthly_stats über die gewählten Wochentage
+    recent: Dict                       # dito für die letzten 12 Wochen
+    summary: str                       # Text für Ansicht und PDF
+    visits: List[Dict]                 # erfasste Status an geplanten Tagen (query_visits-Format)
+    trend: List[tuple]                 # (Label, [anwesend je Kind in trend_names], geplant) je Zeitraum
+    trend_title: str = ''
+    custody: Dict = field(default_factory=dict)  # custody_totals() für den Zeitraum
+    heatmap: Dict = field(default_factory=dict, repr=False)  # Jahr -> Raster (year_heatmap_grids)
+    heatmap_key: Optional[tuple] = None                       # Cache-Schlüssel (DB, Jahre, Revision, Kinder)
+    children: List = field(default_factory=list)              # Child-Einträge (Tabelle children)
+    trend_names: List[str] = field(default_factory=list)      # Kinder im Trend-Diagramm
+    _chart: Optional[bytes] = field(default=None, repr=False, compare=False)
+
+    def summary_lines(self) -> List[str]:
+        return self.summary.split('\n')
+
+    def chart_png(self) -> Optional[bytes]:
+        """Trend-Diagramm als PNG (None, wenn keine erfassten Besuche vorliegen)."""
+        if not self.visits:
+            return None
+        if self._chart is None:
+            from kidscompass.charts import render_trend_chart
+            self._chart = render_trend_chart(self.trend, self.mode, self.trend_title, self.trend_names)
+        return self._chart
+
+    def heatmap_png(self) -> Optional[bytes]:
+        """Jahres-Heatmap als PNG (None ohne geplante Tage); zwischengespeichert je (DB, Jahre, Revision)."""
+        if not self.heatmap:
+            return None
+        png = _HEATMAP_PNG_CACHE.get(self.heatmap_key)
+        if png is None:
+            from kidscompass.charts import render_year_heatmap
+            png = render_year_heatmap(self.heatmap)
+            _HEATMAP_PNG_CACHE.clear()
+            _HEATMAP_PNG_CACHE[self.heatmap_key] = png
+        return png
+
+
+# Zustände je Tag in der Jahres-Heatmap
+HEATMAP_NOT_PLANNED, HEATMAP_PLANNED, HEATMAP_PARTLY_ABSENT, HEATMAP_ALL_ABSENT = range(4)
+_HEATMAP_CACHE: Dict[tuple, object] = {}      # (DB-Pfad, Jahr, Revision, Kinder) -> 7x54-Raster
+_HEATMAP_PNG_CACHE: Dict[tuple, bytes] = {}   # (DB-Pfad, Jahre, Revision) -> PNG
+
+
+def year_heatmap_grid(year: int, planned_ordinals, status_ordinals, masks, n_children: int = 2):
+    """
+    Raster Wochentag x Kalenderwoche (7 x 54, float, NaN außerhalb des Jahres) eines Jahres
+    aus Tagesnummern (date.toordinal): 0 kein Umgang, 1 geplant (alle da bzw. kein Status),
+    2 teilweise abwesend (ein oder mehrere, aber nicht alle Kinder fehlen), 3 alle Kinder fehlen.
+    Status zählt nur an geplanten Tagen.
+    """
+    import numpy as np
+    base = date(year, 1, 1).toordinal()
+    n = date(year, 12, 31).toordinal() - base + 1
+    states = np.zeros(n, dtype=np.int8)
+    p = np.asarray(planned_ordinals, dtype=np.int64) - base
+    states[p[(p >= 0) & (p < n)]] = HEATMAP_PLANNED
+    s = np.asarray(status_ordinals, dtype=np.int64) - base
+    keep = (s >= 0) & (s < n)
+    s = s[keep]
+    absent = child_attendance(np.asarray(masks, dtype=np.int64)[keep], n_children)['absent_count']
+    st = np.where(absent == 0, HEATMAP_PLANNED,
+                  np.where(absent >= n_children, HEATMAP_ALL_ABSENT, HEATMAP_PARTLY_ABSENT)).astype(np.int8)
+    states[s] = np.where(states[s] != HEATMAP_NOT_PLANNED, st, HEATMAP_NOT_PLANNED)
+    offset = np.arange(n) + date(year, 1, 1).weekday()
+    grid = np.full((7, 54), np.nan)
+    grid[offset % 7, offset // 7] = states
+    return grid
+
+
+@timed('statistics.year_heatmap_grids')
+def year_heatmap_grids(db: Database, years: List[int]) -> Dict:
+    """
+    Heatmap-Raster je Jahr, zwischengespeichert je (DB, Jahr, Revision des Änderungsjournals,
+    Anzahl Kinder laut Tabelle children). Fehlende Jahre werden gemeinsam berechnet: ein Durchlauf über die geplanten Tage und
+    ein Status-Array für den ganzen Bereich.
+    """
+    from kidscompass.calendar_logic import iter_planned_days
+    import numpy as np
+    revision = db.current_change_seq()
+    n_children = len(db.load_children())
+    key = lambda y: (db.db_path, y, revision, n_children)
+    missing = [y for y in years if key(y) not in _HEATMAP_CACHE]
+    if missing:
+        for k in [k for k in _HEATMAP_CACHE if k[0] == db.db_path and k[2:] != (revision, n_children)]:
+            del _HEATMAP_CACHE[k]
+        start, end = date(min(missing), 1, 1), date(max(missing), 12, 31)
+        planned = np.fromiter((d.toordinal() for d, _ in
+                               iter_planned_days(db.load_patterns(), db.load_overrides(), start, end)), dtype=np.int64)
+        status = db.load_status_arrays(start, end)
+        for y in missing:
+            _HEATMAP_CACHE[key(y)] = year_heatmap_grid(y, planned, status['ordinal'], status['mask'], n_children)
+    return {y: _HEATMAP_CACHE[key(y)] for y in years}
+
+
+HOLDER_LABELS = {'mother': 'Mutter', 'father': 'Vater'}
+
+
+@timed('statistics.custody_summary')
+def custody_summary(patterns, overrides, start_d: date, end_d: date) -> Dict:
+    """Betreuungstage je Elternteil, Ferienart und Monat (siehe custody.resolve_holders)."""
+    from kidscompass.custody import custody_totals, resolve_holders
+    return custody_totals(resolve_holders(patterns, overrides, start_d, end_d))
+
+
+def custody_text(totals: Dict) -> str:
+    """Textblock 'Betreuungstage' für Ansicht und PDF."""
+    if not totals.get('days'):
+        return ''
+    days = totals['days']
+    lines = ["Betreuungstage:"]
+    for h, n in totals['by_holder'].items():
+        lines.append(f"{HOLDER_LABELS.get(h, h)}: {n} ({round(n / days * 100, 1)}%)")
+    for vac, by_h in totals['by_vac_type'].items():
+        parts = ', '.join(f"{HOLDER_LABELS.get(h, h)} {n}" for h, n in by_h.items())
+        lines.append(f"Ferien {vac}: {parts}")
+    return '\n'.join(lines)
+
+
+def _trend_periods(db: Database, patterns, overrides, visit_status, start_d: date, end_d: date,
+                   sel_wds: List[int], bits: List[int]):
+    """
+    Zeiträume für das Trend-Diagramm: 4-Wochen-Fenster, bei mehr als einem Jahr Monate (Aggregate).
+    Je Zeitraum (Label, [anwesend je Bit in `bits`], geplant).
+    """
+    if (end_d - start_d).days > 366:
+        by_month = {}
+        for row in db.monthly_stats(start_d, end_d):
+            by_month.setdefault((row['year'], row['month']), []).append(row)
+        periods = []
+        for (y, m), month_rows in sorted(by_month.items()):
+            c = sum_monthly_stats(month_rows, sel_wds, bits)
+            periods.append((f"{m:02d}.{y}", [c['present'][b] for b in bits], c['planned']))
+        return periods, 'Monate'
+
+    from kidscompass.calendar_logic import generate_standard_days, apply_overrides
+    planned = apply_overrides(
+        sum((generate_standard_days(p, y) for p in patterns for y in range(start_d.year, end_d.year + 1)), []),
+        overrides
+    )
+    planned = [d for d in planned if start_d <= d <= end_d and d.weekday() in sel_wds]
+    periods = []
+    window_start = start_d
+    while window_start <= end_d:
+        window_end = min(window_start + datetime.timedelta(days=27), end_d)
+        days = [d for d in planned if window_start <= d <= window_end]
+        masks = [visit_status[d].absent_mask if d in visit_status else 0 for d in days]
+        present = [sum(1 for m in masks if not (m >> b) & 1) for b in bits]
+        periods.append((f"{window_start.strftime('%d.%m')} - {window_end.strftime('%d.%m')}", present, len(days)))
+        window_start = window_end + datetime.timedelta(days=1)
+    return periods, '4-Wochen-Inkremente'
+
+
+@timed('statistics.compute_statistics')
+def compute_statistics(db: Database, start_d: date, end_d: date, sel_wds: List[int], mode: str,
+                       patterns, overrides, visit_status, today: Optional[date] = None) -> StatisticsResult:
+    """
+    Statistik für den StatisticsTab: Summen aus den Monatsaggregaten, Wochentags- und
+    12-Wochen-Auswertung als Text, erfasste Besuche an geplanten Tagen und Trend-Zeiträume.
+    `mode` ist der Name eines Kindes (Tabelle children) oder 'Alle'/'Beide' für alle Kinder.
+    """
+    from kidscompass.calendar_logic import is_planned
+    from kidscompass.stats_export import WEEKDAY_NAMES
+
+    children = db.load_children()
+    bits = [c.bit for c in children]
+    selected = [c for c in children if c.name == mode] or children
+    rows = db.monthly_stats(start_d, end_d)
+    if sum_monthly_stats(rows, bits=bits)['planned'] == 0:
+        empty = dict(mask_counts({}, bits), by_weekday={})
+        return StatisticsResult(start_d, end_d, list(sel_wds), mode, empty, dict(empty), EMPTY_SUMMARY, [], [],
+                                children=children, trend_names=[c.name for c in selected])
+
+    sel = sum_monthly_stats(rows, sel_wds, bits)
+    total = sel['planned']
+
+    def wd_counts(i):
+        return sel['by_weekday'].get(i) or mask_counts({}, bits)
+
+    def pct(part, whole):
+        return part / whole * 100 if whole else 0.0
+
+    def pct1(part, whole):
+        return round(part / whole * 100, 1) if whole else 0.0
+
+    # Entwicklung Umgangsfrequenz: Prozent Anwesenheit letzte 12 Wochen vs Gesamtzeitraum (ohne rollierende Fenster)
+    today = today or datetime.date.today()
+    last_12_weeks_start = today - datetime.timedelta(weeks=12)
+    recent = sum_monthly_stats(db.monthly_stats(max(start_d, last_12_weeks_start), end_d), sel_wds, bits)
+
+    if len(selected) != 1 or mode in ALL_CHILDREN_LABELS:
+        # Wochentagsauswertung: absolute und prozentuale Anwesenheit je Kind (nur gefilterte Wochentage)
+        weekday_stats = []
+        for i in range(7):
+            if i not in sel_wds:
+                continue
+            c = wd_counts(i)
+            weekday_stats.append(f"{WEEKDAY_NAMES[i]}: " + ", ".join(
+                f"{ch.name} {c['present'][ch.bit]}/{c['planned']} ({pct1(c['present'][ch.bit], c['planned'])}%)"
+                for ch in selected))
+
+        presence, trend_lines = [], []
+        for ch in selected:
+            rel = sel['present'][ch.bit]
+            miss = total - rel
+            presence.append(f"{ch.name} anwesend: {rel} ({pct1(rel, total)}%)\n"
+                            f"{ch.name} abwesend: {miss} ({pct1(miss, total)}%)")
+            total_pct = pct(rel, total)
+            last_12_pct = pct(recent['present'][ch.bit], recent['planned'])
+            trend_lines.append(f"{ch.name} Gesamt: {total_pct:.1f}%\n"
+                               f"{ch.name} letzte 12 Wochen: {last_12_pct:.1f}%\n"
+                               f"Veränderung: {round(last_12_pct - total_pct, 1):+.1f}%")
+
+        summary = (
+            f"Geplante Umgänge: {total}\n" + "\n".join(presence) + "\n"
+            f"\nWochentagsauswertung:\n" + "\n".join(weekday_stats) +
+            f"\n\nEntwicklung Umgangsfrequenz (letzte 12 Wochen vs Gesamt):\n" + "\n".join(trend_lines)
+        )
+    else:
+        # Einzelkind-Modus auf Basis der Aggregate und gefilterten Wochentage
+        bit = selected[0].bit
+        rel = sel['present'][bit]
+        miss = total - rel
+        weekday_stats = []
+        for i in range(7):
+            if i not in sel_wds:
+                continue
+            c = wd_counts(i)
+            weekday_stats.append(
+                f"{WEEKDAY_NAMES[i]}: {c['present'][bit]}/{c['planned']} ({pct1(c['present'][bit], c['planned'])}%)"
+            )
+
+        total_pct = pct(rel, total)
+        last_12_pct = pct(recent['present'][bit], recent['planned'])
+
+        change = round(last_12_pct - total_pct, 1)
+
+        trend_summary = (
+            f"Gesamt: {total_pct:.1f}%\n"
+            f"Letzte 12 Wochen: {last_12_pct:.1f}%\n"
+            f"Veränderung: {change:+.1f}%"
+        )
+
+        summary = (
+            f"Geplante Umgänge: {total}\n"
+            f"{mode} anwesend: {rel} ({pct1(rel, total)}%)\n"
+            f"{mode} abwesend: {miss} ({pct1(miss, total)}%)\n"
+            f"\nWochentagsauswertung ({mode} anwesend):\n" + "\n".join(weekday_stats) +
+            f"\n\nEntwicklung Umgangsfrequenz (letzte 12 Wochen vs Gesamt):\n" + trend_summary
+        )
+
+    custody = custody_summary(patterns, overrides, start_d, end_d)
+    if custody['days']:
+        summary += "\n\n" + custody_text(custody)
+    visits = [v for v in db.query_visits(start_d, end_d, sel_wds, {})
+              if v["day"].weekday() in sel_wds and is_planned(v["day"], patterns, overrides)]
+    trend, trend_title = _trend_periods(db, patterns, overrides, visit_status, start_d, end_d, sel_wds,
+                                        [c.bit for c in selected])
+    years = list(range(start_d.year, end_d.year + 1))
+    heatmap = year_heatmap_grids(db, years)
+    return StatisticsResult(start_d, end_d, list(sel_wds), mode, sel, recent, summary, visits, trend, trend_title,
+                            custody, heatmap, (db.db_path, tuple(years), db.current_change_seq(), len(children)),
+                            children=children, trend_names=[c.name for c in selected])
@@ -0,0 +1,150 @@
+import csv
+import os
+from datetime import date
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from kidscompass.calendar_logic import iter_planned_days
+from kidscompass.data import Database
+from kidscompass.instrumentation import timed
+from kidscompass.migrations import DEFAULT_CHILDREN
+from kidscompass.models import Child
+
+WEEKDAY_NAMES = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+_HOLDER_NAMES = {'mother': 'Mutter', 'father': 'Vater'}
+
+
+def merge_status(planned: Iterable[Tuple[date, object]],
+                 status: Iterable[Tuple[date, int]]) -> Iterator[Tuple[date, object, Optional[int]]]:
+    """
+    Merge-Join zweier nach Datum sortierter Ströme: geplante Tage (Tag, Quelle) und
+    Statuszeilen (Tag, absent_mask). Liefert (Tag, Quelle, Maske oder None) für jeden
+    geplanten Tag; Statuszeilen ohne geplanten Tag werden übersprungen.
+    """
+    status = iter(status)
+    cur = next(status, None)
+    for day, source in planned:
+        while cur is not None and cur[0] < day:
+            cur = next(status, None)
+        mask = cur[1] if cur is not None and cur[0] == day else None
+        yield day, source, mask
+
+
+def export_rows(db: Database, start: date, end: date, weekdays: Optional[List[int]] = None,
+                children: Optional[List] = None) -> Iterator[List]:
+    """
+    Exportzeilen (ohne Kopfzeile) für geplante Tage im Zeitraum: Datum, Wochentag,
+    Anwesenheit je Kind (1/0), Status erfasst (1/0), Betreuung, Ferienart.
+    """
+    children = db.load_children() if children is None else children
+    planned = iter_planned_days(db.load_patterns(), db.load_overrides(), start, end)
+    if weekdays is not None:
+        wds = set(weekdays)
+        planned = ((d, src) for d, src in planned if d.weekday() in wds)
+    for day, source, mask in merge_status(planned, db.iter_status(start, end)):
+        bits = mask or 0
+        holder = getattr(source, 'holder', None)
+        yield ([day.isoformat(), WEEKDAY_NAMES[day.weekday()]]
+               + [int(not (bits >> c.bit) & 1) for c in children]
+               + [int(mask is not None), _HOLDER_NAMES.get(holder, holder or ''),
+                  getattr(source, 'vac_type', None) or ''])
+
+
+def header(children: List) -> List[str]:
+    return (["Datum", "Wochentag"] + [f"{c.name} anwesend" for c in children]
+            + ["Status erfasst", "Betreuung", "Ferienart"])
+
+
+@timed('export.statistics_csv')
+def write_statistics_csv(db: Database, target, start: date, end: date,
+                         weekdays: Optional[List[int]] = None, delimiter: Optional[str] = None,
+                         children: Optional[List] = None) -> int:
+    """
+    Schreibt den Statistik-Export zeilenweise nach `target` (Pfad oder Textdatei).
+    Ohne `delimiter` bestimmt die Dateiendung das Format (.tsv -> Tab, sonst Komma).
+    Gibt die Anzahl der Datenzeilen zurück.
+    """
+    children = db.load_children() if children is None else children
+    if delimiter is None:
+        name = target if isinstance(target, str) else getattr(target, 'name', '')
+        delimiter = '\t' if str(name).lower().endswith('.tsv') else ','
+    if isinstance(target, (str, os.PathLike)):
+        with open(target, 'w', newline='', encoding='utf-8') as f:
+            return _write(f, db, start, end, weekdays, delimiter, children)
+    return _write(target, db, start, end, weekdays, delimiter, children)
+
+
+def _write(f: TextIO, db, start, end, weekdays, delimiter, children) -> int:
+    writer = csv.writer(f, delimiter=delimiter)
+    writer.writerow(header(children))
+    n = 0
+    for row in export_rows(db, start, end, weekdays, children):
+        writer.writerow(row)
+        n += 1
+    return n
+
+
+@timed('export.statistics_pdf')
+def write_statistics_pdf(result, filename: str, period_label: Optional[str] = None):
+    """
+    PDF-Export eines StatisticsResult: Zusammenfassung, Trend-Diagramm (PNG-Bytes aus dem
+    Ergebnis, keine temporären Dateien) und Tabelle der erfassten Termine.
+    """
+    import io
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    children = getattr(result, 'children', None) or [Child(bit, name) for bit, name in DEFAULT_CHILDREN]
+    table_data = [["Datum", "Wochentag"] + [f"{c.name} anwesend (1=ja, 0=nein)" for c in children]]
+    for v in result.visits:
+        d = v["day"]
+        table_data.append([d.isoformat(), WEEKDAY_NAMES[d.weekday()]]
+                          + [int(not (v["absent_mask"] >> c.bit) & 1) for c in children])
+
+    doc = SimpleDocTemplate(filename, pagesize=letter)
+    styles = getSampleStyleSheet()
+    elements = [Paragraph("<b>KidsCompass Statistik-Export</b>", styles['Title']), Spacer(1, 12)]
+    if period_label is None:
+        period_label = f"{result.start.strftime('%d.%m.%Y')} bis {result.end.strftime('%d.%m.%Y')}"
+    elements += [Paragraph(f"Zeitraum: {period_label}", styles['Normal']), Spacer(1, 12)]
+    for line in result.summary_lines():
+        elements.append(Paragraph(line, styles['Normal']))
+    elements.append(Spacer(1, 12))
+    png = result.chart_png()
+    if png:
+        elements += [Image(io.BytesIO(png), width=400, height=150), Spacer(1, 12)]
+    heatmap = result.heatmap_png() if hasattr(result, 'heatmap_png') else None
+    if heatmap:
+        w, h = ImageReader(io.BytesIO(heatmap)).getSize()
+        width = min(450, doc.width)
+        height = min(width * h / w, doc.height - 24)
+        elements += [Image(io.BytesIO(heatmap), width=height * w / h, height=height), Spacer(1, 12)]
+    by_month = (getattr(result, 'custody', None) or {}).get('by_month')
+    if by_month:
+        # Betreuungstage je Monat und Elternteil (custody.custody_totals)
+        holders = list(next(iter(by_month.values())))
+        month_data = [["Monat"] + [_HOLDER_NAMES.get(h, h) for h in holders]]
+        for (y, m), counts in by_month.items():
+            month_data.append([f"{m:02d}.{y}"] + [counts[h] for h in holders])
+        mt = Table(month_data, repeatRows=1)
+        mt.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ]))
+        elements += [Paragraph("Betreuungstage je Monat", styles['Heading3']), mt, Spacer(1, 12)]
+    t = Table(table_data, repeatRows=1)
+    t.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightblue),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    elements.append(t)
+    doc.build(elements)
@@ -3,12 +3,12 @@ import datetime
 from typing import List
 import os
 import logging
-import time
 
 import matplotlib
 matplotlib.use("Agg")
 
-from kidscompass.models import VisitPattern, OverridePeriod, RemoveOverride, VisitStatus
+from kidscompass.models import VisitPattern, OverridePeriod, RemoveOverride, VisitStatus, PlanSnapshot, Child
+from kidscompass.migrations import DEFAULT_CHILDREN
 from kidscompass.charts import create_pie_chart
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
@@ -22,11 +22,15 @@ from PySide6.QtWidgets import (
 from PySide6.QtWidgets import QListView, QAbstractItemView
 from PySide6.QtGui import QTextCharFormat, QBrush, QColor
 from PySide6.QtCore import Qt, QDate, QThread, Signal, QObject, QMutex, QTimer
-from PySide6.QtGui import QPainter, QFont
-from kidscompass.calendar_logic import generate_standard_days, apply_overrides
-from kidscompass.data import Database
+from PySide6.QtGui import QPainter, QFont, QKeySequence, QShortcut, QStaticText
+from kidscompass.calendar_logic import generate_standard_days, apply_overrides, first_occurrence, PlannedIndex
+from kidscompass.data import Database, close_pool
+from kidscompass import instrumentation
+from kidscompass import sqltrace
 from kidscompass import config as kc_config
-from kidscompass.statistics import count_missing_by_weekday, summarize_visits, calculate_trends
+from kidscompass.plan_model import PlanListModel, PlanFilterProxyModel
+from kidscompass.statistics import (count_missing_by_weekday, summarize_visits, calculate_trends,
+                                    absence_label, all_children_label)
 import matplotlib.pyplot as plt
 from PySide6.QtWidgets import QLabel
 from PySide6.QtGui import QPixmap
@@ -36,6 +40,8 @@ import tempfile
 
 # === Constants ===
 SQL_FILE_FILTER = "SQL-Datei (*.sql)"
+SNAPSHOT_FILE_FILTER = "SQLite-Snapshot (*.db *.db.gz *.db.zst)"
+BACKUP_FILE_FILTER = f"{SNAPSHOT_FILE_FILTER};;{SQL_FILE_FILTER}"
 BACKUP_TITLE = "Backup speichern als"
 RESTORE_TITLE = "Backup wiederherstellen"
 RESTORE_CONFIRM_TITLE = "Restore bestätigen"
@@ -89,34 +95,54 @@ def set_date_format(calendar, date_obj, color_hex):
 
 class AnnotatedCalendar(QCalendarWidget):
     """QCalendarWidget that can draw small annotation text (e.g. pattern id) in the cell corner."""
+    # QDate.toJulianDay() == date.toordinal() + JULIAN_OFFSET
+    JULIAN_OFFSET = 1721425
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._annotations = {}  # mapping date (datetime.date) -> str
+        self._annotations = {}  # mapping julianDay (int) -> str
+        self._text_cache = {}   # (julianDay, text, cell width) -> QStaticText
+        self._ann_font = QFont(self.font())
+        self._ann_font.setPointSize(7)
+        self._ann_font.setBold(False)
+        # Cache gilt für die sichtbare Seite; beim Blättern neu aufbauen
+        self.currentPageChanged.connect(lambda *_: self._text_cache.clear())
 
     def set_annotations(self, ann: dict):
         # ann keys: datetime.date -> string
-        self._annotations = ann or {}
+        self._annotations = {d.toordinal() + self.JULIAN_OFFSET: txt for d, txt in (ann or {}).items() if txt}
+        self._text_cache.clear()
         self.update()
 
+    def annotation(self, d: datetime.date):
+        return self._annotations.get(d.toordinal() + self.JULIAN_OFFSET)
+
+    def _static_text(self, jd: int, txt: str, width: int) -> QStaticText:
+        key = (jd, txt, width)
+        st = self._text_cache.get(key)
+        if st is None:
+            st = QStaticText(txt)
+            st.setTextFormat(Qt.PlainText)
+            st.setTextWidth(width)
+            st.prepare(font=self._ann_font)
+            self._text_cache[key] = st
+        return st
+
     def paintCell(self, painter: QPainter, rect, qdate: QDate):
         # call base painter to draw normal cell
         super().paintCell(painter, rect, qdate)
-        # draw annotation if present
-        try:
-            d = qdate.toPython() if hasattr(qdate, 'toPython') else datetime.date(qdate.year(), qdate.month(), qdate.day())
-        except Exception:
-            d = datetime.date(qdate.year(), qdate.month(), qdate.day())
-        txt = self._annotations.get(d)
+        # draw annotation if present (Lookup über julianDay, ohne Datumsumwandlung)
+        jd = qdate.toJulianDay()
+        txt = self._annotations.get(jd)
         if not txt:
             return
+        margin = 3
+        inner = rect.adjusted(margin, margin, -margin, -margin)
         painter.save()
-        f = painter.font()
-        f.setPointSize(7)
-        f.setBold(False)
-        painter.setFont(f)
+        painter.setClipRect(inner)
+        painter.setFont(self._ann_font)
         painter.setPen(QColor('#222222'))
-        margin = 3
-        painter.drawText(rect.adjusted(margin, margin, -margin, -margin), Qt.AlignLeft | Qt.AlignTop, txt)
+        painter.drawStaticText(inner.topLeft(), self._static_text(jd, txt, inner.width()))
         painter.restore()
 
 
@@ -178,9 +204,23 @@ class SettingsTab(QWidget):
         layout.addWidget(ov_group)
 
         # Einträge
-        layout.addWidget(QLabel("Einträge:"))
-        self.entry_list = QListWidget()
+        entries_head = QHBoxLayout()
+        entries_head.addWidget(QLabel("Einträge:"))
+        self.entry_search = QLineEdit(); self.entry_search.setPlaceholderText("Suchen…")
+        self.entry_search.setClearButtonEnabled(True)
+        entries_head.addWidget(self.entry_search)
+        layout.addLayout(entries_head)
+        # Model/View: Zeilen werden beim Neuladen inkrementell abgeglichen, Texte erst beim Anzeigen erzeugt
+        self.plan_model = PlanListModel(getattr(parent, 'db', None), self)
+        self.plan_proxy = PlanFilterProxyModel(self)
+        self.plan_proxy.setSourceModel(self.plan_model)
+        self.entry_list = QListView()
+        self.entry_list.setModel(self.plan_proxy)
+        self.entry_list.setUniformItemSizes(True)
+        self.entry_list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.entry_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
         layout.addWidget(self.entry_list)
+        self.entry_search.textChanged.connect(self.plan_proxy.set_search)
         btns = QHBoxLayout()
         self.btn_edit = QPushButton("Bearbeiten")
         self.btn_delete = QPushButton(DELETE_BTN_TEXT)
@@ -289,17 +329,22 @@ class ExportTab(QWidget):
         layout.addWidget(QLabel(""))
         self.btn_export = QPushButton(EXPORT_BTN_TEXT)
         layout.addWidget(self.btn_export)
+        self.btn_export_ics = QPushButton("Umgangsplan als Kalender (ICS) exportieren")
+        layout.addWidget(self.btn_export_ics)
 
         btn_backup.clicked.connect(self.on_backup)
         btn_restore.clicked.connect(self.on_restore)
         self.btn_export.clicked.connect(self.parent.on_export)
+        self.btn_export_ics.clicked.connect(self.parent.on_export_ics)
 
     def on_backup(self):
         if hasattr(self.parent, 'backup_thread') and self.parent.backup_thread and self.parent.backup_thread.isRunning():
             return
-        fn, _ = QFileDialog.getSaveFileName(self, BACKUP_TITLE, filter=SQL_FILE_FILTER)
+        fn, selected = QFileDialog.getSaveFileName(self, BACKUP_TITLE, filter=BACKUP_FILE_FILTER)
         if not fn:
             return
+        if '.' not in os.path.basename(fn):
+            fn += '.sql' if selected == SQL_FILE_FILTER else '.db'
         self.backup_thread = QThread()
         db_path = self.parent.db.db_path if hasattr(self.parent.db, 'db_path') else self.parent.db.filename
         self.backup_worker = BackupWorker(db_path, fn)
@@ -307,11 +352,16 @@ class ExportTab(QWidget):
         self.backup_thread.started.connect(self.backup_worker.run)
         self.backup_worker.finished.connect(self.on_backup_finished)
         self.backup_worker.error.connect(self.on_backup_error)
+        self.backup_worker.progress.connect(self.on_backup_progress)
         self.backup_worker.finished.connect(self.backup_thread.quit)
         self.backup_worker.finished.connect(self.backup_worker.deleteLater)
         self.backup_thread.finished.connect(self.backup_thread.deleteLater)
         self.backup_thread.start()
 
+    def on_backup_progress(self, copied, total):
+        if total:
+            self.parent.statusBar().showMessage(f"Backup: {copied}/{total} Seiten", 2000)
+
     def on_backup_finished(self, fn):
         QMessageBox.information(self, BACKUP_SUCCESS_TITLE, BACKUP_SUCCESS_TEXT.format(fn=fn))
 
@@ -323,7 +373,7 @@ class ExportTab(QWidget):
         if hasattr(self.parent, 'restore_thread') and self.parent.restore_thread and self.parent.restore_thread.isRunning():
             return
 
-        fn, _ = QFileDialog.getOpenFileName(self, RESTORE_TITLE, filter=SQL_FILE_FILTER)
+        fn, _ = QFileDialog.getOpenFileName(self, RESTORE_TITLE, filter=f"{SQL_FILE_FILTER};;{SNAPSHOT_FILE_FILTER}")
         if not fn:
             return
         confirm = QMessageBox.question(
@@ -336,6 +386,8 @@ class ExportTab(QWidget):
         self.restore_worker = RestoreWorker(db_path, fn, self.parent)
         self.restore_worker.moveToThread(self.restore_thread)
         self.restore_thread.started.connect(self.restore_worker.run)
+        if hasattr(self.parent, 'on_plan_restored'):
+            self.restore_worker.loaded.connect(self.parent.on_plan_restored)
         self.restore_worker.finished.connect(self.on_restore_finished)
         self.restore_worker.error.connect(self.on_restore_error)
         self.restore_worker.finished.connect(self.restore_thread.quit)
@@ -386,7 +438,7 @@ class StatisticsTab(QWidget):
         status_group = QGroupBox("Statistik für ...")
         status_layout = QHBoxLayout(status_group)
         self.status_combo = QComboBox()
-        self.status_combo.addItems(["Amilia", "Malia", "Beide"])
+        self.refresh_children()
         status_layout.addWidget(QLabel("Auswertung für:"))
         status_layout.addWidget(self.status_combo)
         layout.addWidget(status_group)
@@ -407,6 +459,15 @@ class StatisticsTab(QWidget):
         self.chart_label = QLabel()
         self.chart_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.chart_label)
+        # Jahres-Heatmap (scrollbar bei vielen Jahren)
+        from PySide6.QtWidgets import QScrollArea
+        self.heatmap_label = QLabel()
+        self.heatmap_label.setAlignment(Qt.AlignCenter)
+        self.heatmap_scroll = QScrollArea()
+        self.heatmap_scroll.setWidget(self.heatmap_label)
+        self.heatmap_scroll.setWidgetResizable(True)
+        self.heatmap_scroll.setMaximumHeight(260)
+        layout.addWidget(self.heatmap_scroll)
 
         # Signals: Filteränderungen triggern Statistik
         self.date_from.dateChanged.connect(self.on_any_filter_changed)
@@ -420,318 +481,87 @@ class StatisticsTab(QWidget):
         # Initiale Berechnung
         self.on_any_filter_changed()
 
+    def refresh_children(self):
+        """Auswahl aus der Tabelle children neu aufbauen (Kinder einzeln und alle zusammen)."""
+        children = self.parent.db.load_children()
+        current = self.status_combo.currentText()
+        items = [c.name for c in children] + [all_children_label(children)]
+        self.status_combo.blockSignals(True)
+        try:
+            self.status_combo.clear()
+            self.status_combo.addItems(items)
+            if current in items:
+                self.status_combo.setCurrentText(current)
+        finally:
+            self.status_combo.blockSignals(False)
+
     def get_status_mode(self):
         # Gibt zurück, was im Dropdown gewählt ist
         return self.status_combo.currentText()
 
     def on_any_filter_changed(self):
-        # --- Geplante Umgangstage wie im Status-Tab berechnen ---
-        from kidscompass.calendar_logic import generate_standard_days, apply_overrides
-        patterns = self.parent.patterns
-        overrides = self.parent.overrides
+        # Eine Auswertung je Filterzustand; Text, Diagramm und Exporte nutzen dasselbe Ergebnis
+        from kidscompass.statistics import compute_statistics
         start_d = self.date_from.date().toPython()
         end_d   = self.date_to.date().toPython()
-        # KORREKTUR: Pattern-Tage nur für Schnittmenge Pattern-Zeitraum und Statistik-Zeitraum generieren
-        all_planned = []
-        for p in patterns:
-            pattern_start = max(p.start_date, start_d)
-            pattern_end = min(p.end_date or end_d, end_d)
-            if pattern_start > pattern_end:
-                continue
-            for y in range(pattern_start.year, pattern_end.year + 1):
-                days = generate_standard_days(p, y)
-                # Nur Tage im Schnittmengen-Zeitraum behalten
-                days = [d for d in days if pattern_start <= d <= pattern_end]
-                all_planned.extend(days)
-        all_planned = apply_overrides(all_planned, overrides)
-        planned = [d for d in all_planned if start_d <= d <= end_d]
-        # --- Tatsächlich dokumentierte Besuche ---
         sel_wds = [i for i, cb in self.wd_checks if cb.isChecked()]
-        mode = self.get_status_mode()
-        db = self.parent.db
-        visits_list = db.query_visits(start_d, end_d, sel_wds, {
-            "both_present": False,
-            "a_absent": False,
-            "b_absent": False,
-            "both_absent": False
-        })
-        from collections import defaultdict
-        weekday_names = ["Mo","Di","Mi","Do","Fr","Sa","So"]
-        total = len(planned)
-        if total == 0:
-            self.result.setPlainText("Keine geplanten Umgänge für die gewählten Filter gefunden.\n\nBitte prüfen Sie Zeitraum und Muster.")
-            self.filtered_visits = []
-            self.chart_label.clear()
-            return
-        visit_status = self.parent.visit_status
-
-        if mode == "Beide":
-            rel_a = sum(1 for d in planned if d.weekday() in sel_wds and visit_status.get(d, VisitStatus(d)).present_child_a)
-            rel_b = sum(1 for d in planned if d.weekday() in sel_wds and visit_status.get(d, VisitStatus(d)).present_child_b)
-            miss_a = sum(1 for d in planned if d.weekday() in sel_wds and not visit_status.get(d, VisitStatus(d)).present_child_a)
-            miss_b = sum(1 for d in planned if d.weekday() in sel_wds and not visit_status.get(d, VisitStatus(d)).present_child_b)
-            total = sum(1 for d in planned if d.weekday() in sel_wds)
-            pct_rel_a = round(rel_a/total*100,1) if total else 0.0
-            pct_rel_b = round(rel_b/total*100,1) if total else 0.0
-            pct_miss_a = round(miss_a/total*100,1) if total else 0.0
-            pct_miss_b = round(miss_b/total*100,1) if total else 0.0
-
-            # Wochentagsauswertung: absolute und prozentuale Anwesenheit pro Wochentag (nur gefilterte Wochentage)
-            weekday_count_a = defaultdict(int)
-            weekday_count_b = defaultdict(int)
-            weekday_planned_count = defaultdict(int)
-            for d in planned:
-                wd = d.weekday()
-                if wd in sel_wds:
-                    weekday_planned_count[wd] += 1
-                    vs = visit_status.get(d, VisitStatus(d))
-                    if vs.present_child_a:
-                        weekday_count_a[wd] += 1
-                    if vs.present_child_b:
-                        weekday_count_b[wd] += 1
-
-            weekday_stats = [
-                f"{weekday_names[i]}: Amilia {weekday_count_a[i]}/{weekday_planned_count[i]} ({round(weekday_count_a[i]/weekday_planned_count[i]*100,1) if weekday_planned_count[i] else 0.0}%), "
-                f"Malia {weekday_count_b[i]}/{weekday_planned_count[i]} ({round(weekday_count_b[i]/weekday_planned_count[i]*100,1) if weekday_planned_count[i] else 0.0}%)"
-                for i in range(7) if i in sel_wds
-            ]
-
-            # Entwicklung Umgangsfrequenz: Prozent Anwesenheit letzte 12 Wochen vs Gesamtzeitraum (ohne rollierende Fenster)
-            today = datetime.date.today()
-            last_12_weeks_start = today - datetime.timedelta(weeks=12)
-
-            def attendance_percentage(start, end, child_key):
-                planned_days = [d for d in planned if start <= d <= end and d.weekday() in sel_wds]
-                if not planned_days:
-                    return 0.0
-                attended = sum(1 for d in planned_days if getattr(visit_status.get(d, VisitStatus(d)), child_key))
-                return attended / len(planned_days) * 100
-
-            total_pct_a = attendance_percentage(start_d, end_d, "present_child_a")
-            last_12_pct_a = attendance_percentage(last_12_weeks_start, end_d, "present_child_a")
-            total_pct_b = attendance_percentage(start_d, end_d, "present_child_b")
-            last_12_pct_b = attendance_percentage(last_12_weeks_start, end_d, "present_child_b")
-
-            change_a = round(last_12_pct_a - total_pct_a, 1)
-            change_b = round(last_12_pct_b - total_pct_b, 1)
-
-            trend_summary = (
-                f"Amilia Gesamt: {total_pct_a:.1f}%\n"
-                f"Amilia letzte 12 Wochen: {last_12_pct_a:.1f}%\n"
-                f"Veränderung: {change_a:+.1f}%\n"
-                f"Malia Gesamt: {total_pct_b:.1f}%\n"
-                f"Malia letzte 12 Wochen: {last_12_pct_b:.1f}%\n"
-                f"Veränderung: {change_b:+.1f}%"
-            )
-
-            summary = (
-                f"Geplante Umgänge: {total}\n"
-                f"Amilia anwesend: {rel_a} ({pct_rel_a}%)\nAmilia abwesend: {miss_a} ({pct_miss_a}%)\n"
-                f"Malia anwesend: {rel_b} ({pct_rel_b}%)\nMalia abwesend: {miss_b} ({pct_miss_b}%)\n"
-                f"\nWochentagsauswertung:\n" + "\n".join(weekday_stats) +
-                f"\n\nEntwicklung Umgangsfrequenz (letzte 12 Wochen vs Gesamt):\n" + trend_summary
-            )
-
-            self.result.setPlainText(summary)
-            self.filtered_visits = [v for v in visits_list if v["day"] in planned and v["day"].weekday() in sel_wds]
-            self.update_trend_chart(self.filtered_visits)
-
-        else:
-            # Einzelkind-Modus wie gehabt, aber auf Basis planned/visit_status und gefilterte Wochentage
-            key = "present_child_a" if mode=="Amilia" else "present_child_b"
-            relevant = [d for d in planned if d.weekday() in sel_wds and getattr(visit_status.get(d, VisitStatus(d)), key)]
-            missed = [d for d in planned if d.weekday() in sel_wds and not getattr(visit_status.get(d, VisitStatus(d)), key)]
-            rel = len(relevant)
-            miss = len(missed)
-            total = rel + miss
-            pct_rel = round(rel/total*100,1) if total else 0.0
-            pct_miss = round(miss/total*100,1) if total else 0.0
-            weekday_count = defaultdict(int)
-            weekday_planned_count = defaultdict(int)
-            for d in planned:
-                wd = d.weekday()
-                if wd in sel_wds:
-                    weekday_planned_count[wd] += 1
-            for d in relevant:
-                wd = d.weekday()
-                if wd in sel_wds:
-                    weekday_count[wd] += 1
-            weekday_stats = [
-                f"{weekday_names[i]}: {weekday_count[i]}/{weekday_planned_count[i]} ({round(weekday_count[i]/weekday_planned_count[i]*100,1) if weekday_planned_count[i] else 0.0}%)"
-                for i in range(7) if i in sel_wds
-            ]
-
-            # Entwicklung Umgangsfrequenz: Prozent Anwesenheit letzte 12 Wochen vs Gesamtzeitraum (für alle Modi)
-            today = datetime.date.today()
-            last_12_weeks_start = today - datetime.timedelta(weeks=12)
-
-            def attendance_percentage(start, end, child_key):
-                planned_days = [d for d in planned if start <= d <= end and d.weekday() in sel_wds]
-                if not planned_days:
-                    return 0.0
-                attended = sum(1 for d in planned_days if getattr(visit_status.get(d, VisitStatus(d)), child_key))
-                return attended / len(planned_days) * 100
-
-            total_pct = attendance_percentage(start_d, end_d, key)
-            last_12_pct = attendance_percentage(last_12_weeks_start, end_d, key)
-
-            change = round(last_12_pct - total_pct, 1)
-
-            trend_summary = (
-                f"Gesamt: {total_pct:.1f}%\n"
-                f"Letzte 12 Wochen: {last_12_pct:.1f}%\n"
-                f"Veränderung: {change:+.1f}%"
-            )
-
-            summary = (
-                f"Geplante Umgänge: {total}\n"
-                f"{mode} anwesend: {rel} ({pct_rel}%)\n"
-                f"{mode} abwesend: {miss} ({pct_miss}%)\n"
-                f"\nWochentagsauswertung ({mode} anwesend):\n" + "\n".join(weekday_stats) +
-                f"\n\nEntwicklung Umgangsfrequenz (letzte 12 Wochen vs Gesamt):\n" + trend_summary
-            )
-
-        self.result.setPlainText(summary)
-        self.filtered_visits = [v for v in visits_list if v["day"] in planned and v["day"].weekday() in sel_wds]
+        snap = self.parent.plan_snapshot()
+        self.stats_result = compute_statistics(self.parent.db, start_d, end_d, sel_wds, self.get_status_mode(),
+                                               snap.patterns, snap.overrides, snap.visit_status)
+        self.result.setPlainText(self.stats_result.summary)
+        self.filtered_visits = self.stats_result.visits
         self.update_trend_chart(self.filtered_visits)
+        self.update_heatmap()
 
-    def update_trend_chart(self, relevant):
-        mode = self.get_status_mode()
-        if not hasattr(self, 'filtered_visits') or not self.filtered_visits:
+    def update_heatmap(self):
+        res = getattr(self, 'stats_result', None)
+        png = res.heatmap_png() if res is not None else None
+        if not png:
+            self.heatmap_label.clear()
+            return
+        from PySide6.QtGui import QPixmap
+        pixmap = QPixmap()
+        pixmap.loadFromData(png, 'PNG')
+        self.heatmap_label.setPixmap(pixmap)
+
+    def update_trend_chart(self, relevant=None):
+        res = getattr(self, 'stats_result', None)
+        png = res.chart_png() if res is not None else None
+        if not png:
             self.chart_label.clear()
             return
-        from collections import defaultdict
-        import matplotlib.pyplot as plt
-        import tempfile
-        import datetime
-        # 4-Wochen-Inkremente
-        start_d = self.date_from.date().toPython()
-        end_d = self.date_to.date().toPython()
-        sel_wds = [i for i, cb in self.wd_checks if cb.isChecked()]
-        visit_status = self.parent.visit_status
-        from kidscompass.calendar_logic import generate_standard_days, apply_overrides
-        planned = apply_overrides(
-            sum((generate_standard_days(p, y) for p in self.parent.patterns for y in range(start_d.year, end_d.year + 1)), []),
-            self.parent.overrides
-        )
-        planned = [d for d in planned if start_d <= d <= end_d]
-
-        def get_4week_increments(start_date, end_date, window_days=28):
-            increments = []
-            current_start = start_date
-            while current_start <= end_date:
-                current_end = current_start + datetime.timedelta(days=window_days-1)
-                if current_end > end_date:
-                    current_end = end_date
-                increments.append((current_start, current_end))
-                current_start = current_end + datetime.timedelta(days=1)
-            return increments
-
-        increments = get_4week_increments(start_d, end_d)
-
-        def attendance_in_period(start, end, child_key):
-            planned_days = [d for d in planned if start <= d <= end and d.weekday() in sel_wds]
-            if not planned_days:
-                return 0, 0
-            attended = sum(1 for d in planned_days if getattr(visit_status.get(d, VisitStatus(d)), child_key))
-            return attended, len(planned_days)
-
-        x = []
-        y_a = []
-        y_b = []
-        planned_counts = []
-        zero_period_indices = []
-
-        for idx, (start_w, end_w) in enumerate(increments):
-            att_a, total_a = attendance_in_period(start_w, end_w, "present_child_a")
-            att_b, total_b = attendance_in_period(start_w, end_w, "present_child_b")
-            # Anzahl geplanter Tage in diesem Fenster
-            planned_count = total_a if total_a else total_b
-            planned_counts.append(planned_count)
-            if planned_count == 0:
-                pct_a = float('nan')
-                pct_b = float('nan')
-                zero_period_indices.append(idx)
-            else:
-                pct_a = round(att_a / total_a * 100, 1) if total_a else float('nan')
-                pct_b = round(att_b / total_b * 100, 1) if total_b else float('nan')
-            x.append(f"{start_w.strftime('%d.%m')} - {end_w.strftime('%d.%m')}")
-            y_a.append(pct_a)
-            y_b.append(pct_b)
-
-        import matplotlib
-        matplotlib.use("Agg")
-        import matplotlib.pyplot as plt
-        fig, ax = plt.subplots(figsize=(6,3))
-        xpos = list(range(len(x)))
-        if mode == 'Beide':
-            ax.plot(xpos, y_a, marker='o', color='#1976d2', label='Amilia')
-            ax.plot(xpos, y_b, marker='o', color='#d32f2f', label='Malia')
-        else:
-            y = y_a if mode == 'Kind A' else y_b
-            ax.plot(xpos, y, marker='o', color='#1976d2')
-
-        ax.set_xticks(xpos)
-        ax.set_xticklabels(x)
-
-        # Hebe Zeiträume ohne geplante Tage optisch hervor (grauer Hintergrund)
-        for idx in zero_period_indices:
-            ax.axvspan(idx-0.45, idx+0.45, color='lightgrey', alpha=0.5)
-        if zero_period_indices:
-            import matplotlib.patches as mpatches
-            grey_patch = mpatches.Patch(color='lightgrey', alpha=0.5, label='Ferien / kein geplanter Umgang')
-            handles, labels = ax.get_legend_handles_labels()
-            handles.append(grey_patch)
-            ax.legend(handles=handles)
-        else:
-            # Falls keine extra Legende nötig, stelle sicher, dass es eine Legende gibt, wenn zwei Linien gezeichnet wurden
-            if mode == 'Beide':
-                ax.legend()
-
-        ax.set_title(f'Anwesenheit {mode} (4-Wochen-Inkremente)')
-        ax.set_xlabel('Zeitraum')
-        ax.set_ylabel('Anwesenheit (%)')
-        ax.set_ylim(0, 105)
-        ax.grid(True, linestyle=':')
-        import math
-        # Kleine Anpassung: Linienlücken durch NaN werden korrekt dargestellt
-        plt.xticks(rotation=30, ha='right')
-        fig.tight_layout()
-        import tempfile
         from PySide6.QtGui import QPixmap
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-            fig.savefig(tmp.name, bbox_inches='tight')
-            plt.close(fig)
-            self.chart_label.setPixmap(QPixmap(tmp.name))
+        pixmap = QPixmap()
+        pixmap.loadFromData(png, 'PNG')
+        self.chart_label.setPixmap(pixmap)
 
     def on_export_csv(self):
         from PySide6.QtWidgets import QFileDialog
-        import csv
-        if not hasattr(self, 'filtered_visits') or not self.filtered_visits:
-            QMessageBox.warning(self, "Export", "Bitte zuerst Filter setzen.")
-            return
-        fn, _ = QFileDialog.getSaveFileName(self, "CSV Export speichern", filter="CSV-Datei (*.csv)")
+        from kidscompass.stats_export import write_statistics_csv
+        fn, selected = QFileDialog.getSaveFileName(self, "CSV Export speichern",
+                                                   filter="CSV-Datei (*.csv);;TSV-Datei (*.tsv)")
         if not fn:
             return
-        weekday_names = ["Mo","Di","Mi","Do","Fr","Sa","So"]
-        with open(fn, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Datum", "Wochentag", "Amilia anwesend", "Malia anwesend"])
-            for v in self.filtered_visits:
-                d = v["day"]
-                wd = weekday_names[d.weekday()]
-                writer.writerow([d.isoformat(), wd, int(v["present_child_a"]), int(v["present_child_b"])])
-        QMessageBox.information(self, "Export", f"CSV erfolgreich gespeichert: {fn}")
+        if 'tsv' in selected and not fn.lower().endswith('.tsv'):
+            fn += '.tsv'
+        # Streaming-Export: geplante Tage im Filterzeitraum inkl. Status, Betreuung und Ferienart
+        res = self.stats_result
+        try:
+            n = write_statistics_csv(self.parent.db, fn, res.start, res.end, res.weekdays)
+        except Exception as e:
+            logging.exception('CSV-Export fehlgeschlagen')
+            QMessageBox.critical(self, "Export", f"Export fehlgeschlagen: {e}")
+            return
+        if n == 0:
+            QMessageBox.warning(self, "Export", f"{fn} gespeichert, aber keine geplanten Umgänge für die gewählten Filter gefunden.")
+            return
+        QMessageBox.information(self, "Export", f"CSV erfolgreich gespeichert: {fn} ({n} Zeilen)")
 
     def on_export_pdf(self):
         from PySide6.QtWidgets import QFileDialog
-        from reportlab.lib.pagesizes import letter
-        from reportlab.pdfgen import canvas
-        from reportlab.lib import colors
-        from reportlab.platypus import Table, TableStyle, SimpleDocTemplate, Paragraph, Spacer, Image
-        from reportlab.lib.styles import getSampleStyleSheet
-        import tempfile
-        if not hasattr(self, 'filtered_visits') or not self.filtered_visits:
+        from kidscompass.stats_export import write_statistics_pdf
+        res = getattr(self, 'stats_result', None)
+        if res is None or not res.visits:
             QMessageBox.warning(self, "Export", "Bitte zuerst Filter setzen.")
             return
         fn, _ = QFileDialog.getSaveFileName(self, "PDF Export speichern", filter="PDF-Datei (*.pdf)")
@@ -739,73 +569,35 @@ class StatisticsTab(QWidget):
             # In headless/test environments, fall back to a temp filename so tests can proceed
             import tempfile
             fn = os.path.join(tempfile.gettempdir(), 'kidscompass_export_test.pdf')
-        # --- Statistische Auswertung vorbereiten ---
-        mode = self.get_status_mode()
-        summary = self.result.toPlainText()
-        # --- Tabelle der Termine ---
-        weekday_names = ["Mo","Di","Mi","Do","Fr","Sa","So"]
-        table_data = [["Datum", "Wochentag", "Amilia anwesend (1=ja, 0=nein)", "Malia anwesend (1=ja, 0=nein)"]]
-        for v in self.filtered_visits:
-             d = v["day"]
-             wd = weekday_names[d.weekday()]
-             table_data.append([d.isoformat(), wd, int(v["present_child_a"]), int(v["present_child_b"])])
-        # --- Trend-Grafik erzeugen (wie im UI) ---
-        self.update_trend_chart(self.filtered_visits)
-        chart_pixmap = self.chart_label.pixmap()
-        chart_img_path = None
-        if chart_pixmap:
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                chart_pixmap.save(tmp.name)
-                chart_img_path = tmp.name
-        # --- PDF mit ReportLab erzeugen ---
-        doc = SimpleDocTemplate(fn, pagesize=letter)
-        styles = getSampleStyleSheet()
-        elements = []
-        elements.append(Paragraph("<b>KidsCompass Statistik-Export</b>", styles['Title']))
-        elements.append(Spacer(1, 12))
-        elements.append(Paragraph(f"Zeitraum: {self.date_from.date().toString()} bis {self.date_to.date().toString()}", styles['Normal']))
-        elements.append(Spacer(1, 12))
-        # Statistische Auswertung als Text
-        for line in summary.split('\n'):
-            elements.append(Paragraph(line, styles['Normal']))
-        elements.append(Spacer(1, 12))
-        # Trend-Grafik einfügen
-        if chart_img_path:
-            elements.append(Image(chart_img_path, width=400, height=150))
-            elements.append(Spacer(1, 12))
-        # Tabelle der Termine
-        t = Table(table_data, repeatRows=1)
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.lightblue),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-            ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,0), 10),
-            ('BOTTOMPADDING', (0,0), (-1,0), 8),
-            ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
-        ]))
-        elements.append(t)
-        doc.build(elements)
+        period = f"{self.date_from.date().toString()} bis {self.date_to.date().toString()}"
+        write_statistics_pdf(res, fn, period)
         QMessageBox.information(self, "Export", f"PDF erfolgreich gespeichert: {fn}")
 
 class ExportWorker(QObject):
     finished = Signal(str)
     error = Signal(str)
 
-    def __init__(self, parent, df, dt, patterns, overrides, visit_status, out_fn=None):
+    def __init__(self, parent, df, dt, patterns=None, overrides=None, visit_status=None, out_fn=None,
+                 snapshot=None):
         super().__init__()
         self.parent = parent
         self.df = df
         self.dt = dt
-        self.patterns = patterns
-        self.overrides = overrides
-        self.visit_status = visit_status
+        # Der Worker liest nur den unveränderlichen Stand; ohne Snapshot wird hier (im GUI-Thread) einer erzeugt
+        self.snapshot = snapshot or PlanSnapshot.capture(patterns, overrides, visit_status)
+        self.patterns = self.snapshot.patterns
+        self.overrides = self.snapshot.overrides
+        self.visit_status = self.snapshot.visit_status
+        self.children = list(self.snapshot.children) or [Child(b, n) for b, n in DEFAULT_CHILDREN]
         self.out_fn = out_fn or 'kidscompass_report.pdf'
 
+    @instrumentation.timed('worker.export')
     def run(self):
         logging.info("[KidsCompass] ExportWorker.run gestartet.")
+        instrumentation.incr('worker.export.runs')
         try:
             if self.df is None or self.dt is None:
+                instrumentation.incr('worker.export.failures')
                 self.error.emit("Fehler: Start- und Enddatum müssen gesetzt sein.")
                 logging.error("[KidsCompass] Fehler: Start- und Enddatum fehlen im ExportWorker.")
                 return
@@ -826,54 +618,51 @@ class ExportWorker(QObject):
             excluded_by_remove = len(removed_by_remove & removed_by_any)
             excluded_days = sorted(list(removed_by_remove & removed_by_any))
 
+            # Abweichung: mindestens ein Kind aus der Tabelle children fehlt (Bits in absent_mask)
+            children = self.children
+            full = sum(1 << c.bit for c in children)
             deviations = []
             for d in planned:
-                vs = self.visit_status.get(d, VisitStatus(d))
-                if not (vs.present_child_a and vs.present_child_b):
-                    status = (
-                        "Beide fehlen" if not vs.present_child_a and not vs.present_child_b else
-                        "Amilia fehlt" if not vs.present_child_a else
-                        "Malia fehlt"
-                    )
-                    deviations.append((d, status))
-            stats = summarize_visits(planned, self.visit_status)
-            png_a, png_b, png_both = 'kind_a.png','kind_b.png','both.png'
-            # Prüfe, ob die Bilddateien existieren
-            for f in (png_a, png_b, png_both):
-                if not os.path.exists(f):
-                    self.error.emit(f"Fehler: Bilddatei '{f}' nicht gefunden. Bitte zuerst Statistik berechnen.")
-                    return
+                mask = self.visit_status.get(d, VisitStatus(d)).absent_mask & full
+                if mask:
+                    deviations.append((d, absence_label(mask, children)))
+            stats = summarize_visits(planned, self.visit_status, [c.bit for c in children])
+            all_label = all_children_label(children)
+            # Kuchendiagramme in ein eigenes Temp-Verzeichnis (keine Dateien im Arbeitsverzeichnis)
+            import tempfile
+            png_dir = tempfile.mkdtemp(prefix='kidscompass_export_')
+            png_children = [os.path.join(png_dir, f'kind_{c.bit}.png') for c in children]
+            png_both = os.path.join(png_dir, 'alle.png')
             try:
                 # Farben für alle Diagramme konsistent verwenden
                 colors = [COLOR_B_ABSENT, COLOR_A_ABSENT]  # grün, gelb
-                create_pie_chart([stats['total']-stats['missed_a'],stats['missed_a']],['Anwesend','Fehlend'],png_a, colors=colors)
-                create_pie_chart([stats['total']-stats['missed_b'],stats['missed_b']],['Anwesend','Fehlend'],png_b, colors=colors)
-                # Werte für das "both"-Diagramm
-                beide_da = stats['both_present']
-                mindestens_ein_kind_fehlt = stats['total'] - stats['both_present'] - stats['both_missing']
-                beide_fehlen = stats['both_missing']
-                # Prozentwert für "mindestens 1 Kind fehlt oder beide fehlen"
-                mindestens_einer_oder_beide = mindestens_ein_kind_fehlt + beide_fehlen
-                pct_mindestens_einer_oder_beide = round(mindestens_einer_oder_beide / stats['total'] * 100, 1) if stats['total'] else 0.0
+                for c, png in zip(children, png_children):
+                    missed = stats['missed'][c.bit]
+                    create_pie_chart([stats['total'] - missed, missed], ['Anwesend', 'Fehlend'], png, colors=colors)
+                # Werte für das Diagramm aller Kinder
+                alle_da = stats['both_present']
+                alle_fehlen = stats['both_missing']
+                teilweise = stats['total'] - alle_da - alle_fehlen
+                # Prozentwert für "mindestens 1 Kind fehlt"
+                pct_mindestens_einer = round((teilweise + alle_fehlen) / stats['total'] * 100, 1) if stats['total'] else 0.0
                 # Farben: grün, gelb, rot
                 colors_both = [COLOR_B_ABSENT, COLOR_A_ABSENT, COLOR_BOTH_MISSING]
                 wedges, texts, autotexts = create_pie_chart(
-                    [beide_da, mindestens_ein_kind_fehlt, beide_fehlen],
-                    ['Beide da', f'Mind. 1 fehlt ({pct_mindestens_einer_oder_beide}%)', 'Beide fehlen'],
+                    [alle_da, teilweise, alle_fehlen],
+                    [f'{all_label} da', f'Mind. 1 fehlt ({pct_mindestens_einer}%)', f'{all_label} fehlen'],
                     png_both,
                     colors=colors_both,
                     return_handles=True
-                    # subtitle="Beide"  # Entfernt, damit das Wort nicht im Kuchendiagramm erscheint
                 )
             except Exception as e:
                 logging.error(f"Fehler bei create_pie_chart: {e}")
+                instrumentation.incr('worker.export.failures')
                 self.error.emit(f"Fehler bei Diagrammerstellung: {e}")
                 return
             # --- ReportLab Flowable-Export statt Canvas ---
             from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image, Table, TableStyle
             from reportlab.lib.styles import getSampleStyleSheet
             from reportlab.lib import colors
-            import tempfile
             from kidscompass.export_utils import format_visit_window
             import json
             doc = SimpleDocTemplate(self.out_fn, pagesize=letter)
@@ -893,13 +682,11 @@ class ExportWorker(QObject):
             elements.append(Paragraph(f"Geplante Umgänge: {total}", styles['Normal']))
             dev = len(deviations)
             pct_dev = round(dev / total * 100, 1) if total else 0.0
-            miss_a = stats['missed_a']
-            pct_a = round(miss_a / total * 100, 1) if total else 0.0
-            miss_b = stats['missed_b']
-            pct_b = round(miss_b / total * 100, 1) if total else 0.0
             elements.append(Paragraph(f"Abweichungstage: {dev} ({pct_dev}%)", styles['Normal']))
-            elements.append(Paragraph(f"Amilia Abweichungstage: {miss_a} ({pct_a}%)", styles['Normal']))
-            elements.append(Paragraph(f"Malia Abweichungstage: {miss_b} ({pct_b}%)", styles['Normal']))
+            for c in children:
+                miss = stats['missed'][c.bit]
+                pct = round(miss / total * 100, 1) if total else 0.0
+                elements.append(Paragraph(f"{c.name} Abweichungstage: {miss} ({pct}%)", styles['Normal']))
             elements.append(Spacer(1, 12))
             # Tabelle der Abweichungen
             weekdays = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
@@ -925,12 +712,7 @@ class ExportWorker(QObject):
             table_meta = [["Datum", "Wochentag", "Status", "Hinweis"]]
             weekdays = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
             for d in planned:
-                vs = self.visit_status.get(d, VisitStatus(d))
-                st = (
-                    "Alle da" if vs.present_child_a and vs.present_child_b else
-                    ("Beide fehlen" if not vs.present_child_a and not vs.present_child_b else
-                     ("Amilia fehlt" if not vs.present_child_a else "Malia fehlt"))
-                )
+                st = absence_label(self.visit_status.get(d, VisitStatus(d)).absent_mask & full, children)
                 # pass configured handover rules mapping from main window
                 cfg = getattr(self.parent, 'config', None) if hasattr(self, 'parent') else None
                 # ExportWorker has parent attribute pointing to MainWindow
@@ -949,30 +731,31 @@ class ExportWorker(QObject):
             # Kuchendiagramme als Images oben platzieren, nur wenn total > 0
             elements.append(Paragraph("<b>Kuchendiagramme</b>", styles['Heading2']))
             elements.append(Spacer(1, 18))
-            # Zeile mit Kind A und Kind B, größere Bilder und größere Labels
-            img_row = []
-            label_row = []
-            for img_path, label in zip([png_a, png_b], ["Amilia", "Malia"]):
-                img_row.append(Image(img_path, width=180, height=180))
-                label_row.append(Paragraph(f"<b>{label}</b>", styles['BodyText']))
-            t_imgs = Table([img_row], colWidths=[200, 200])
-            t_imgs.setStyle(TableStyle([
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ]))
-            t_labels = Table([label_row], colWidths=[200, 200])
-            t_labels.setStyle(TableStyle([
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('FONTSIZE', (0,0), (-1,-1), 14),
-                ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ]))
-            elements.append(t_imgs)
-            elements.append(t_labels)
-            elements.append(Spacer(1, 24))
-            # Drittes Diagramm "Beide" zentriert, darunter mittig und groß das Label
+            # Je Zeile zwei Kinder, größere Bilder und größere Labels
+            for i in range(0, len(children), 2):
+                img_row = []
+                label_row = []
+                for img_path, c in zip(png_children[i:i + 2], children[i:i + 2]):
+                    img_row.append(Image(img_path, width=180, height=180))
+                    label_row.append(Paragraph(f"<b>{c.name}</b>", styles['BodyText']))
+                t_imgs = Table([img_row], colWidths=[200] * len(img_row))
+                t_imgs.setStyle(TableStyle([
+                    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+                    ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+                ]))
+                t_labels = Table([label_row], colWidths=[200] * len(label_row))
+                t_labels.setStyle(TableStyle([
+                    ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+                    ('FONTSIZE', (0,0), (-1,-1), 14),
+                    ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+                ]))
+                elements.append(t_imgs)
+                elements.append(t_labels)
+                elements.append(Spacer(1, 24))
+            # Diagramm aller Kinder zentriert, darunter mittig und groß das Label
             elements.append(Image(png_both, width=220, height=220))
             elements.append(Spacer(1, 8))
-            beide_label = Paragraph('<b>Beide</b>', styles['Title'])
+            beide_label = Paragraph(f'<b>{all_label}</b>', styles['Title'])
             beide_table = Table([[beide_label]], colWidths=[220])
             beide_table.setStyle(TableStyle([
                 ('ALIGN', (0,0), (-1,-1), 'CENTER'),
@@ -985,11 +768,13 @@ class ExportWorker(QObject):
             return
         except Exception as e:
             logging.error(f"ExportWorker error: {e}")
+            instrumentation.incr('worker.export.failures')
             self.error.emit(str(e))
 
 class BackupWorker(QObject):
     finished = Signal(str)
     error = Signal(str)
+    progress = Signal(int, int)  # (kopierte Seiten, Seiten gesamt) bei binären Snapshots
 
     def __init__(self, db_path, fn):
         super().__init__()
@@ -1000,28 +785,41 @@ class BackupWorker(QObject):
     def stop(self):
         self._stopped = True
 
+    @instrumentation.timed('worker.backup')
     def run(self):
         if self._stopped:
             return
+        instrumentation.incr('worker.backup.runs')
         try:
-            from kidscompass.data import Database
-            db = Database(self.db_path)
-            db.export_to_sql(self.fn)
-            db.close()
+            from kidscompass.data import Database, compression_for_filename
+            db = Database.from_pool(self.db_path)
+            try:
+                if self.fn.lower().endswith('.sql'):
+                    # Text-Dump bleibt als Exportformat erhalten
+                    db.export_to_sql(self.fn)
+                else:
+                    db.backup_to_file(self.fn, compression=compression_for_filename(self.fn),
+                                      progress=self.progress.emit)
+            finally:
+                db.close()
             if not self._stopped:
                 self.finished.emit(self.fn)
         except OSError as e:
             logging.error(f"BackupWorker OSError: {e}")
+            instrumentation.incr('worker.backup.failures')
             if not self._stopped:
                 self.error.emit(f"Dateifehler: {e}")
         except Exception as e:
             logging.error(f"BackupWorker error: {e}")
+            instrumentation.incr('worker.backup.failures')
             if not self._stopped:
                 self.error.emit(str(e))
 
 class RestoreWorker(QObject):
     finished = Signal()
     error = Signal(str)
+    # (visit_status, patterns, overrides) aus der wiederhergestellten DB; übernommen wird im GUI-Thread
+    loaded = Signal(object, object, object)
 
     def __init__(self, db_path, fn, parent):
         super().__init__()
@@ -1033,28 +831,30 @@ class RestoreWorker(QObject):
     def stop(self):
         self._stopped = True
 
+    @instrumentation.timed('worker.restore')
     def run(self):
         if self._stopped:
             return
+        instrumentation.incr('worker.restore.runs')
         try:
             from kidscompass.data import Database
-            db = Database(self.db_path)
-            # Use atomic import to verify and replace DB atomically
+            db = Database.from_pool(self.db_path)
+            # Use atomic import to verify and replace DB atomically (SQL-Dump oder Snapshot)
             db.atomic_import_from_sql(self.fn)
             if self._stopped:
                 db.close()
                 return
-            self.parent.visit_status = db.load_all_status()
-            self.parent.patterns = db.load_patterns()
-            self.parent.overrides = db.load_overrides()
+            state = (db.load_all_status(), db.load_patterns(), db.load_overrides())
             db.close()
-            self.parent.refresh_calendar()
             if not self._stopped:
+                self.loaded.emit(*state)
                 self.finished.emit()
         except IOError as e:
+            instrumentation.incr('worker.restore.failures')
             if not self._stopped:
                 self.error.emit(f"Dateifehler: {e}")
         except Exception as e:
+            instrumentation.incr('worker.restore.failures')
             if not self._stopped:
                 self.error.emit(str(e))
 
@@ -1314,13 +1114,63 @@ class TraceDialog(QDialog):
             self.list_widget.addItem(s)
         layout.addWidget(self.list_widget)
         if visit_status is not None:
-            vs_text = f"Status: Amilia={'ja' if visit_status.present_child_a else 'nein'}, Malia={'ja' if visit_status.present_child_b else 'nein'}"
+            db = getattr(parent, 'db', None)
+            children = db.load_children() if db is not None else []
+            names = [(c.bit, c.name) for c in children] or [(0, 'Amilia'), (1, 'Malia')]
+            vs_text = "Status: " + ", ".join(
+                f"{name}={'ja' if visit_status.is_present(bit) else 'nein'}" for bit, name in names)
             layout.addWidget(QLabel(vs_text))
         btns = QDialogButtonBox(QDialogButtonBox.Close)
         btns.rejected.connect(self.reject)
         btns.accepted.connect(self.accept)
         layout.addWidget(btns)
 
+class DiagnosticsDialog(QDialog):
+    """Versteckte Diagnose-Ansicht (Strg+Umschalt+D): Laufzeiten und Zähler aus instrumentation."""
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.setWindowTitle('Diagnose: Laufzeiten')
+        self.resize(760, 420)
+        layout = QVBoxLayout(self)
+        self.text = QTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setFont(QFont('Courier New', 9))
+        layout.addWidget(self.text)
+        btns = QHBoxLayout()
+        for label, slot in (('Aktualisieren', self.refresh), ('Als JSON speichern', self.on_export_json),
+                            ('Chrome-Trace speichern', self.on_export_trace), ('Zurücksetzen', self.on_reset)):
+            b = QPushButton(label)
+            b.clicked.connect(slot)
+            btns.addWidget(b)
+        layout.addLayout(btns)
+        self.refresh()
+
+    def refresh(self):
+        summary = instrumentation.RECORDER.summary()
+        lines = [f"{'Name':44s} {'Anzahl':>7s} {'Summe ms':>10s} {'Mittel':>9s} {'p50':>9s} {'p95':>9s} {'max':>9s}"]
+        hist = sorted(summary['histograms'].items(), key=lambda kv: kv[1]['total'], reverse=True)
+        for name, h in hist:
+            lines.append(f"{name:44s} {h['count']:7d} {h['total'] * 1000:10.1f} {h['mean'] * 1000:9.2f} "
+                         f"{h['p50'] * 1000:9.2f} {h['p95'] * 1000:9.2f} {h['max'] * 1000:9.2f}")
+        if summary['counters']:
+            lines.append('')
+            lines.extend(f"{name:44s} {val:7d}" for name, val in sorted(summary['counters'].items()))
+        self.text.setPlainText('\n'.join(lines))
+
+    def on_export_json(self):
+        fn, _ = QFileDialog.getSaveFileName(self, 'Diagnose speichern', 'kidscompass_diagnostics.json', 'JSON (*.json)')
+        if fn:
+            instrumentation.RECORDER.export_json(fn)
+
+    def on_export_trace(self):
+        fn, _ = QFileDialog.getSaveFileName(self, 'Chrome-Trace speichern', 'kidscompass_trace.json', 'JSON (*.json)')
+        if fn:
+            instrumentation.RECORDER.export_chrome_trace(fn)
+
+    def on_reset(self):
+        instrumentation.RECORDER.reset()
+        self.refresh()
+
 class DeleteWorker(QObject):
     """Background worker to delete a pattern or override in a separate sqlite connection.
     Ensures UI thread is not blocked by DB operations.
@@ -1334,10 +1184,11 @@ class DeleteWorker(QObject):
         self.typ = typ
         self.id_ = id_
 
+    @instrumentation.timed('worker.delete')
     def run(self):
         logging.debug(f"DeleteWorker START typ={self.typ} id={self.id_}")
         try:
-            db = Database(db_path=self.db_path)
+            db = Database.from_pool(self.db_path)
             if self.typ == 'pattern':
                 db.delete_pattern(self.id_)
             else:
@@ -1366,6 +1217,12 @@ class MainWindow(QMainWindow):
 
         # Mutex für thread-safe Zugriff
         self._mutex = QMutex()
+        # Unveränderlicher Stand für Worker/Statistik (plan_snapshot); Änderungen nur markieren,
+        # kopiert wird erst beim nächsten Lesen
+        self._plan_revision = 0
+        self._snapshot = None
+        self._plan_dirty = True
+        self._status_dirty = True
 
         # Stelle sicher, dass die DB-Verbindung geschlossen wird
         app = QApplication.instance()
@@ -1384,9 +1241,18 @@ class MainWindow(QMainWindow):
         self.restore_thread = None
         self.worker_thread = None
 
+        # Versteckte Diagnose-Ansicht
+        self._diag_shortcut = QShortcut(QKeySequence('Ctrl+Shift+D'), self)
+        self._diag_shortcut.activated.connect(self.open_diagnostics)
+
         self.load_config()
         self.refresh_calendar()
-        self.on_child_count_changed(0)
+        # Auswahl der Kinderzahl aus der Tabelle children (1..5)
+        n_children = min(max(len(self.db.load_children()), 1), self.tab2.child_count.count())
+        if self.tab2.child_count.currentIndex() == n_children - 1:
+            self.on_child_count_changed(n_children - 1)
+        else:
+            self.tab2.child_count.setCurrentIndex(n_children - 1)
 
     def load_config(self):
         self._mutex.lock()
@@ -1408,18 +1274,8 @@ class MainWindow(QMainWindow):
                         logging.exception('Repair failed: %s', e)
                         QMessageBox.critical(self, 'Repair fehlgeschlagen', f'Fehler: {e}')
                     # reload patterns from DB after repair
-            self.patterns = self.db.load_patterns()
-            self.tab1.entry_list.clear()
-            for pat in self.patterns:
-                display = str(pat)
-                if getattr(pat, 'label', None):
-                    display = f"[{pat.label}] {display}"
-                item = QListWidgetItem(display); item.setData(Qt.UserRole, pat)
-                self.tab1.entry_list.addItem(item)
-            self.overrides = self.db.load_overrides()
-            for ov in self.overrides:
-                item = QListWidgetItem(str(ov)); item.setData(Qt.UserRole, ov)
-                self.tab1.entry_list.addItem(item)
+            self.patterns, self.overrides = self.tab1.plan_model.reload(self.db)
+            self.mark_changed(plan=True)
             # Populate settings UI with config values if available
             try:
                 hr = self.config.get('handover_rules', {})
@@ -1432,6 +1288,44 @@ class MainWindow(QMainWindow):
         finally:
             self._mutex.unlock()
 
+    def mark_changed(self, plan: bool = False):
+        """Besuchsstatus (und mit plan=True auch Muster/Overrides) geändert; O(1), ohne Kopie."""
+        self._status_dirty = True
+        if plan:
+            self._plan_dirty = True
+
+    def plan_snapshot(self) -> PlanSnapshot:
+        """
+        Aktueller PlanSnapshot (nur im GUI-Thread aufrufen). Ohne Änderung seit dem letzten
+        Aufruf wird derselbe Snapshot zurückgegeben; bei reinen Statusänderungen werden
+        Muster/Overrides des Vorgängers übernommen und nur der Status kopiert.
+        """
+        if self._snapshot is None or self._plan_dirty or self._status_dirty:
+            self._plan_revision += 1
+            if self._snapshot is None or self._plan_dirty:
+                self._snapshot = PlanSnapshot.capture(self.patterns, self.overrides, self.visit_status,
+                                                      revision=self._plan_revision,
+                                                      children=self.db.load_children())
+            else:
+                self._snapshot = self._snapshot.with_status(self.visit_status, self._plan_revision)
+            self._plan_dirty = self._status_dirty = False
+        return self._snapshot
+
+    def on_plan_restored(self, visit_status, patterns, overrides):
+        """Slot für RestoreWorker.loaded: wiederhergestellten Stand im GUI-Thread übernehmen."""
+        self._mutex.lock()
+        try:
+            self.visit_status, self.patterns, self.overrides = visit_status, patterns, overrides
+            self.mark_changed(plan=True)
+        finally:
+            self._mutex.unlock()
+        self.refresh_calendar()
+
+    def selected_entry(self):
+        """Aktuell in der Eintragsliste gewähltes Muster/Override (oder None)."""
+        idx = self.tab1.entry_list.currentIndex()
+        return idx.data(Qt.UserRole) if idx.isValid() else None
+
     def on_child_count_changed(self, index):
         """Rebuild the child checkboxes in the StatusTab based on the selected child count.
         The combo emits an index; the actual count is the combo text (1..5).
@@ -1458,11 +1352,20 @@ class MainWindow(QMainWindow):
                 except Exception:
                     w.setParent(None)
 
-        # Create checkboxes for each child
+        # Create checkboxes for each child; fehlende Kinder in der Tabelle children anlegen,
+        # damit Statistik und Exporte ihre Abwesenheiten (Bit i in absent_mask) auswerten
         self.tab2.child_checks = []
-        labels = ["Amilia", "Malia", "Kind 3", "Kind 4", "Kind 5"]
+        labels = {c.bit: c.name for c in self.db.load_children()} if getattr(self, 'db', None) else {}
+        missing = [i for i in range(count) if i not in labels] if getattr(self, 'db', None) else []
+        if missing:
+            for i in missing:
+                labels[i] = self.db.save_child(f"Kind {i+1}", bit=i).name
+            self.mark_changed(plan=True)
+            if hasattr(self, 'tab4'):
+                self.tab4.refresh_children()
+            self.refresh_calendar()
         for i in range(count):
-            lbl = labels[i] if i < len(labels) else f"Kind {i+1}"
+            lbl = labels.get(i, f"Kind {i+1}")
             cb = QCheckBox(lbl)
             cb.setChecked(False)
             grid.addWidget(cb, 0, i)
@@ -1472,8 +1375,6 @@ class MainWindow(QMainWindow):
         cal = self.tab2.calendar
         cal.setDateTextFormat(QDate(), QTextCharFormat())
         today = datetime.date.today()
-        t0 = time.time()
-        logging.debug(f"refresh_calendar START patterns={len(self.patterns)} overrides={len(self.overrides)} visit_status={len(self.visit_status)}")
 
         def apply_format(d, color):
             qd = QDate(d.year, d.month, d.day)
@@ -1483,69 +1384,65 @@ class MainWindow(QMainWindow):
 
         self._mutex.lock()
         try:
-            raw: List[datetime.date] = []
-            for p in self.patterns:
-                start_y = p.start_date.year
-                last_y = p.end_date.year if p.end_date else today.year
-                for yr in range(start_y, last_y + 1):
-                    raw.extend(generate_standard_days(p, yr))
-            t1 = time.time()
-            logging.debug(f"generate_standard_days done: raw_count={len(raw)} duration={t1-t0:.3f}s")
-
-            planned = apply_overrides(raw, self.overrides)
-            t2 = time.time()
-            logging.debug(f"apply_overrides done: planned_count={len(planned)} duration={t2-t1:.3f}s total={t2-t0:.3f}s")
-
-            for d in planned:
-                if d <= today:
-                    apply_format(d, COLOR_PLANNED)
-
-            # Only apply visit_status coloring for days that are actually planned.
-            planned_set = set(planned)
-            for d, vs in self.visit_status.items():
-                if d <= today and d in planned_set:
-                    if not vs.present_child_a and not vs.present_child_b:
-                        apply_format(d, COLOR_BOTH_ABSENT)
-                    elif not vs.present_child_a:
-                        apply_format(d, COLOR_A_ABSENT)
-                    elif not vs.present_child_b:
-                        apply_format(d, COLOR_B_ABSENT)
-
-            # Build annotations: for each pattern, find its earliest occurrence in planned_set and annotate that date with pattern id
-            annotations = {}
-            try:
-                for p in self.patterns:
-                    # generate dates for years covering pattern span
-                    start_y = p.start_date.year
-                    end_y = p.end_date.year if p.end_date else today.year
-                    dates = []
-                    for y in range(start_y, end_y + 1):
-                        dates.extend(generate_standard_days(p, y))
-                    # find earliest date that is in planned_set
-                    cand = sorted(d for d in set(dates) if d in planned_set)
-                    if cand:
-                        first = cand[0]
-                        # If already annotated, append
-                        pid = getattr(p, 'id', None)
-                        lab = getattr(p, 'label', None)
-                        label_part = f"[{lab}] " if lab else ""
-                        text = f"{label_part}id={pid}"
-                        if first in annotations:
-                            annotations[first] += f", {text}"
-                        else:
-                            annotations[first] = text
-            except Exception:
-                annotations = {}
-            t3 = time.time()
-            logging.debug(f"annotations built: count={len(annotations)} duration={(t3-t2):.3f}s total={(t3-t0):.3f}s")
+            with instrumentation.span('ui.refresh_calendar', patterns=len(self.patterns),
+                                      overrides=len(self.overrides), visit_status=len(self.visit_status)):
+                with instrumentation.span('ui.refresh_calendar.generate') as info:
+                    raw: List[datetime.date] = []
+                    for p in self.patterns:
+                        start_y = p.start_date.year
+                        last_y = p.end_date.year if p.end_date else today.year
+                        for yr in range(start_y, last_y + 1):
+                            raw.extend(generate_standard_days(p, yr))
+                    info['raw_count'] = len(raw)
+
+                planned = apply_overrides(raw, self.overrides)
+
+                with instrumentation.span('ui.refresh_calendar.format', planned_count=len(planned)):
+                    for d in planned:
+                        if d <= today:
+                            apply_format(d, COLOR_PLANNED)
+
+                    # Only apply visit_status coloring for days that are actually planned.
+                    planned_set = set(planned)
+                    full = sum(1 << c.bit for c in self.db.load_children()) or 0b11
+                    for d, vs in self.visit_status.items():
+                        if d <= today and d in planned_set:
+                            absent = vs.absent_mask & full
+                            if absent and absent == full:
+                                apply_format(d, COLOR_BOTH_ABSENT)
+                            elif absent & 1:
+                                apply_format(d, COLOR_A_ABSENT)
+                            elif absent:
+                                apply_format(d, COLOR_B_ABSENT)
+
+                # Build annotations: for each pattern, find its earliest occurrence in planned_set and annotate that date with pattern id
+                with instrumentation.span('ui.refresh_calendar.annotations') as info:
+                    annotations = {}
+                    try:
+                        # Sprung über first_occurrence + Bitmap der geplanten Tage statt Neuerzeugung je Muster
+                        index = PlannedIndex(planned_set)
+                        for p in self.patterns:
+                            first = first_occurrence(p, p.start_date, index)
+                            if first is not None:
+                                # If already annotated, append
+                                pid = getattr(p, 'id', None)
+                                lab = getattr(p, 'label', None)
+                                label_part = f"[{lab}] " if lab else ""
+                                text = f"{label_part}id={pid}"
+                                if first in annotations:
+                                    annotations[first] += f", {text}"
+                                else:
+                                    annotations[first] = text
+                    except Exception:
+                        annotations = {}
+                    info['count'] = len(annotations)
 
-            try:
-                self.calendar.set_annotations(annotations)
-            except Exception:
-                pass
+                try:
+                    cal.set_annotations(annotations)
+                except Exception:
+                    pass
         finally:
             self._mutex.unlock()
-        logging.debug(f"refresh_calendar END total_duration={time.time()-t0:.3f}s")
 
     def on_add_pattern(self):
         try:
@@ -1587,6 +1484,9 @@ class MainWindow(QMainWindow):
             logging.exception('Fehler beim Zurücksetzen des Plans: %s', e)
             QMessageBox.critical(self, 'Reset fehlgeschlagen', f'Fehler beim Zurücksetzen: {e}')
             return
+        if not keep_status:
+            self.visit_status.clear()
+            self.mark_changed()
 
         # Seed canonical patterns according to Urteil rules
         from datetime import date
@@ -1630,11 +1530,10 @@ class MainWindow(QMainWindow):
 
     def on_split_pattern(self):
         # Open dialog to split the selected pattern
-        item = self.tab1.entry_list.currentItem()
-        if not item:
+        obj = self.selected_entry()
+        if obj is None:
             QMessageBox.warning(self, 'Aufteilen', 'Bitte zuerst ein Pattern auswählen.')
             return
-        obj = item.data(Qt.UserRole)
         if not isinstance(obj, VisitPattern):
             QMessageBox.warning(self, 'Aufteilen', 'Bitte ein Besuchsmuster (Pattern) auswählen.')
             return
@@ -1676,10 +1575,9 @@ class MainWindow(QMainWindow):
         self.refresh_calendar()
 
     def on_delete_entry(self):
-        item = self.tab1.entry_list.currentItem()
-        if not item:
+        obj = self.selected_entry()
+        if obj is None:
             return
-        obj = item.data(Qt.UserRole)
         typ = 'pattern' if isinstance(obj, VisitPattern) else 'override'
         id_ = getattr(obj, 'id', None)
         # Run deletion in background to avoid UI freeze
@@ -1710,11 +1608,10 @@ class MainWindow(QMainWindow):
 
     def on_edit_entry(self):
         # Öffnet den Edit-Dialog für das aktuell selektierte Entry
-        item = self.tab1.entry_list.currentItem()
-        if not item:
+        obj = self.selected_entry()
+        if obj is None:
             QMessageBox.warning(self, "Bearbeiten", "Bitte zuerst einen Eintrag auswählen.")
             return
-        obj = item.data(Qt.UserRole)
         dlg = EditEntryDialog(self, obj)
         if dlg.exec() == QDialog.Accepted:
             updated = dlg.get_updated()
@@ -1736,6 +1633,10 @@ class MainWindow(QMainWindow):
         dlg = CleanupDialog(self)
         dlg.exec()
 
+    def open_diagnostics(self):
+        dlg = DiagnosticsDialog(self)
+        dlg.exec()
+
     def show_date_trace(self, selected_date, planned_set, raw_standard_days):
         # Build list of sources
         sources = []
@@ -1793,6 +1694,7 @@ class MainWindow(QMainWindow):
                     if selected_date in self.visit_status:
                         self.visit_status.pop(selected_date)
                         self.db.delete_status(selected_date)
+                        self.mark_changed()
                 # Do not allow creating new status on unplanned days
                 return
 
@@ -1800,19 +1702,22 @@ class MainWindow(QMainWindow):
             if not checked_children:
                 return
 
-            vs = self.visit_status.get(selected_date, VisitStatus(day=selected_date))
+            old = self.visit_status.get(selected_date)
 
-            current_status = (not vs.present_child_a, not vs.present_child_b)
-            new_status = (0 in checked_children, 1 in checked_children)
+            # angehakte Kinder fehlen: Bit k = Kind k (siehe Tabelle children)
+            new_mask = sum(1 << i for i in checked_children)
 
-            if selected_date in self.visit_status and current_status == new_status:
+            if old is not None and old.absent_mask == new_mask:
                 self.visit_status.pop(selected_date)
                 self.db.delete_status(selected_date)
             else:
-                vs.present_child_a = 0 not in checked_children
-                vs.present_child_b = 1 not in checked_children
+                # neues Objekt statt Änderung: ältere Snapshots teilen die bisherigen VisitStatus
+                vs = VisitStatus(day=selected_date, absent_mask=new_mask)
+                if old is not None:
+                    vs.id = old.id
                 self.visit_status[selected_date] = vs
                 self.db.save_status(vs)
+            self.mark_changed()
         finally:
             self._mutex.unlock()
 
@@ -1822,6 +1727,7 @@ class MainWindow(QMainWindow):
         self._mutex.lock()
         try:
             self.visit_status.clear(); self.db.clear_status()
+            self.mark_changed()
         finally:
             self._mutex.unlock()
         self.refresh_calendar()
@@ -1839,7 +1745,7 @@ class MainWindow(QMainWindow):
         if not fn:
             return
         self.export_thread = QThread()
-        self.export_worker = ExportWorker(self, df, dt, self.patterns, self.overrides, self.visit_status, out_fn=fn)
+        self.export_worker = ExportWorker(self, df, dt, out_fn=fn, snapshot=self.plan_snapshot())
         self.export_worker.moveToThread(self.export_thread)
         self.export_thread.started.connect(self.export_worker.run)
         self.export_worker.finished.connect(self.on_export_finished)
@@ -1849,6 +1755,28 @@ class MainWindow(QMainWindow):
         self.export_thread.finished.connect(self.export_thread.deleteLater)
         self.export_thread.start()
 
+    def on_export_ics(self):
+        from kidscompass.ics_export import write_plan_ics
+        df = qdate_to_date(self.tab3.date_from.date())
+        dt = qdate_to_date(self.tab3.date_to.date())
+        if dt < df:
+            QMessageBox.warning(self, 'Export', 'Das Enddatum liegt vor dem Startdatum.')
+            return
+        fn, _ = QFileDialog.getSaveFileName(self, "Kalender exportieren", filter="iCalendar-Datei (*.ics)")
+        if not fn:
+            return
+        if not fn.lower().endswith('.ics'):
+            fn += '.ics'
+        try:
+            snap = self.plan_snapshot()
+            stats = write_plan_ics(fn, snap.patterns, snap.overrides, df, dt)
+        except Exception as e:
+            logging.exception('ICS-Export fehlgeschlagen')
+            QMessageBox.critical(self, 'Export', f'Export fehlgeschlagen: {e}')
+            return
+        QMessageBox.information(self, 'Export', f"Kalender gespeichert: {fn}\n"
+                                f"{stats['days']} Umgangstage in {stats['events']} Terminen")
+
     def on_export_finished(self, msg):
         QMessageBox.information(self, 'Export', msg)
 
@@ -1871,6 +1799,11 @@ class MainWindow(QMainWindow):
         # Schließe die Datenbankverbindung, falls vorhanden
         if hasattr(self, 'db') and self.db:
             self.db.close()
+        # Gepoolte Worker-Verbindungen schließen
+        close_pool()
+        stats = sqltrace.active()
+        if stats is not None:
+            stats.log_summary()
 
 # Setup debug logfile to capture long-running operations
 _log_dir = os.path.join(os.path.expanduser("~"), ".kidscompass")
@@ -1886,10 +1819,23 @@ if not _fh_exists:
 logging.getLogger().setLevel(logging.DEBUG)
 
 def main():
-    app = QApplication(sys.argv)
+    from kidscompass.profiling import PROFILE_FLAG, enable_profiling, profiling_requested
+    profiler = None
+    if profiling_requested(sys.argv):
+        from kidscompass.data import default_db_path
+        # Vor dem Erzeugen der Fenster patchen, damit Signal-Verbindungen die Hüllen nutzen
+        profiler = enable_profiling(default_db_path())
+    argv = [a for a in sys.argv if a != PROFILE_FLAG]
+    # SQL-Statistik/Slow-Query-Log: KIDSCOMPASS_SQLTRACE=1 [KIDSCOMPASS_SLOW_QUERY_MS=200]
+    sqltrace.enable_from_env()
+    app = QApplication(argv)
     win = MainWindow()
     win.show()
-    sys.exit(app.exec())
+    rc = app.exec()
+    if profiler is not None:
+        profiler.uninstall()
+        logging.info(f"Profiling beendet: {len(profiler.artifacts)} Dateien in {profiler.out_dir}")
+    sys.exit(rc)
 
 if __name__ == '__main__':
     main()
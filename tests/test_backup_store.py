@@ -0,0 +1,61 @@
+import datetime as _dt
+import json
+import os
+from datetime import date
+
+from kidscompass.backups import BackupStore
+from kidscompass.data import Database
+from kidscompass.models import VisitStatus
+
+
+def test_snapshot_skips_unchanged_and_dedups(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    store = db.backup_store()
+    first = store.snapshot(db.conn, reason='manual')
+    again = store.snapshot(db.conn, reason='manual')
+    assert again['skipped'] and again['id'] == first['id']
+
+    db.save_status(VisitStatus(date(2025, 3, 1), False, True))
+    changed = store.snapshot(db.conn, reason='manual')
+    assert not changed['skipped'] and changed['sha256'] != first['sha256']
+
+    # Rückkehr zum ersten Inhalt (Journal ist gewachsen): neuer Index-Eintrag, aber dieselbe Datei
+    db.delete_status(date(2025, 3, 1))
+    assert db.conn.execute("SELECT COUNT(*) FROM changes").fetchone()[0] == 2
+    back = store.snapshot(db.conn, reason='manual')
+    assert not back['skipped'] and back['sha256'] == first['sha256']
+    assert back['file'] == first['file'] and back['id'] != first['id']
+    assert len([f for f in os.listdir(store.backup_dir) if f.endswith('.db')]) == 2
+    assert [e['id'] for e in store.list_snapshots()][0] == back['id']
+
+    with open(store.index_path, encoding='utf-8') as f:
+        assert len(json.load(f)['entries']) == 3
+    db.close()
+
+
+def test_retention_prunes_old_snapshots(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    store = BackupStore(db.db_path, keep_last=2, keep_daily=3, keep_monthly=2)
+    start = _dt.datetime(2025, 1, 1, 12, 0)
+    for i in range(90):
+        db.save_status(VisitStatus(date(2024, 1, 1) + _dt.timedelta(days=i), True, bool(i % 2)))
+        store.snapshot(db.conn, reason='test', now=start + _dt.timedelta(days=i))
+    entries = store.list_snapshots()
+    created = [e['created'][:10] for e in entries]
+    # zwei neueste, je ein Tag für die letzten drei Tage, je ein Monat für zwei Monate
+    assert created == ['2025-03-31', '2025-03-30', '2025-03-29', '2025-02-28']
+    files = {e['file'] for e in entries}
+    on_disk = {f for f in os.listdir(store.backup_dir) if f.endswith('.db')}
+    assert on_disk == files
+    db.close()
+
+
+def test_repair_uses_backup_store(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.conn.execute("INSERT INTO patterns (weekdays, interval_weeks, start_date) VALUES ('x', 1, '2024-01-01')")
+    db.conn.commit()
+    report = db.repair_patterns_weekdays()
+    assert os.path.dirname(report['backup']) == db.backup_store().backup_dir
+    assert db.backup_store().latest()['reason'] == 'before_weekday_repair'
+    assert not list(tmp_path.glob('kc.db.bak_*'))
+    db.close()
@@ -0,0 +1,55 @@
+import gzip
+import sqlite3
+from datetime import date
+
+import pytest
+
+from kidscompass.data import Database, compression_for_filename
+from kidscompass.models import VisitPattern, VisitStatus
+
+
+def _make_db(path):
+    db = Database(str(path))
+    db.save_pattern(VisitPattern([4, 5, 6], interval_weeks=2, start_date=date(2024, 11, 22)))
+    for day in range(1, 29):
+        db.save_status(VisitStatus(date(2025, 2, day), day % 2 == 0, day % 3 == 0))
+    return db
+
+
+def test_binary_snapshot_roundtrip_with_progress(tmp_path):
+    db = _make_db(tmp_path / 'live.db')
+    steps = []
+    out = db.backup_to_file(str(tmp_path / 'snap.db'), pages=1, progress=lambda done, total: steps.append((done, total)))
+    db.close()
+
+    assert steps and steps[-1][0] == steps[-1][1]
+    with open(out, 'rb') as f:
+        assert f.read(16) == b'SQLite format 3\x00'
+    snap = Database(out)
+    assert len(snap.load_patterns()) == 1
+    assert len(snap.load_all_status()) == 28
+    snap.close()
+
+
+def test_gzip_snapshot(tmp_path):
+    db = _make_db(tmp_path / 'live.db')
+    fn = str(tmp_path / 'snap.db.gz')
+    assert compression_for_filename(fn) == 'gzip'
+    db.backup_to_file(fn, compression='gzip')
+    db.close()
+
+    raw = tmp_path / 'unpacked.db'
+    with gzip.open(fn, 'rb') as src:
+        raw.write_bytes(src.read())
+    conn = sqlite3.connect(str(raw))
+    assert conn.execute('SELECT COUNT(*) FROM visit_status').fetchone()[0] == 28
+    conn.close()
+    # keine temporären Dateien liegen lassen
+    assert not list(tmp_path.glob('.kc_snapshot_*'))
+
+
+def test_unknown_compression_rejected(tmp_path):
+    db = Database(str(tmp_path / 'live.db'))
+    with pytest.raises(ValueError):
+        db.backup_to_file(str(tmp_path / 'x.db'), compression='lz4')
+    db.close()
@@ -3,8 +3,8 @@
 from datetime import date, timedelta
 import pytest
 
-from kidscompass.models import VisitPattern, OverridePeriod
-from kidscompass.calendar_logic import generate_standard_days, apply_overrides
+from kidscompass.models import VisitPattern, OverridePeriod, RemoveOverride
+from kidscompass.calendar_logic import generate_standard_days, apply_overrides, first_occurrence, PlannedIndex
 
 def test_every_monday_2025():
     pat = VisitPattern(weekdays=[0], interval_weeks=1, start_date=date(2025, 1, 1))
@@ -67,3 +67,40 @@ def test_various_patterns(wd, interval):
     # Mindestens ein Termin im Jahr ist OK, und alle haben den korrekten Wochentag
     assert days, "Keine Termine generiert"
     assert all(d.weekday() == wd for d in days)
+
+
+def _brute_first(pat, t):
+    for y in range(max(t.year, pat.start_date.year), t.year + 3):
+        for d in generate_standard_days(pat, y):
+            if d >= t:
+                return d
+    return None
+
+
+@pytest.mark.parametrize("wd,interval,start,end", [
+    ([0], 1, date(2025, 1, 1), None),
+    ([4, 5, 6], 2, date(2024, 11, 22), None),
+    ([2], 3, date(2023, 5, 17), date(2025, 2, 1)),
+    ([6, 1], 4, date(2024, 12, 30), date(2024, 12, 31)),
+])
+def test_first_occurrence_matches_generation(wd, interval, start, end):
+    pat = VisitPattern(weekdays=wd, interval_weeks=interval, start_date=start, end_date=end)
+    t = date(2023, 1, 1)
+    while t < date(2026, 3, 1):
+        assert first_occurrence(pat, t) == _brute_first(pat, t), t
+        t += timedelta(days=5)
+
+
+def test_first_occurrence_with_planned_index():
+    pats = [VisitPattern([5, 6], 2, date(2024, 1, 6)), VisitPattern([2], 1, date(2024, 3, 6), date(2024, 8, 28))]
+    ovs = [RemoveOverride(date(2024, 1, 1), date(2024, 4, 30))]
+    planned = apply_overrides([d for p in pats for y in (2024, 2025) for d in generate_standard_days(p, y)], ovs)
+    index = PlannedIndex(planned)
+    assert len(index) == len(set(planned))
+    for p in pats:
+        expected = min((d for y in (2024, 2025) for d in generate_standard_days(p, y) if d in set(planned)), default=None)
+        assert first_occurrence(p, p.start_date, index) == expected
+    # Muster ganz im entfernten Zeitraum: kein Treffer
+    gone = VisitPattern([0], 1, date(2024, 2, 5), date(2024, 4, 29))
+    assert first_occurrence(gone, gone.start_date, index) is None
+    assert first_occurrence(pats[0], date(2026, 1, 1), index) is None
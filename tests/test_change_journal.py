@@ -0,0 +1,58 @@
+from datetime import date
+
+from kidscompass.data import Database
+from kidscompass.models import VisitPattern, VisitStatus
+
+
+def test_writes_are_journaled(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    assert db.current_change_seq() == 0
+    p = VisitPattern([0, 2], 1, date(2025, 1, 1))
+    db.save_pattern(p)
+    db.save_status(VisitStatus(date(2025, 1, 6), False, True))
+    db.save_status(VisitStatus(date(2025, 1, 6), False, True))  # keine Änderung -> kein Eintrag
+    db.save_status(VisitStatus(date(2025, 1, 6), True, True))
+    db.delete_status(date(2025, 1, 6))
+
+    changes = db.changes_since(0)
+    assert [(c['table'], c['op']) for c in changes] == [
+        ('patterns', 'insert'), ('visit_status', 'insert'),
+        ('visit_status', 'update'), ('visit_status', 'delete'),
+    ]
+    upd = changes[2]
+    assert upd['row_id'] == '2025-01-06'
+    assert upd['before']['absent_mask'] == 1 and upd['after']['absent_mask'] == 0
+    assert changes[0]['after']['weekdays'] == '0,2'
+    assert [c['seq'] for c in db.changes_since(changes[1]['seq'])] == [c['seq'] for c in changes[2:]]
+    assert len(db.changes_since(0, limit=2)) == 2
+    db.close()
+
+
+def test_revert_changes_since(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_status(VisitStatus(date(2025, 2, 1), False, False))
+    mark = db.current_change_seq()
+
+    db.save_status(VisitStatus(date(2025, 2, 1), True, False))
+    db.save_status(VisitStatus(date(2025, 2, 2), False, True))
+    db.save_pattern(VisitPattern([5], 2, date(2025, 2, 1)))
+    assert db.revert_changes_since(mark) == 3
+
+    status = db.load_all_status()
+    assert list(status) == [date(2025, 2, 1)]
+    assert not status[date(2025, 2, 1)].present_child_a
+    assert db.load_patterns() == []
+    db.close()
+
+
+def test_journal_survives_sql_roundtrip(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_status(VisitStatus(date(2025, 3, 1), False, True))
+    dump = str(tmp_path / 'dump.sql')
+    db.export_to_sql(dump)
+    db.import_from_sql(dump)
+    seq = db.current_change_seq()
+    assert seq == 1
+    db.save_status(VisitStatus(date(2025, 3, 2), True, False))
+    assert db.current_change_seq() == seq + 1
+    db.close()
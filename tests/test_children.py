@@ -0,0 +1,153 @@
+import sqlite3
+from datetime import date
+
+import numpy as np
+
+from kidscompass.data import Database
+from kidscompass.models import Child, VisitPattern, VisitStatus
+from kidscompass.statistics import (absence_label, child_attendance, compute_statistics, count_missing_by_weekday,
+                                    presence_matrix, sum_monthly_stats)
+
+
+def test_legacy_status_columns_become_bitmask(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    Database(path).close()
+    # Stand vor Schritt 6 nachbauen: zwei Anwesenheitsspalten, Journal im alten Format
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        DROP TRIGGER trg_visit_status_journal_insert;
+        DROP TRIGGER trg_visit_status_journal_update;
+        DROP TRIGGER trg_visit_status_journal_delete;
+        DROP INDEX idx_visit_status_day_presence;
+        DROP TABLE visit_status;
+        DROP TABLE children;
+        CREATE TABLE visit_status (day TEXT PRIMARY KEY, present_child_a INTEGER NOT NULL,
+                                   present_child_b INTEGER NOT NULL);
+        INSERT INTO visit_status VALUES ('2025-03-01', 0, 1), ('2025-03-02', 1, 0), ('2025-03-03', 0, 0);
+        INSERT INTO changes (tbl, row_id, op, before, after) VALUES ('visit_status', '2025-03-03', 'update',
+            '{"day":"2025-03-03","present_child_a":1,"present_child_b":0}',
+            '{"day":"2025-03-03","present_child_a":0,"present_child_b":0}');
+        PRAGMA user_version = 5;
+    """)
+    conn.close()
+
+    db = Database(path)
+    cols = [r[1] for r in db.conn.execute("PRAGMA table_info(visit_status)")]
+    assert cols == ['day', 'absent_mask']
+    status = db.load_all_status()
+    assert [status[date(2025, 3, d)].absent_mask for d in (1, 2, 3)] == [1, 2, 3]
+    assert [c.name for c in db.load_children()] == ['Amilia', 'Malia']
+
+    # Rücknahme eines Journal-Eintrags im alten Format
+    db.revert_changes_since(0)
+    assert db.load_all_status()[date(2025, 3, 3)].absent_mask == 2
+    db.close()
+
+
+def test_third_child_roundtrip(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    child = db.save_child('Noah')
+    assert child.bit == 2
+    db.save_child('Noah M.', bit=2)
+    assert [(c.bit, c.name) for c in db.load_children()] == [(0, 'Amilia'), (1, 'Malia'), (2, 'Noah M.')]
+
+    vs = VisitStatus(date(2025, 4, 5))
+    vs.set_present(2, False)
+    db.save_status(vs)
+    db.save_status(VisitStatus(date(2025, 4, 6), False, True))
+    loaded = db.load_all_status()
+    assert loaded[date(2025, 4, 5)].present_child_a and not loaded[date(2025, 4, 5)].is_present(2)
+    assert not loaded[date(2025, 4, 6)].present_child_a
+    # Tage vor Anlage des dritten Kindes: Bit 2 nicht gesetzt -> anwesend
+    assert loaded[date(2025, 4, 6)].is_present(2)
+
+    arrays = db.load_status_arrays()
+    att = child_attendance(arrays['mask'], 3)
+    assert att['present'] == [1, 2, 1] and att['absent'] == [1, 0, 1]
+    assert att['all_present'] == 0 and att['all_absent'] == 0
+    assert list(arrays['a']) == [True, False]
+    db.close()
+
+
+def test_child_attendance_matches_per_child_loops():
+    rng = np.random.default_rng(7)
+    masks = rng.integers(0, 32, size=500)
+    m = presence_matrix(masks, 5)
+    for k in range(5):
+        assert m[:, k].sum() == sum(1 for x in masks if not x >> k & 1)
+    att = child_attendance(masks, 5)
+    assert att['all_absent'] == int((masks == 31).sum())
+    assert att['all_present'] == int((masks == 0).sum())
+    assert list(att['absent_count']) == [bin(int(x)).count('1') for x in masks]
+
+
+def test_count_missing_by_weekday_uses_mask(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    for d, a, b in [(1, False, True), (2, True, False), (3, False, False), (4, True, True)]:
+        db.save_status(VisitStatus(date(2025, 5, d), a, b))
+    assert count_missing_by_weekday(db) == {0: {'missed_a': 2}, 1: {'missed_b': 2}, 2: {'both_missing': 1}}
+    db.close()
+
+
+def _three_children(db):
+    db.save_pattern(VisitPattern([5], 1, date(2025, 1, 4)))
+    db.save_child('Noah')
+    for d, mask in [(4, 0b100), (11, 0b101), (18, 0b111)]:
+        db.save_status(VisitStatus(date(2025, 1, d), absent_mask=mask))
+    return db.load_patterns(), db.load_overrides(), db.load_all_status()
+
+
+def test_third_child_in_monthly_stats_and_statistics(tmp_path, monkeypatch):
+    import reportlab.platypus
+    from kidscompass.stats_export import write_statistics_pdf
+    db = Database(str(tmp_path / 'kc.db'))
+    patterns, overrides, status = _three_children(db)
+    rows = db.monthly_stats(date(2025, 1, 1), date(2025, 1, 31))
+    sat = [r for r in rows if r['weekday'] == 5][0]
+    assert sat['masks'] == {0b100: 1, 0b101: 1, 0b111: 1, 0: 1}
+    c = sum_monthly_stats(rows, bits=(0, 1, 2))
+    assert c['present'] == {0: 2, 1: 3, 2: 1} and c['all_present'] == 1 and c['all_absent'] == 1
+
+    res = compute_statistics(db, date(2025, 1, 1), date(2025, 1, 31), [5], 'Alle',
+                             patterns, overrides, status, today=date(2025, 1, 31))
+    assert 'Noah anwesend: 1 (25.0%)' in res.summary and 'Malia abwesend: 1 (25.0%)' in res.summary
+    assert res.trend_names == ['Amilia', 'Malia', 'Noah'] and len(res.trend[0][1]) == 3
+    single = compute_statistics(db, date(2025, 1, 1), date(2025, 1, 31), [5], 'Noah',
+                                patterns, overrides, status, today=date(2025, 1, 31))
+    assert 'Noah abwesend: 3 (75.0%)' in single.summary
+
+    tables = []
+    monkeypatch.setattr(reportlab.platypus, 'Table',
+                        lambda data, *a, _t=reportlab.platypus.Table, **k: tables.append(data) or _t(data, *a, **k))
+    write_statistics_pdf(res, str(tmp_path / 'stats.pdf'))
+    visits = [t for t in tables if t[0][0] == 'Datum'][0]
+    assert visits[0][2:] == ['Amilia anwesend (1=ja, 0=nein)', 'Malia anwesend (1=ja, 0=nein)',
+                             'Noah anwesend (1=ja, 0=nein)']
+    assert visits[2][2:] == [0, 1, 0]
+    db.close()
+
+
+def test_absence_label():
+    children = [Child(0, 'Amilia'), Child(1, 'Malia'), Child(2, 'Noah')]
+    assert absence_label(0, children) == 'Alle da'
+    assert absence_label(0b100, children) == 'Noah fehlt'
+    assert absence_label(0b101, children) == 'Amilia, Noah fehlen'
+    assert absence_label(0b111, children) == 'Alle fehlen'
+    assert absence_label(0b11, children[:2]) == 'Beide fehlen'
+
+
+def test_status_tab_creates_missing_children(qtbot, tmp_path):
+    from kidscompass.ui import MainWindow
+    db = Database(str(tmp_path / 'kc.db'))
+    w = MainWindow(db)
+    qtbot.addWidget(w)
+    assert w.tab2.child_count.currentText() == '2' and len(w.tab2.child_checks) == 2
+    w.tab2.child_count.setCurrentText('4')
+    assert [c.name for c in db.load_children()] == ['Amilia', 'Malia', 'Kind 3', 'Kind 4']
+    assert [cb.text() for _, cb in w.tab2.child_checks] == ['Amilia', 'Malia', 'Kind 3', 'Kind 4']
+    assert len(w.plan_snapshot().children) == 4
+    assert w.tab4.status_combo.itemText(w.tab4.status_combo.count() - 1) == 'Alle'
+    # weniger Kinder anzeigen löscht keine erfassten Kinder
+    w.tab2.child_count.setCurrentText('1')
+    assert len(db.load_children()) == 4
+    db.close()
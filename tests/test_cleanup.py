@@ -40,3 +40,20 @@ def test_find_and_remove_duplicates(tmp_path):
     assert all(len(g) == 1 for g in dups2) or not dups2
 
     db.close()
+
+
+def test_find_unreferenced_patterns_window(tmp_path):
+    from kidscompass.models import VisitPattern, OverridePeriod
+    db = Database(str(tmp_path / 'unref.db'))
+    in_window = VisitPattern([2], 3, date(2024, 1, 3))
+    ended = VisitPattern([0], 1, date(2023, 1, 2), date(2023, 12, 31))
+    gap = VisitPattern([6], 1, date(2025, 3, 10), date(2025, 3, 15))  # kein Sonntag im Zeitraum
+    used = VisitPattern([1], 1, date(2024, 1, 2))
+    for p in (in_window, ended, gap, used):
+        db.save_pattern(p)
+    db.save_override(OverridePeriod(date(2025, 3, 1), date(2025, 3, 31), used))
+
+    ids = [r['id'] for r in db.find_unreferenced_patterns(date(2025, 3, 1), date(2025, 3, 31))]
+    assert ids == [in_window.id]
+    assert [r['id'] for r in db.find_unreferenced_patterns()] == [in_window.id, ended.id, gap.id]
+    db.close()
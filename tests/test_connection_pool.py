@@ -0,0 +1,67 @@
+import threading
+from datetime import date
+
+from kidscompass.data import Database, connection_pool
+from kidscompass.models import VisitStatus
+
+
+def test_pool_reuses_connection_and_skips_schema_check(tmp_path, monkeypatch):
+    path = str(tmp_path / 'kc.db')
+    calls = []
+    orig = Database._ensure_tables
+    monkeypatch.setattr(Database, '_ensure_tables', lambda self: (calls.append(1), orig(self)))
+
+    db1 = Database.from_pool(path)
+    conn = db1.conn
+    db1.save_status(VisitStatus(date(2025, 1, 1), False, True))
+    db1.close()
+    db2 = Database.from_pool(path)
+    assert db2.conn is conn
+    assert date(2025, 1, 1) in db2.load_all_status()
+    db2.close()
+    assert len(calls) == 1
+    connection_pool().discard(path)
+
+
+def test_pool_hands_out_per_thread_connections(tmp_path):
+    path = str(tmp_path / 'kc.db')
+    main = Database.from_pool(path)
+    nested = Database.from_pool(path)
+    assert nested.conn is main.conn
+    seen = {}
+
+    def worker():
+        db = Database.from_pool(path)
+        seen['conn'] = db.conn
+        db.save_status(VisitStatus(date(2025, 2, 1), True, False))
+        db.close()
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert seen['conn'] is not main.conn
+    assert date(2025, 2, 1) in main.load_all_status()
+    nested.close()
+    main.close()
+    connection_pool().discard(path)
+
+
+def test_restore_discards_pooled_connections(tmp_path):
+    path = str(tmp_path / 'kc.db')
+    src = Database(str(tmp_path / 'src.db'))
+    src.save_status(VisitStatus(date(2025, 3, 1), False, False))
+    snap = src.backup_to_file(str(tmp_path / 'snap.db'))
+    src.close()
+
+    idle = Database.from_pool(path)
+    idle_conn = idle.conn
+    idle.close()
+    db = Database.from_pool(path)
+    db.atomic_import_from_sql(snap)
+    assert date(2025, 3, 1) in db.load_all_status()
+    db.close()
+    again = Database.from_pool(path)
+    assert again.conn is not idle_conn
+    assert date(2025, 3, 1) in again.load_all_status()
+    again.close()
+    connection_pool().close_all()
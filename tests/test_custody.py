@@ -0,0 +1,50 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from kidscompass.calendar_logic import apply_overrides, generate_standard_days
+from kidscompass.custody import custody_totals, holder_on, resolve_holders
+from kidscompass.models import OverridePeriod, RemoveOverride, VisitPattern
+from kidscompass.statistics import custody_summary, custody_text
+
+
+def _plan():
+    patterns = [VisitPattern([4, 5, 6], 2, date(2024, 1, 5)), VisitPattern([2], 1, date(2024, 1, 3), date(2024, 6, 30))]
+    summer = [(date(2024, 7, 1), date(2024, 7, 21), 'mother'), (date(2024, 7, 22), date(2024, 8, 11), 'father')]
+    overrides = [OverridePeriod(f, t, VisitPattern(list(range(7)), 1, f, t), holder=h, vac_type='sommer')
+                 for f, t, h in summer]
+    overrides.append(RemoveOverride(date(2024, 12, 23), date(2024, 12, 31)))
+    return patterns, overrides
+
+
+def test_resolve_holders_matches_day_by_day():
+    patterns, overrides = _plan()
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    res = resolve_holders(patterns, overrides, start, end)
+    planned = set(apply_overrides([d for p in patterns for d in generate_standard_days(p, 2024)], overrides))
+    d = start
+    while d <= end:
+        if date(2024, 7, 1) <= d <= date(2024, 7, 21):
+            expected = 'mother'
+        elif date(2024, 7, 22) <= d <= date(2024, 8, 11):
+            expected = 'father'
+        else:
+            expected = 'father' if d in planned else 'mother'
+        assert holder_on(res, d) == expected, d
+        d += timedelta(days=1)
+    assert holder_on(res, date(2025, 1, 1)) is None
+    assert np.count_nonzero(res['vac']) == 42
+
+
+def test_custody_totals_and_text():
+    patterns, overrides = _plan()
+    totals = custody_summary(patterns, overrides, date(2024, 1, 1), date(2024, 12, 31))
+    assert totals['days'] == 366
+    assert sum(totals['by_holder'].values()) == 366
+    assert totals['by_vac_type'] == {'sommer': {'mother': 21, 'father': 21}}
+    assert sum(sum(m.values()) for m in totals['by_month'].values()) == 366
+    assert totals['by_month'][(2024, 7)] == {'mother': 21, 'father': 10}
+    assert list(totals['by_month'])[0] == (2024, 1) and len(totals['by_month']) == 12
+    text = custody_text(totals)
+    assert text.startswith('Betreuungstage:') and 'Ferien sommer: Mutter 21, Vater 21' in text
+    assert custody_totals(resolve_holders(patterns, overrides, date(2024, 2, 1), date(2024, 1, 1)))['days'] == 0
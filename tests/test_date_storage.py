@@ -0,0 +1,72 @@
+from datetime import date
+
+import numpy as np
+
+from kidscompass.data import Database
+from kidscompass.models import OverridePeriod, RemoveOverride, VisitPattern, VisitStatus
+
+
+def _fill(db):
+    pat = VisitPattern([4, 5], 2, date(2024, 1, 5), date(2025, 6, 30), label='WE')
+    db.save_pattern(pat)
+    db.save_override(OverridePeriod(date(2024, 7, 1), date(2024, 7, 14), pat, holder='father'))
+    db.save_override(RemoveOverride(date(2024, 12, 24), date(2024, 12, 26)))
+    for d, a, b in ((date(2024, 1, 5), True, False), (date(2024, 1, 6), False, False), (date(2024, 2, 2), True, True)):
+        db.save_status(VisitStatus(d, a, b))
+    return pat
+
+
+def test_convert_to_ordinal_and_back(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    pat = _fill(db)
+    before = (db.load_patterns(), db.load_overrides(), db.load_all_status())
+
+    assert db.convert_date_storage('ordinal')
+    assert db.date_storage == 'ordinal'
+    assert not db.convert_date_storage('ordinal')
+    raw = db.conn.execute("SELECT typeof(day) FROM visit_status").fetchone()[0]
+    assert raw == 'integer'
+    assert db.load_patterns() == before[0]
+    assert db.load_all_status() == before[2]
+    assert [(o.from_date, o.to_date) for o in db.load_overrides()] == [(o.from_date, o.to_date) for o in before[1]]
+
+    # Schreiben/Abfragen im Ordinal-Format
+    db.save_status(VisitStatus(date(2024, 3, 1), False, True))
+    hits = db.query_visits(date(2024, 1, 6), date(2024, 3, 1), [], {})
+    assert [h['day'] for h in hits] == [date(2024, 1, 6), date(2024, 2, 2), date(2024, 3, 1)]
+    res = db.split_pattern(pat.id, date(2025, 1, 3), [5], 1)
+    assert res['new_pattern_id']
+    db.close()
+
+    db = Database(str(tmp_path / 'kc.db'))
+    assert db.date_storage == 'ordinal'
+    assert date(2024, 3, 1) in db.load_all_status()
+    assert db.convert_date_storage('iso')
+    assert db.conn.execute("SELECT day FROM visit_status ORDER BY day").fetchone()[0] == '2024-01-05'
+    assert len(db.load_patterns()) == 2
+    db.close()
+
+
+def test_status_arrays_match_in_both_formats(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    _fill(db)
+    iso = db.load_status_arrays()
+    db.convert_date_storage('ordinal')
+    ordn = db.load_status_arrays()
+    for key in ('ordinal', 'a', 'b'):
+        assert np.array_equal(iso[key], ordn[key])
+    assert iso['ordinal'].tolist() == [d.toordinal() for d in (date(2024, 1, 5), date(2024, 1, 6), date(2024, 2, 2))]
+    assert iso['a'].tolist() == [True, False, True]
+    window = db.load_status_arrays(date(2024, 1, 6), date(2024, 1, 31))
+    assert window['ordinal'].tolist() == [date(2024, 1, 6).toordinal()]
+    db.close()
+
+
+def test_revert_across_conversion(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    mark = db.current_change_seq()
+    db.save_status(VisitStatus(date(2024, 5, 1), True, True))
+    db.convert_date_storage('ordinal')
+    db.revert_changes_since(mark)
+    assert db.load_all_status() == {}
+    db.close()
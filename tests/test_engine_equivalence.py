@@ -0,0 +1,198 @@
+"""
+Differenztest der Kalender-Engines gegen die Referenz generate_standard_days + apply_overrides.
+
+Zufällige Muster, Overrides und Zeiträume (reproduzierbar über den Seed, ohne Netz):
+jede Engine in ENGINES muss für jeden Fall exakt dieselben geplanten Tage liefern.
+Umfang über KC_EQUIV_CASES / KC_EQUIV_SEED; mit KC_EQUIV_TIMINGS=1 bzw. direkt als Skript
+(`PYTHONPATH=src python tests/test_engine_equivalence.py --cases 2000`) wird die Laufzeit je
+Engine ausgegeben.
+"""
+import copy
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from kidscompass.calendar_logic import (PlannedIndex, apply_overrides, first_occurrence, generate_standard_days,
+                                        is_planned, iter_planned_days)
+from kidscompass.custody import VISIT_HOLDER, resolve_holders
+from kidscompass.models import OverridePeriod, RemoveOverride, VisitPattern
+
+CASES = int(os.environ.get('KC_EQUIV_CASES', 150))
+SEED = int(os.environ.get('KC_EQUIV_SEED', 20241122))
+LO, HI = date(2019, 6, 1), date(2027, 6, 30)
+
+
+# Zufallsdaten
+def _rand_date(rng, lo=LO, hi=HI):
+    return lo + timedelta(days=rng.randrange((hi - lo).days + 1))
+
+
+def _rand_pattern(rng, start=None):
+    r = rng.random()
+    if r < 0.05:
+        weekdays = []
+    elif r < 0.15:
+        weekdays = [rng.randrange(7), rng.randrange(7)]  # ggf. doppelt
+    else:
+        weekdays = rng.sample(range(7), rng.randint(1, 4))
+    start = start or _rand_date(rng)
+    end = None
+    if rng.random() < 0.6:
+        end = start + timedelta(days=rng.randint(-20, 900))  # auch end_date < start_date
+    return VisitPattern(weekdays, rng.choice([1, 1, 1, 2, 2, 3, 4, 5]), start, end)
+
+
+def _rand_override(rng):
+    f = _rand_date(rng)
+    t = f + timedelta(days=rng.randint(0, 60))
+    if rng.random() < 0.4:
+        return RemoveOverride(f, t)
+    # Override-Muster: meist ab from_date, manchmal mit früherem/späterem Start
+    start = f if rng.random() < 0.7 else f + timedelta(days=rng.randint(-400, 30))
+    pat = _rand_pattern(rng, start)
+    if rng.random() < 0.5:
+        pat.weekdays, pat.interval_weeks = list(range(7)), 1
+    return OverridePeriod(f, t, pat)
+
+
+def make_case(rng):
+    patterns = [_rand_pattern(rng) for _ in range(rng.randint(0, 5))]
+    overrides = [_rand_override(rng) for _ in range(rng.randint(0, 6))]
+    start = _rand_date(rng)
+    end = min(HI, start + timedelta(days=rng.choice([0, 6, 40, 365, 800, 2000])))
+    return patterns, overrides, start, end
+
+
+def cases(n=CASES, seed=SEED):
+    rng = random.Random(seed)
+    return [make_case(rng) for _ in range(n)]
+
+
+# Engines: (patterns, overrides, start, end) -> sortierte geplante Tage in [start, end]
+def reference(patterns, overrides, start, end):
+    raw = [d for p in patterns for y in range(start.year, end.year + 1) for d in generate_standard_days(p, y)]
+    return sorted(d for d in apply_overrides(raw, overrides) if start <= d <= end)
+
+
+def engine_iter_planned_days(patterns, overrides, start, end):
+    return [d for d, _ in iter_planned_days(patterns, overrides, start, end)]
+
+
+def engine_is_planned(patterns, overrides, start, end):
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)
+            if is_planned(start + timedelta(days=i), patterns, overrides)]
+
+
+def engine_custody(patterns, overrides, start, end):
+    res = resolve_holders(patterns, overrides, start, end)
+    visit = res['holders'].index(VISIT_HOLDER)
+    return [date.fromordinal(int(o)) for o in res['ordinal'][res['holder'] == visit]]
+
+
+ENGINES = {
+    'iter_planned_days': engine_iter_planned_days,
+    'is_planned': engine_is_planned,
+    'custody.resolve_holders': engine_custody,
+}
+
+
+def _describe(case):
+    patterns, overrides, start, end = case
+    return f"window={start}..{end}\npatterns={patterns!r}\noverrides={overrides!r}"
+
+
+def run_engines(case_list, engines=None):
+    """Vergleicht alle Engines mit der Referenz; liefert {Name: Sekunden} inkl. 'reference'."""
+    engines = engines or ENGINES
+    timings = dict.fromkeys(['reference', *engines], 0.0)
+    for case in case_list:
+        t0 = time.perf_counter()
+        expected = reference(*case)
+        timings['reference'] += time.perf_counter() - t0
+        for name, fn in engines.items():
+            t0 = time.perf_counter()
+            got = fn(*case)
+            timings[name] += time.perf_counter() - t0
+            if got != expected:
+                missing = sorted(set(expected) - set(got))[:5]
+                extra = sorted(set(got) - set(expected))[:5]
+                raise AssertionError(f"{name} weicht ab (fehlt {missing}, zu viel {extra})\n{_describe(case)}")
+    return timings
+
+
+def format_timings(timings, n):
+    ref = timings['reference'] or 1e-9
+    lines = [f"{'Engine':26s} {'gesamt ms':>10s} {'je Fall µs':>11s} {'vs. Referenz':>12s}"]
+    for name, sec in timings.items():
+        lines.append(f"{name:26s} {sec * 1000:10.1f} {sec / max(n, 1) * 1e6:11.1f} {sec / ref:11.2f}x")
+    return '\n'.join(lines)
+
+
+@pytest.fixture(scope='module')
+def case_list():
+    return cases()
+
+
+def test_engines_match_reference(case_list, capsys):
+    timings = run_engines(case_list)
+    with capsys.disabled():
+        if os.environ.get('KC_EQUIV_TIMINGS'):
+            print('\n' + format_timings(timings, len(case_list)))
+
+
+def test_first_occurrence_matches_reference(case_list):
+    for patterns, overrides, start, end in case_list:
+        planned = reference(patterns, overrides, start, end)
+        index = PlannedIndex(planned)
+        for p in patterns:
+            # spätestens im Folgejahr des Musterstarts liegt ein Termin (vgl. first_occurrence)
+            last = max(end.year, start.year, p.start_date.year) + 1
+            own = [d for y in range(start.year, last + 1) for d in generate_standard_days(p, y) if d >= start]
+            assert first_occurrence(p, start) == (min(own) if own else None), _describe((patterns, overrides, start, end))
+            hit = min((d for d in own if d in set(planned)), default=None)
+            assert first_occurrence(p, start, index) == hit
+
+
+def test_ics_export_matches_reference(case_list):
+    pytest.importorskip('dateutil')
+    from test_ics_export import _expand
+    from kidscompass.ics_export import plan_to_ics
+    for case in copy.deepcopy(case_list[:60]):
+        patterns, overrides, start, end = case
+        for k, p in enumerate(patterns):
+            p.id = k + 1
+        for k, ov in enumerate(overrides):
+            ov.id = k + 1
+        text, _ = plan_to_ics(patterns, overrides, start, end)
+        assert sorted(_expand(text)) == reference(*case), _describe(case)
+
+
+def test_monthly_stats_matches_reference(tmp_path):
+    from kidscompass.data import Database
+    rng = random.Random(SEED + 1)
+    for i in range(8):
+        patterns, overrides, start, end = make_case(rng)
+        db = Database(str(tmp_path / f'kc{i}.db'))
+        for p in patterns:
+            db.save_pattern(p)
+        for ov in overrides:
+            db.save_override(ov)
+        rows = db.monthly_stats(start, end)
+        planned = reference(db.load_patterns(), db.load_overrides(), start, end)
+        assert sum(r['planned'] for r in rows) == len(planned), _describe((patterns, overrides, start, end))
+        db.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    ap = argparse.ArgumentParser(description='Kalender-Engines gegen die Referenz prüfen und messen')
+    ap.add_argument('--cases', type=int, default=1000)
+    ap.add_argument('--seed', type=int, default=SEED)
+    args = ap.parse_args()
+    n = args.cases
+    print(format_timings(run_engines(cases(n, args.seed)), n))
+    sys.exit(0)
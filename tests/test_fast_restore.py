@@ -0,0 +1,68 @@
+import gzip
+from datetime import date
+
+from kidscompass.data import Database, detect_backup_format, iter_sql_statements
+from kidscompass.models import VisitPattern, VisitStatus
+
+
+def _seed(path):
+    db = Database(str(path))
+    pat = VisitPattern([1, 2], interval_weeks=1, start_date=date(2025, 1, 1))
+    pat.label = 'Di+Mi;\nmit Umbruch'
+    db.save_pattern(pat)
+    db.save_status(VisitStatus(date(2025, 1, 7), False, True))
+    return db
+
+
+def test_iter_sql_statements_keeps_multiline_literals():
+    lines = ["CREATE TABLE t (\n", "  x TEXT\n", ");\n", "INSERT INTO t VALUES('a;\n", "b');\n"]
+    stmts = list(iter_sql_statements(lines))
+    assert len(stmts) == 2
+    assert stmts[1] == "INSERT INTO t VALUES('a;\nb');\n"
+
+
+def test_streamed_sql_restore_replaces_db(tmp_path):
+    src = _seed(tmp_path / 'src.db')
+    dump = tmp_path / 'dump.sql'
+    src.export_to_sql(str(dump))
+    src.close()
+    assert detect_backup_format(str(dump)) == 'sql'
+
+    target = tmp_path / 'target.db'
+    db = Database(str(target))
+    db.save_status(VisitStatus(date(2020, 1, 1), True, True))
+    db.atomic_import_from_sql(str(dump))
+
+    assert [p.label for p in db.load_patterns()] == ['Di+Mi;\nmit Umbruch']
+    assert list(db.load_all_status()) == [date(2025, 1, 7)]
+    # alte DB bleibt als Snapshot im Backup-Speicher erhalten, keine temporären Dateien
+    snaps = db.backup_store().list_snapshots()
+    assert [e['reason'] for e in snaps] == ['before_restore']
+    old = Database(db.backup_store().path_for(snaps[0]))
+    assert date(2020, 1, 1) in old.load_all_status()
+    old.close()
+    assert not list(tmp_path.glob('.tmp_restore_*'))
+    db.close()
+
+
+def test_snapshot_restore_plain_and_gzip(tmp_path):
+    src = _seed(tmp_path / 'src.db')
+    for name, comp, fmt in (('snap.db', None, 'sqlite'), ('snap.db.gz', 'gzip', 'gzip')):
+        fn = src.backup_to_file(str(tmp_path / name), compression=comp)
+        assert detect_backup_format(fn) == fmt
+        db = Database(str(tmp_path / f'target_{fmt}.db'))
+        db.atomic_import_from_sql(fn)
+        assert len(db.load_patterns()) == 1
+        assert db.load_all_status()[date(2025, 1, 7)].present_child_a is False
+        db.close()
+    src.close()
+
+
+def test_snapshot_restore_into_memory_db(tmp_path):
+    src = _seed(tmp_path / 'src.db')
+    fn = src.backup_to_file(str(tmp_path / 'snap.db.gz'), compression='gzip')
+    src.close()
+    db = Database(':memory:')
+    db.atomic_import_from_sql(fn)
+    assert len(db.load_patterns()) == 1
+    db.close()
@@ -0,0 +1,70 @@
+from datetime import date
+
+import numpy as np
+
+from kidscompass import statistics
+from kidscompass.charts import HEATMAP_LABELS, render_year_heatmap
+from kidscompass.data import Database
+from kidscompass.models import VisitPattern, VisitStatus
+from kidscompass.statistics import (HEATMAP_ALL_ABSENT, HEATMAP_NOT_PLANNED, HEATMAP_PARTLY_ABSENT,
+                                    HEATMAP_PLANNED, year_heatmap_grid, year_heatmap_grids)
+
+
+def _cell(grid, d):
+    off = (d - date(d.year, 1, 1)).days + date(d.year, 1, 1).weekday()
+    return grid[off % 7, off // 7]
+
+
+def test_year_grid_states():
+    planned = np.array([date(2024, 1, 6).toordinal(), date(2024, 1, 7).toordinal(), date(2024, 12, 31).toordinal()])
+    status = np.array([date(2024, 1, 7).toordinal(), date(2024, 12, 31).toordinal(), date(2024, 3, 1).toordinal()])
+    masks = np.array([1, 3, 3])
+    grid = year_heatmap_grid(2024, planned, status, masks)
+    assert grid.shape == (7, 54)
+    assert np.count_nonzero(~np.isnan(grid)) == 366
+    assert _cell(grid, date(2024, 1, 6)) == HEATMAP_PLANNED
+    assert _cell(grid, date(2024, 1, 7)) == HEATMAP_PARTLY_ABSENT
+    assert _cell(grid, date(2024, 12, 31)) == HEATMAP_ALL_ABSENT
+    # Status an nicht geplantem Tag zählt nicht
+    assert _cell(grid, date(2024, 3, 1)) == HEATMAP_NOT_PLANNED
+    # 1. Januar 2024 ist ein Montag: erste Spalte, erste Zeile
+    assert not np.isnan(grid[0, 0])
+
+
+def test_grids_cached_per_revision_and_rendered(tmp_path, monkeypatch):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_pattern(VisitPattern([5, 6], 1, date(2015, 1, 3)))
+    years = list(range(2015, 2026))
+    grids = year_heatmap_grids(db, years)
+    assert sorted(grids) == years
+    assert all(np.nansum(g == HEATMAP_PLANNED) > 100 for g in grids.values())
+
+    calls = []
+    monkeypatch.setattr(statistics, 'year_heatmap_grid', lambda *a, **k: calls.append(a[0]) or np.zeros((7, 54)))
+    assert year_heatmap_grids(db, years)[2020] is grids[2020]
+    assert calls == []
+    db.save_status(VisitStatus(date(2020, 1, 4), False, False))
+    year_heatmap_grids(db, [2020])
+    assert calls == [2020]
+    monkeypatch.undo()
+
+    png = render_year_heatmap(grids)
+    assert png.startswith(b'\x89PNG')
+    db.close()
+
+
+def test_grids_use_children_table(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_pattern(VisitPattern([5], 1, date(2024, 1, 6)))
+    db.save_status(VisitStatus(date(2024, 1, 6), absent_mask=0b011))
+    assert year_heatmap_grids(db, [2024])[2024][5, 0] == HEATMAP_ALL_ABSENT
+
+    # drittes Kind: zwei fehlende Kinder sind nicht mehr "alle"
+    db.save_child('Drittes Kind')
+    assert len(db.load_children()) == 3
+    grid = year_heatmap_grids(db, [2024])[2024]
+    assert grid[5, 0] == HEATMAP_PARTLY_ABSENT
+    assert HEATMAP_LABELS[HEATMAP_PARTLY_ABSENT] == 'teilweise abwesend'
+    db.save_status(VisitStatus(date(2024, 1, 6), absent_mask=0b111))
+    assert year_heatmap_grids(db, [2024])[2024][5, 0] == HEATMAP_ALL_ABSENT
+    db.close()
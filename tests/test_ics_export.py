@@ -0,0 +1,83 @@
+import datetime as _dt
+from datetime import date, timedelta
+
+from dateutil.rrule import rrulestr
+
+from kidscompass.calendar_logic import apply_overrides, generate_standard_days
+from kidscompass.data import Database
+from kidscompass.ics_export import plan_to_ics, write_plan_ics
+from kidscompass.models import OverridePeriod, RemoveOverride, VisitPattern
+
+NOW = _dt.datetime(2025, 1, 1, 12, 0, tzinfo=_dt.timezone.utc)
+
+
+def _d(v):
+    return date(int(v[0:4]), int(v[4:6]), int(v[6:8]))
+
+
+def _expand(text):
+    """Minimaler Kalender-Client: Tage aller VEVENTs (RRULE/EXDATE/mehrtägig)."""
+    unfolded = text.replace('\r\n ', '')
+    days = []
+    for block in unfolded.split('BEGIN:VEVENT')[1:]:
+        props = {}
+        for line in block.split('\r\n'):
+            if ':' in line:
+                k, v = line.split(':', 1)
+                props[k.split(';')[0]] = v
+        start, stop = _d(props['DTSTART']), _d(props['DTEND'])
+        if 'RRULE' in props:
+            rule = rrulestr(props['RRULE'], dtstart=_dt.datetime.combine(start, _dt.time()))
+            ex = {_d(v) for v in props.get('EXDATE', '').split(',') if v}
+            days += [x.date() for x in rule if x.date() not in ex]
+        else:
+            days += [start + timedelta(days=i) for i in range((stop - start).days)]
+    return days
+
+
+def _planned(patterns, overrides, start, end):
+    raw = [d for p in patterns for y in range(start.year, end.year + 1) for d in generate_standard_days(p, y)]
+    return sorted(d for d in apply_overrides(raw, overrides) if start <= d <= end)
+
+
+def _plan(db):
+    db.save_pattern(VisitPattern([4, 5, 6, 0], 2, date(2022, 11, 25)))
+    db.save_pattern(VisitPattern([2], 1, date(2022, 1, 5), date(2024, 6, 30)))
+    db.save_pattern(VisitPattern([1, 2], 1, date(2024, 1, 2)))  # überschneidet sich mit Mittwoch
+    for f, t, h in [(date(2024, 7, 1), date(2024, 7, 21), 'mother'), (date(2024, 7, 22), date(2024, 8, 11), 'father')]:
+        db.save_override(OverridePeriod(f, t, VisitPattern(list(range(7)), 1, f, t), holder=h, vac_type='sommer'))
+    db.save_override(RemoveOverride(date(2023, 12, 22), date(2024, 1, 7)))
+    hol = VisitPattern([0, 3], 3, date(2025, 3, 3), date(2025, 5, 30))
+    db.save_pattern(hol)
+    db.save_override(OverridePeriod(date(2025, 3, 3), date(2025, 5, 30), hol))
+    return db.load_patterns(), db.load_overrides()
+
+
+def test_ics_expands_to_planned_days(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    patterns, overrides = _plan(db)
+    start, end = date(2022, 1, 1), date(2026, 12, 31)
+    text, stats = plan_to_ics(patterns, overrides, start, end, now=NOW)
+    days = _expand(text)
+    assert sorted(days) == _planned(patterns, overrides, start, end)
+    assert len(days) == len(set(days))
+    # komprimiert: wenige Termine statt eines je Tag
+    assert stats['events'] < 30 < stats['days']
+    assert all(len(l.encode('utf-8')) <= 75 for l in text.split('\r\n'))
+    assert 'SUMMARY:Umgang – Mutter – sommer' in text
+
+    # Zeitraum mitten im Jahr: Raster bleibt am Jahresanfang ausgerichtet
+    start, end = date(2023, 3, 15), date(2024, 9, 10)
+    text, _ = plan_to_ics(patterns, overrides, start, end, now=NOW)
+    assert sorted(_expand(text)) == _planned(patterns, overrides, start, end)
+    db.close()
+
+
+def test_write_plan_ics(tmp_path):
+    pats = [VisitPattern([5, 6], 2, date(2024, 1, 6))]
+    out = tmp_path / 'plan.ics'
+    stats = write_plan_ics(str(out), pats, [], date(2024, 1, 1), date(2025, 12, 31), now=NOW)
+    raw = out.read_bytes()
+    assert raw.startswith(b'BEGIN:VCALENDAR\r\n') and raw.endswith(b'END:VCALENDAR\r\n')
+    assert stats['events'] == 2 and stats['single'] == 0
+    assert raw.count(b'RRULE:FREQ=WEEKLY;UNTIL=') == 2
@@ -0,0 +1,83 @@
+import json
+from datetime import date
+
+from kidscompass.calendar_logic import apply_overrides, first_occurrence, generate_standard_days
+from kidscompass.data import Database
+from kidscompass.instrumentation import RECORDER, Recorder
+from kidscompass.models import VisitPattern, VisitStatus
+
+
+def test_spans_counters_and_exports(tmp_path):
+    rec = Recorder()
+    with rec.span('outer', size=3) as info:
+        with rec.span('inner'):
+            pass
+        info['rows'] = 7
+    rec.incr('hits', 2)
+
+    @rec.timed('fast', trace=False)
+    def f(x):
+        return x + 1
+
+    assert [f(i) for i in range(5)] == [1, 2, 3, 4, 5]
+    summary = rec.summary()
+    assert summary['counters'] == {'hits': 2}
+    assert summary['histograms']['fast']['count'] == 5
+    assert [s['name'] for s in rec.spans()] == ['inner', 'outer']
+    assert rec.spans()[1]['args'] == {'size': 3, 'rows': 7}
+
+    trace = tmp_path / 'trace.json'
+    rec.export_chrome_trace(str(trace))
+    events = json.loads(trace.read_text())['traceEvents']
+    outer = next(e for e in events if e['name'] == 'outer')
+    assert outer['ph'] == 'X' and outer['dur'] >= 0
+    rec.export_json(str(tmp_path / 'diag.json'))
+    assert 'histograms' in json.loads((tmp_path / 'diag.json').read_text())
+
+
+def test_disabled_recorder_records_nothing():
+    rec = Recorder(enabled=False)
+    with rec.span('x'):
+        pass
+    rec.incr('y')
+    assert rec.summary() == {'counters': {}, 'histograms': {}}
+
+
+def test_hot_paths_are_instrumented(tmp_path):
+    RECORDER.reset()
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_status(VisitStatus(date(2025, 1, 6), False, True))
+    db.load_all_status()
+    pat = VisitPattern([0], 1, date(2025, 1, 1))
+    apply_overrides(generate_standard_days(pat, 2025), [])
+    db.close()
+    hist = RECORDER.summary()['histograms']
+    for name in ('db.save_status', 'db.load_all_status', 'calendar.apply_overrides'):
+        assert hist[name]['count'] >= 1, name
+    # innerste Funktionen bleiben ohne Wrapper (Aufrufe je Muster und Tag)
+    assert 'calendar.generate_standard_days' not in hist
+    assert not hasattr(generate_standard_days, '__wrapped__') and not hasattr(first_occurrence, '__wrapped__')
+
+
+def test_counters_for_rows_months_and_workers(tmp_path):
+    from kidscompass.ui import BackupWorker
+    RECORDER.reset()
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_pattern(VisitPattern([0], 1, date(2025, 1, 6)))
+    for d in (6, 13):
+        db.save_status(VisitStatus(date(2025, 1, d), False, True))
+    assert len(db.query_visits(date(2025, 1, 1), date(2025, 1, 31), [], {})) == 2
+    db.load_status_arrays()
+    db.monthly_stats(date(2025, 1, 15), date(2025, 4, 30))  # Januar angeschnitten, Feb.-Apr. neu
+    db.monthly_stats(date(2025, 2, 1), date(2025, 4, 30))
+    db.close()
+
+    BackupWorker(str(tmp_path / 'kc.db'), str(tmp_path / 'b.sql')).run()
+    (tmp_path / 'not_a_dir').write_text('')
+    BackupWorker(str(tmp_path / 'kc.db'), str(tmp_path / 'not_a_dir' / 'b.sql')).run()
+    counters = RECORDER.summary()['counters']
+    assert counters['db.query_visits.rows'] == 2 and counters['db.load_status_arrays.rows'] == 2
+    assert counters['db.monthly_stats.months_recomputed'] == 3
+    assert counters['db.monthly_stats.months_cached'] == 3
+    assert counters['db.monthly_stats.months_partial'] == 1
+    assert counters['worker.backup.runs'] == 2 and counters['worker.backup.failures'] == 1
@@ -0,0 +1,76 @@
+import sqlite3
+from datetime import date
+
+from kidscompass.data import Database
+from kidscompass.migrations import SCHEMA_VERSION, migrate, schema_version
+from kidscompass.models import OverridePeriod, VisitPattern, VisitStatus
+
+
+def _indexes(conn):
+    return {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'")}
+
+
+def test_fresh_db_is_at_latest_version(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    assert schema_version(db.conn) == SCHEMA_VERSION
+    assert {'idx_visit_status_day_presence', 'idx_overrides_range',
+            'idx_overrides_pattern', 'idx_patterns_key'} <= _indexes(db.conn)
+    db.close()
+
+
+def test_open_current_db_is_single_version_check(tmp_path):
+    path = str(tmp_path / 'kc.db')
+    Database(path).close()
+    conn = sqlite3.connect(path)
+    stmts = []
+    conn.set_trace_callback(stmts.append)
+    migrate(conn)
+    assert stmts == ['PRAGMA user_version']
+    conn.close()
+
+
+def test_legacy_db_is_upgraded(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE patterns (id INTEGER PRIMARY KEY AUTOINCREMENT, weekdays TEXT NOT NULL,
+                               interval_weeks INTEGER NOT NULL, start_date TEXT NOT NULL);
+        CREATE TABLE overrides (id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL,
+                                from_date TEXT NOT NULL, to_date TEXT NOT NULL, pattern_id INTEGER);
+        INSERT INTO patterns (weekdays, interval_weeks, start_date) VALUES ('4,5', 2, '2024-01-05');
+    """)
+    conn.close()
+
+    db = Database(path)
+    assert schema_version(db.conn) == SCHEMA_VERSION
+    pats = db.load_patterns()
+    assert pats[0].weekdays == [4, 5] and pats[0].end_date is None
+    db.save_override(OverridePeriod(date(2024, 7, 1), date(2024, 7, 14), pats[0], holder='mother'))
+    assert db.load_overrides()[0].holder == 'mother'
+    db.close()
+
+
+def test_sql_dump_import_re_migrates(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_pattern(VisitPattern([0], 1, date(2025, 1, 6)))
+    db.save_status(VisitStatus(date(2025, 1, 6), True, False))
+    dump = str(tmp_path / 'dump.sql')
+    db.export_to_sql(dump)
+    db.conn.execute("DROP INDEX idx_overrides_range")
+    db.import_from_sql(dump)
+    assert schema_version(db.conn) == SCHEMA_VERSION
+    assert 'idx_overrides_range' in _indexes(db.conn)
+    assert len(db.load_patterns()) == 1
+    db.close()
+
+
+def test_indexes_are_used(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    plan = db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM overrides WHERE pattern_id=?", (1,)).fetchall()
+    assert any('idx_overrides_pattern' in r[3] for r in plan)
+    plan = db.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT day, absent_mask FROM visit_status "
+        "WHERE day BETWEEN ? AND ?", ('2025-01-01', '2025-12-31')).fetchall()
+    assert any('COVERING INDEX' in r[3] for r in plan)
+    db.close()
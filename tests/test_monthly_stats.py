@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+
+from kidscompass.calendar_logic import apply_overrides, generate_standard_days, is_planned
+from kidscompass.data import Database
+from kidscompass.models import OverridePeriod, RemoveOverride, VisitPattern, VisitStatus
+from kidscompass.statistics import sum_monthly_stats
+
+
+def _setup(db):
+    weekend = VisitPattern([4, 5], 2, date(2023, 11, 3))
+    db.save_pattern(weekend)
+    wed = VisitPattern([2], 1, date(2024, 1, 3), date(2024, 9, 30))
+    db.save_pattern(wed)
+    holiday = VisitPattern([0, 1, 2, 3, 4], 1, date(2024, 7, 1), date(2024, 7, 19))
+    db.save_pattern(holiday)
+    db.save_override(OverridePeriod(date(2024, 7, 1), date(2024, 7, 19), holiday))
+    db.save_override(RemoveOverride(date(2024, 12, 20), date(2025, 1, 6)))
+    for i in range(0, 400, 3):
+        d = date(2024, 1, 1) + timedelta(days=i)
+        db.save_status(VisitStatus(d, i % 2 == 0, i % 5 != 0))
+
+
+def _brute(db, start, end):
+    pats, ovs = db.load_patterns(), db.load_overrides()
+    raw = [d for p in pats for y in range(start.year, end.year + 1) for d in generate_standard_days(p, y)]
+    planned = [d for d in apply_overrides(raw, ovs) if start <= d <= end]
+    status = db.load_all_status()
+    out = {'planned': len(planned), 'present': {0: 0, 1: 0}, 'all_present': 0, 'all_absent': 0}
+    for d in planned:
+        vs = status.get(d, VisitStatus(d))
+        out['present'][0] += vs.present_child_a
+        out['present'][1] += vs.present_child_b
+        out['all_present'] += vs.present_child_a and vs.present_child_b
+        out['all_absent'] += not vs.present_child_a and not vs.present_child_b
+    return out, planned
+
+
+def _totals(rows, weekdays=None):
+    s = sum_monthly_stats(rows, weekdays)
+    return {k: s[k] for k in ('planned', 'present', 'all_present', 'all_absent')}
+
+
+def test_monthly_stats_match_day_level_counts(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    _setup(db)
+    for start, end in [(date(2024, 1, 1), date(2024, 12, 31)),
+                       (date(2024, 2, 14), date(2025, 3, 2)),
+                       (date(2024, 7, 5), date(2024, 7, 20)),
+                       (date(2023, 6, 1), date(2026, 1, 31))]:
+        expected, planned = _brute(db, start, end)
+        rows = db.monthly_stats(start, end)
+        assert _totals(rows) == expected, (start, end)
+        assert all(is_planned(d, db.load_patterns(), db.load_overrides()) for d in planned)
+    # nur volle Monate werden gespeichert, je Monat und Wochentag eine Zeile mit Maske 0
+    n = db.conn.execute("SELECT COUNT(*) FROM monthly_stats WHERE absent_mask = 0").fetchone()[0]
+    assert n % 7 == 0
+    assert db.conn.execute("SELECT COUNT(*) FROM monthly_stats WHERE year=2024 AND month=7 "
+                           "AND absent_mask = 0").fetchone()[0] == 7
+    db.close()
+
+
+def test_changes_invalidate_only_affected_months(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    _setup(db)
+    start, end = date(2024, 1, 1), date(2025, 12, 31)
+    db.monthly_stats(start, end)
+    # Markierung in einem unbeteiligten Monat bleibt stehen, solange er nicht betroffen ist
+    db.conn.execute("UPDATE monthly_stats SET days = days + 100 WHERE year=2024 AND month=2 AND weekday=0 AND absent_mask=0")
+    db.conn.commit()
+
+    db.save_status(VisitStatus(date(2024, 5, 10), False, False))
+    rows = db.monthly_stats(start, end)
+    feb = [r for r in rows if (r['year'], r['month'], r['weekday']) == (2024, 2, 0)][0]
+    assert feb['planned'] >= 100
+    db.conn.execute("UPDATE monthly_stats SET days = days - 100 WHERE year=2024 AND month=2 AND weekday=0 AND absent_mask=0")
+    db.conn.commit()
+    assert _totals(db.monthly_stats(start, end)) == _brute(db, start, end)[0]
+
+    # Musteränderung ohne Enddatum betrifft alle Monate ab Beginn
+    pat = db.load_patterns()[0]
+    pat.interval_weeks = 1
+    db.save_pattern(pat)
+    assert _totals(db.monthly_stats(start, end)) == _brute(db, start, end)[0]
+
+    # Override löschen
+    db.delete_override(db.load_overrides()[0].id)
+    assert _totals(db.monthly_stats(start, end)) == _brute(db, start, end)[0]
+    db.close()
+
+
+def test_import_rebuilds_aggregates(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    _setup(db)
+    start, end = date(2024, 1, 1), date(2024, 12, 31)
+    before = _totals(db.monthly_stats(start, end))
+    dump = str(tmp_path / 'dump.sql')
+    db.export_to_sql(dump)
+    db.save_status(VisitStatus(date(2024, 3, 1), False, True))
+    db.monthly_stats(start, end)
+    db.import_from_sql(dump)
+    assert _totals(db.monthly_stats(start, end)) == before == _brute(db, start, end)[0]
+    db.close()
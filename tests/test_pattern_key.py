@@ -0,0 +1,67 @@
+from datetime import date
+
+from kidscompass.data import Database
+from kidscompass.models import OverridePeriod, VisitPattern
+
+
+def _key(db, pid):
+    return db.conn.execute("SELECT pattern_key FROM patterns WHERE id=?", (pid,)).fetchone()[0]
+
+
+def test_pattern_key_is_normalized_and_maintained(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    cur = db.conn.cursor()
+    cur.execute("INSERT INTO patterns (weekdays, interval_weeks, start_date) VALUES ('5,4', 2, '2025-01-03')")
+    a = cur.lastrowid
+    cur.execute("INSERT INTO patterns (weekdays, interval_weeks, start_date) VALUES ('4,5', 2, '2025-01-03')")
+    b = cur.lastrowid
+    db.conn.commit()
+    assert _key(db, a) == _key(db, b) == '4,5|2|2025-01-03|'
+    assert db.find_duplicate_patterns() == [[a, b]]
+
+    seq = db.current_change_seq()
+    db.conn.execute("UPDATE patterns SET end_date='2025-06-30' WHERE id=?", (b,))
+    db.conn.commit()
+    assert _key(db, b) == '4,5|2|2025-01-03|2025-06-30'
+    assert db.find_duplicate_patterns() == []
+    # Schlüsselpflege erzeugt keine eigenen Journal-Einträge
+    assert [c['op'] for c in db.changes_since(seq)] == ['update']
+    db.close()
+
+
+def test_bulk_dedup_is_set_based(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    keep = VisitPattern([0, 2], 1, date(2025, 1, 6))
+    db.save_pattern(keep)
+    rows = [('2,0', 1, '2025-01-06', None)] * 200 + [('3', 2, '2025-01-09', '2025-12-31')] * 50
+    db.conn.executemany("INSERT INTO patterns (weekdays, interval_weeks, start_date, end_date) VALUES (?,?,?,?)", rows)
+    db.conn.commit()
+    dup_ids = [r[0] for r in db.conn.execute("SELECT id FROM patterns WHERE weekdays='2,0' ORDER BY id DESC LIMIT 3")]
+    for pid in dup_ids:
+        db.conn.execute("INSERT INTO overrides (type, from_date, to_date, pattern_id) VALUES ('add', '2025-03-01', '2025-03-05', ?)", (pid,))
+    db.conn.commit()
+
+    stmts = []
+    db.conn.set_trace_callback(stmts.append)
+    removed, updated = db.remove_duplicate_patterns()[:2]
+    db.conn.set_trace_callback(None)
+    assert removed == 249 and updated == 3
+    assert not any(s.startswith('DELETE FROM patterns WHERE id=') for s in stmts)
+    assert {r[0] for r in db.conn.execute("SELECT pattern_id FROM overrides")} == {keep.id}
+    assert db.conn.execute("SELECT COUNT(*) FROM patterns").fetchone()[0] == 2
+    assert db.find_duplicate_patterns() == []
+    db.close()
+
+
+def test_pattern_key_follows_date_storage(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    pat = VisitPattern([6], 1, date(2025, 2, 2))
+    db.save_pattern(pat)
+    db.save_override(OverridePeriod(date(2025, 2, 1), date(2025, 2, 9), pat))
+    db.convert_date_storage('ordinal')
+    assert _key(db, pat.id) == f"6|1|{date(2025, 2, 2).toordinal()}|"
+    db.conn.execute("INSERT INTO patterns (weekdays, interval_weeks, start_date) VALUES ('6', 1, ?)",
+                    (date(2025, 2, 2).toordinal(),))
+    db.conn.commit()
+    assert len(db.find_duplicate_patterns()) == 1
+    db.close()
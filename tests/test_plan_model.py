@@ -0,0 +1,64 @@
+from datetime import date
+
+from PySide6.QtCore import Qt
+
+from kidscompass.data import Database
+from kidscompass.models import OverridePeriod, RemoveOverride, VisitPattern
+from kidscompass.plan_model import PlanFilterProxyModel, PlanListModel
+
+
+def _record(model):
+    events = []
+    model.rowsInserted.connect(lambda _p, a, b: events.append(('insert', a, b)))
+    model.rowsRemoved.connect(lambda _p, a, b: events.append(('remove', a, b)))
+    model.dataChanged.connect(lambda a, b, *_: events.append(('changed', a.row(), b.row())))
+    model.modelReset.connect(lambda: events.append(('reset',)))
+    return events
+
+
+def test_reload_emits_incremental_changes(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    for wd in range(3):
+        db.save_pattern(VisitPattern([wd], 1, date(2024, 1, 1)))
+    db.save_override(RemoveOverride(date(2024, 7, 1), date(2024, 7, 14)))
+    model = PlanListModel(db)
+    patterns, overrides = model.reload()
+    assert model.rowCount() == 4 and len(patterns) == 3 and len(overrides) == 1
+    events = _record(model)
+
+    # unverändert: keine Signale
+    model.reload()
+    assert events == []
+
+    # Muster 2 löschen, ein Override anhängen, Muster 1 ändern
+    pats = db.load_patterns()
+    db.delete_pattern(pats[1].id)
+    db.save_override(RemoveOverride(date(2024, 12, 23), date(2025, 1, 3)))
+    pats[0].interval_weeks = 2
+    db.save_pattern(pats[0])
+    model.reload()
+    assert ('remove', 1, 1) in events and ('insert', 3, 3) in events
+    assert ('changed', 0, 0) in events and ('reset',) not in events
+    assert model.rowCount() == 4
+    assert 'Alle 2 Wochen' in model.data(model.index(0), Qt.DisplayRole)
+    assert isinstance(model.data(model.index(3), Qt.UserRole), RemoveOverride)
+    db.close()
+
+
+def test_proxy_search_filters_rows(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_pattern(VisitPattern([5, 6], 2, date(2024, 1, 6), label='Wochenende'))
+    db.save_pattern(VisitPattern([2], 1, date(2024, 1, 3)))
+    holiday = VisitPattern(list(range(7)), 1, date(2024, 7, 1), date(2024, 7, 14))
+    db.save_pattern(holiday)
+    db.save_override(OverridePeriod(date(2024, 7, 1), date(2024, 7, 14), holiday))
+    model = PlanListModel(db)
+    model.reload()
+    proxy = PlanFilterProxyModel()
+    proxy.setSourceModel(model)
+    proxy.set_search('wochenENDE')
+    assert proxy.rowCount() == 1
+    assert proxy.index(0, 0).data(Qt.UserRole).label == 'Wochenende'
+    proxy.set_search('')
+    assert proxy.rowCount() == model.rowCount()
+    db.close()
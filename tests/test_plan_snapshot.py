@@ -0,0 +1,90 @@
+import dataclasses
+from datetime import date
+
+import pytest
+
+from kidscompass.models import OverridePeriod, PlanSnapshot, RemoveOverride, VisitPattern, VisitStatus
+from kidscompass.ui import ExportWorker
+
+
+def _plan():
+    weekend = VisitPattern([5, 6], 2, date(2024, 1, 6))
+    holiday = VisitPattern(list(range(7)), 1, date(2024, 7, 1), date(2024, 7, 14))
+    overrides = [OverridePeriod(date(2024, 7, 1), date(2024, 7, 14), holiday),
+                 RemoveOverride(date(2024, 12, 23), date(2025, 1, 3))]
+    status = {date(2024, 1, 6): VisitStatus(date(2024, 1, 6), absent_mask=1)}
+    return [weekend, holiday], overrides, status
+
+
+def test_snapshot_is_frozen_and_detached():
+    patterns, overrides, status = _plan()
+    snap = PlanSnapshot.capture(patterns, overrides, status, revision=3)
+    assert snap.revision == 3
+    assert isinstance(snap.patterns, tuple) and isinstance(snap.overrides, tuple)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        snap.revision = 4
+    with pytest.raises(TypeError):
+        snap.visit_status[date(2024, 1, 7)] = VisitStatus(date(2024, 1, 7))
+
+    # Änderungen am Original (GUI-Thread) erreichen den Snapshot nicht
+    patterns[0].interval_weeks = 1
+    patterns.append(VisitPattern([2], 1, date(2024, 1, 3)))
+    overrides.pop()
+    status.pop(date(2024, 1, 6))
+    assert snap.patterns[0].interval_weeks == 2 and len(snap.patterns) == 2
+    assert len(snap.overrides) == 2
+    assert snap.visit_status[date(2024, 1, 6)].absent_mask == 1
+    # gemeinsam genutzte Muster bleiben auch in der Kopie ein Objekt
+    assert snap.overrides[0].pattern is snap.patterns[1]
+
+
+def test_export_worker_reads_snapshot(qapp, tmp_path):
+    patterns, overrides, status = _plan()
+    snap = PlanSnapshot.capture(patterns, overrides, status, revision=1)
+    worker = ExportWorker(None, date(2024, 1, 1), date(2024, 1, 31), snapshot=snap,
+                          out_fn=str(tmp_path / 'r.pdf'))
+    assert worker.patterns is snap.patterns and worker.visit_status is snap.visit_status
+
+    # ohne Snapshot kopiert der Worker die übergebenen Daten selbst
+    worker = ExportWorker(None, date(2024, 1, 1), date(2024, 1, 31), patterns, overrides, status)
+    status.clear()
+    assert date(2024, 1, 6) in worker.visit_status
+    assert worker.snapshot.revision == 0
+
+
+def test_with_status_shares_plan_tuples():
+    patterns, overrides, status = _plan()
+    snap = PlanSnapshot.capture(patterns, overrides, status, revision=1)
+    status[date(2024, 1, 13)] = VisitStatus(date(2024, 1, 13), absent_mask=2)
+    nxt = snap.with_status(status, revision=2)
+    assert nxt.revision == 2 and nxt.patterns is snap.patterns and nxt.overrides is snap.overrides
+    assert date(2024, 1, 13) in nxt.visit_status and date(2024, 1, 13) not in snap.visit_status
+
+
+def test_main_window_builds_snapshots_lazily(qtbot, tmp_path):
+    from PySide6.QtCore import QDate
+    from kidscompass.data import Database
+    from kidscompass.ui import MainWindow
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_pattern(VisitPattern([2], 1, date(2024, 3, 6)))
+    w = MainWindow(db)
+    qtbot.addWidget(w)
+    first = w.plan_snapshot()
+    assert w.plan_snapshot() is first and len(first.patterns) == 1
+
+    # Statusklick: nur markiert, beim Lesen Muster/Overrides des Vorgängers übernommen
+    w.tab2.calendar.setSelectedDate(QDate(2024, 3, 6))
+    w.tab2.child_checks[0][1].setChecked(True)
+    w.on_calendar_click()
+    assert w._snapshot is first
+    second = w.plan_snapshot()
+    assert second.revision == first.revision + 1 and second.patterns is first.patterns
+    assert second.visit_status[date(2024, 3, 6)].absent_mask == 1
+    assert date(2024, 3, 6) not in first.visit_status
+
+    # Planänderung: Muster werden neu kopiert
+    db.save_pattern(VisitPattern([4], 1, date(2024, 3, 8)))
+    w.load_config()
+    third = w.plan_snapshot()
+    assert third.patterns is not second.patterns and len(third.patterns) == 2
+    w.db.close()
@@ -0,0 +1,67 @@
+import json
+
+from PySide6.QtCore import QObject, Signal
+
+from kidscompass.profiling import Profiler, profile_dir_for, profiling_requested
+
+
+class Target:
+    def work(self, n):
+        return sum(range(n))
+
+    def outer(self):
+        return self.work(10)
+
+
+class Emitter(QObject):
+    changed = Signal(int)
+
+
+class SlotTarget(QObject):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def on_changed(self):
+        self.calls += 1
+
+
+def test_profiling_requested():
+    assert profiling_requested(['kidscompass', '--profile'], {})
+    assert profiling_requested([], {'KIDSCOMPASS_PROFILE': '1'})
+    assert not profiling_requested([], {'KIDSCOMPASS_PROFILE': '0'})
+    assert not profiling_requested([], {})
+
+
+def test_profiler_wraps_methods_and_writes_artifacts(tmp_path):
+    out = profile_dir_for(str(tmp_path / 'kc.db'))
+    prof = Profiler(out).install([(__name__, 'Target', 'work'), (__name__, 'Target', 'outer')])
+    try:
+        assert Target().outer() == 45
+        assert Target().work(5) == 10
+    finally:
+        prof.uninstall()
+    assert Target.work.__qualname__ == 'Target.work' and not hasattr(Target.work, '__wrapped__')
+
+    # Verschachtelter Aufruf (outer -> work) ergibt nur ein Profil
+    reports = sorted(p for p in (tmp_path / 'profiles').iterdir() if p.suffix == '.json')
+    assert len(reports) == 2 and len(prof.artifacts) == 4
+    data = json.loads(reports[0].read_text())
+    assert data['target'] in ('Target.outer', 'Target.work')
+    assert data['duration'] >= 0 and data['top_cumulative']
+    assert 'memory' in data
+    assert (tmp_path / 'profiles' / data['profile']).exists()
+
+
+def test_profiled_slot_keeps_arity_for_qt_signals(qapp, tmp_path):
+    # wie StatisticsTab.on_any_filter_changed an dateChanged/stateChanged: Slot ohne Argument
+    prof = Profiler(str(tmp_path)).install([(__name__, 'SlotTarget', 'on_changed')])
+    try:
+        target, emitter = SlotTarget(), Emitter()
+        emitter.changed.connect(target.on_changed)
+        emitter.changed.emit(3)
+        target.on_changed()
+    finally:
+        prof.uninstall()
+    assert target.calls == 2
+    assert len([a for a in prof.artifacts if a.endswith('.json')]) == 2
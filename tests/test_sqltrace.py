@@ -0,0 +1,77 @@
+import logging
+from datetime import date
+
+import pytest
+
+from kidscompass import sqltrace
+from kidscompass.data import Database
+from kidscompass.models import VisitPattern, OverridePeriod, VisitStatus
+
+
+@pytest.fixture
+def stats():
+    yield sqltrace.enable(slow_ms=10_000)
+    sqltrace.disable()
+
+
+def _add_overrides(db, n):
+    for i in range(n):
+        pat = VisitPattern([5], 1, date(2025, 1, 1))
+        db.save_pattern(pat)
+        db.save_override(OverridePeriod(date(2025, 2, 1 + i), date(2025, 2, 1 + i), pat))
+
+
+def test_normalize_sql_strips_literals():
+    sql = "SELECT * FROM patterns WHERE id=42 AND start_date='2025-01-01'\n  AND x = -1.5"
+    assert sqltrace.normalize_sql(sql) == "SELECT * FROM patterns WHERE id=? AND start_date=? AND x = ?"
+
+
+def test_load_overrides_statements_grow_with_rows(tmp_path, stats):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.enable_query_stats()
+    _add_overrides(db, 2)
+    stats.reset()
+    db.load_overrides()
+    few = stats.method_stats()['load_overrides']['statements_per_call']
+    _add_overrides(db, 3)
+    stats.reset()
+    db.load_overrides()
+    many = stats.method_stats()['load_overrides']
+    # ein Pattern-SELECT pro 'add'-Override (N+1)
+    assert many['statements_per_call'] == few + 3
+    assert many['rows'] == 5
+    db.close()
+
+
+def test_write_paths_count_commit(tmp_path, stats):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.enable_query_stats()
+    stats.reset()
+    db.save_status(VisitStatus(date(2025, 3, 1), False, True))
+    m = stats.method_stats()['save_status']
+    assert m['calls'] == 1 and m['statements'] >= 2
+    st = stats.statement_stats()
+    assert st['COMMIT']['methods'].get('save_status') == 1
+    db.close()
+
+
+def test_slow_method_is_logged(tmp_path, stats, caplog):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.enable_query_stats(slow_ms=0)
+    _add_overrides(db, 1)
+    with caplog.at_level(logging.WARNING, logger='kidscompass.sql'):
+        db.load_overrides()
+    msgs = [r.getMessage() for r in caplog.records if r.name == 'kidscompass.sql']
+    assert any('load_overrides' in m and 'FROM patterns WHERE id=?' in m for m in msgs)
+    assert stats.method_stats()['load_overrides']['slow'] >= 1
+    assert 'load_overrides' in stats.report()
+    db.close()
+
+
+def test_enable_from_env():
+    try:
+        assert sqltrace.enable_from_env({}) is None
+        st = sqltrace.enable_from_env({'KIDSCOMPASS_SQLTRACE': '1', 'KIDSCOMPASS_SLOW_QUERY_MS': '50'})
+        assert st is sqltrace.active() and st.slow_ms == 50.0
+    finally:
+        sqltrace.disable()
@@ -10,10 +10,10 @@ def setup_test_db():
     tmp = tempfile.NamedTemporaryFile(delete=False)
     db = Database(tmp.name)
     # Füge Testdaten hinzu
-    db.conn.execute("INSERT INTO visit_status (day, present_child_a, present_child_b) VALUES (?, ?, ?)", ("2024-06-01", 1, 1))
-    db.conn.execute("INSERT INTO visit_status (day, present_child_a, present_child_b) VALUES (?, ?, ?)", ("2024-06-02", 0, 1))
-    db.conn.execute("INSERT INTO visit_status (day, present_child_a, present_child_b) VALUES (?, ?, ?)", ("2024-06-03", 1, 0))
-    db.conn.execute("INSERT INTO visit_status (day, present_child_a, present_child_b) VALUES (?, ?, ?)", ("2024-06-04", 0, 0))
+    db.conn.execute("INSERT INTO visit_status (day, absent_mask) VALUES (?, ?)", ("2024-06-01", 0))
+    db.conn.execute("INSERT INTO visit_status (day, absent_mask) VALUES (?, ?)", ("2024-06-02", 1))
+    db.conn.execute("INSERT INTO visit_status (day, absent_mask) VALUES (?, ?)", ("2024-06-03", 2))
+    db.conn.execute("INSERT INTO visit_status (day, absent_mask) VALUES (?, ?)", ("2024-06-04", 3))
     db.conn.commit()
     return db, tmp.name
 
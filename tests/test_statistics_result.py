@@ -0,0 +1,56 @@
+from datetime import date, timedelta
+
+from kidscompass.data import Database
+from kidscompass.models import VisitPattern, VisitStatus
+from kidscompass.statistics import EMPTY_SUMMARY, compute_statistics
+from kidscompass.stats_export import write_statistics_pdf
+
+
+def _setup(db):
+    db.save_pattern(VisitPattern([5, 6], 1, date(2024, 1, 6)))
+    for i in range(0, 28, 7):
+        d = date(2024, 1, 6) + timedelta(days=i)
+        db.save_status(VisitStatus(d, i != 7, True))
+    return db.load_patterns(), db.load_overrides(), db.load_all_status()
+
+
+def test_compute_statistics_summary_and_visits(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    patterns, overrides, status = _setup(db)
+    res = compute_statistics(db, date(2024, 1, 1), date(2024, 1, 31), [5, 6], 'Beide',
+                             patterns, overrides, status, today=date(2024, 1, 31))
+    # Samstage/Sonntage 6.1.-28.1.: 8 Tage, Amilia am 13.1. abwesend
+    assert res.totals['planned'] == 8 and res.totals['present'][0] == 7
+    assert res.summary_lines()[0] == 'Geplante Umgänge: 8'
+    assert 'Amilia abwesend: 1 (12.5%)' in res.summary
+    assert [v['day'] for v in res.visits] == [date(2024, 1, 6), date(2024, 1, 13), date(2024, 1, 20), date(2024, 1, 27)]
+    assert res.trend_title == '4-Wochen-Inkremente' and sum(p[2] for p in res.trend) == 8
+
+    single = compute_statistics(db, date(2024, 1, 1), date(2024, 1, 31), [5], 'Amilia',
+                                patterns, overrides, status, today=date(2024, 1, 31))
+    assert 'Amilia anwesend: 3 (75.0%)' in single.summary
+
+    empty = compute_statistics(db, date(2023, 1, 1), date(2023, 1, 31), [5, 6], 'Beide',
+                               patterns, overrides, status)
+    assert empty.summary == EMPTY_SUMMARY and empty.visits == [] and empty.chart_png() is None
+    db.close()
+
+
+def test_chart_rendered_once_and_reused_by_pdf(tmp_path, monkeypatch):
+    import kidscompass.charts as charts
+    db = Database(str(tmp_path / 'kc.db'))
+    patterns, overrides, status = _setup(db)
+    res = compute_statistics(db, date(2024, 1, 1), date(2024, 1, 31), [5, 6], 'Beide',
+                             patterns, overrides, status)
+    calls = []
+    render = charts.render_trend_chart
+    monkeypatch.setattr(charts, 'render_trend_chart', lambda *a: calls.append(a) or render(*a))
+    png = res.chart_png()
+    assert png.startswith(b'\x89PNG')
+    assert res.chart_png() is png
+
+    out = tmp_path / 'stats.pdf'
+    write_statistics_pdf(res, str(out))
+    assert out.read_bytes().startswith(b'%PDF')
+    assert len(calls) == 1
+    db.close()
@@ -0,0 +1,66 @@
+import csv
+import io
+import types
+from datetime import date
+
+from kidscompass.calendar_logic import apply_overrides, generate_standard_days, iter_planned_days
+from kidscompass.data import Database
+from kidscompass.models import OverridePeriod, RemoveOverride, VisitPattern, VisitStatus
+from kidscompass.stats_export import export_rows, merge_status, write_statistics_csv
+
+
+def _db(tmp_path):
+    db = Database(str(tmp_path / 'kc.db'))
+    db.save_pattern(VisitPattern([5], 1, date(2024, 1, 6)))
+    summer = VisitPattern([0, 1, 2, 3, 4], 1, date(2024, 7, 22), date(2024, 7, 26))
+    db.save_pattern(summer)
+    db.save_override(OverridePeriod(date(2024, 7, 22), date(2024, 7, 28), summer, holder='father', vac_type='sommer'))
+    db.save_override(RemoveOverride(date(2024, 12, 21), date(2024, 12, 31)))
+    db.save_status(VisitStatus(date(2024, 7, 23), False, True))
+    db.save_status(VisitStatus(date(2024, 7, 27), True, True))   # ungeplant (im Override entfernt)
+    db.save_status(VisitStatus(date(2024, 3, 2), True, False))
+    return db
+
+
+def test_merge_status_joins_sorted_streams():
+    planned = [(date(2024, 1, d), None) for d in (1, 3, 5)]
+    status = [(date(2024, 1, 2), 1), (date(2024, 1, 3), 2), (date(2024, 1, 6), 3)]
+    assert list(merge_status(planned, status)) == [
+        (date(2024, 1, 1), None, None), (date(2024, 1, 3), None, 2), (date(2024, 1, 5), None, None)]
+
+
+def test_iter_planned_days_matches_apply_overrides(tmp_path):
+    db = _db(tmp_path)
+    pats, ovs = db.load_patterns(), db.load_overrides()
+    start, end = date(2023, 6, 1), date(2025, 2, 15)
+    raw = [d for p in pats for y in range(start.year, end.year + 1) for d in generate_standard_days(p, y)]
+    expected = [d for d in apply_overrides(raw, ovs) if start <= d <= end]
+    assert [d for d, _ in iter_planned_days(pats, ovs, start, end)] == expected
+    db.close()
+
+
+def test_export_rows_stream_status_holder_and_vacation(tmp_path):
+    db = _db(tmp_path)
+    rows = export_rows(db, date(2024, 1, 1), date(2024, 12, 31))
+    assert isinstance(rows, types.GeneratorType)
+    by_day = {r[0]: r for r in rows}
+    assert by_day['2024-07-23'] == ['2024-07-23', 'Di', 0, 1, 1, 'Vater', 'sommer']
+    assert by_day['2024-07-22'] == ['2024-07-22', 'Mo', 1, 1, 0, 'Vater', 'sommer']
+    assert by_day['2024-03-02'] == ['2024-03-02', 'Sa', 1, 0, 1, '', '']
+    assert '2024-07-27' not in by_day and '2024-12-28' not in by_day
+    db.close()
+
+
+def test_write_csv_and_tsv(tmp_path):
+    db = _db(tmp_path)
+    buf = io.StringIO()
+    n = write_statistics_csv(db, buf, date(2024, 7, 1), date(2024, 7, 31), weekdays=[1, 5])
+    lines = list(csv.reader(io.StringIO(buf.getvalue())))
+    assert lines[0] == ['Datum', 'Wochentag', 'Amilia anwesend', 'Malia anwesend',
+                        'Status erfasst', 'Betreuung', 'Ferienart']
+    assert n == len(lines) - 1 and {r[1] for r in lines[1:]} <= {'Di', 'Sa'}
+
+    out = tmp_path / 'export.tsv'
+    assert write_statistics_csv(db, str(out), date(2024, 7, 1), date(2024, 7, 31), weekdays=[1, 5]) == n
+    assert out.read_text(encoding='utf-8').splitlines()[0].split('\t')[0] == 'Datum'
+    db.close()
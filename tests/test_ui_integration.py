@@ -50,3 +50,22 @@ def test_export_button_triggers_export(main_window, qtbot, monkeypatch):
 
     assert called.get('init'), "ExportWorker was not instantiated"
     # Note: In real async, you may need to trigger thread start or signal manually
+
+
+def test_annotated_calendar_caches_static_text(qtbot):
+    import datetime
+    from kidscompass.ui import AnnotatedCalendar
+    cal = AnnotatedCalendar()
+    qtbot.addWidget(cal)
+    cal.setCurrentPage(2024, 1)
+    cal.set_annotations({datetime.date(2024, 1, 6): 'id=1', datetime.date(2024, 1, 20): ''})
+    assert cal.annotation(datetime.date(2024, 1, 6)) == 'id=1'
+    assert cal.annotation(datetime.date(2024, 1, 20)) is None
+    cal.resize(500, 350)
+    cal.grab()
+    cached = dict(cal._text_cache)
+    assert [k[:2] for k in cached] == [(2460316, 'id=1')]
+    cal.grab()
+    assert all(cal._text_cache[k] is v for k, v in cached.items())
+    cal.setCurrentPage(2024, 2)
+    assert not cal._text_cache
@@ -162,7 +162,7 @@ def test_restore_worker_failure(qapp, tmp_path):
 def test_export_worker_success(qapp, tmp_path):
     dbfile = tmp_path / "test_export.db"
     db = Database(str(dbfile))
-    db.conn.execute("INSERT INTO visit_status (day, present_child_a, present_child_b) VALUES (?, ?, ?)", ("2023-01-01", 1, 1))
+    db.conn.execute("INSERT INTO visit_status (day, absent_mask) VALUES (?, ?)", ("2023-01-01", 0))
     db.conn.commit()
     db.conn.close()
 
@@ -211,3 +211,40 @@ def test_export_worker_failure(qapp, tmp_path):
 
     assert not results
     assert errors
+
+
+def test_restore_worker_hands_state_to_gui_thread(qapp, tmp_path):
+    from PySide6.QtCore import QObject
+    from kidscompass.models import VisitPattern
+    dbfile = tmp_path / "restore_state.db"
+    db = Database(str(dbfile))
+    db.save_pattern(VisitPattern([5], 1, date(2024, 1, 6)))
+    backup_file = tmp_path / "state.sql"
+    db.export_to_sql(str(backup_file))
+    db.close()
+
+    class Receiver(QObject):
+        def __init__(self):
+            super().__init__()
+            self.calls = []
+
+        def on_plan_restored(self, visit_status, patterns, overrides):
+            self.calls.append((QThread.currentThread(), patterns))
+
+    parent = DummyParent()
+    receiver = Receiver()
+    worker = RestoreWorker(str(dbfile), str(backup_file), parent)
+    worker.loaded.connect(receiver.on_plan_restored)
+    thread = QThread()
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    thread.start()
+    thread.quit()
+    thread.wait()
+    qapp.processEvents()
+
+    # der Worker verändert den Elternzustand nicht selbst; übernommen wird im GUI-Thread
+    assert parent.patterns == [] and not hasattr(parent, 'refreshed')
+    assert len(receiver.calls) == 1
+    gui_thread, patterns = receiver.calls[0]
+    assert gui_thread is qapp.thread() and len(patterns) == 1